@@ -9,6 +9,10 @@ load_dotenv()
 def create_app():
     app = Flask(__name__)
     
+    # jsonify() and request.get_json() go through orjson when it is installed
+    from app.utils.json_codec import CodecJSONProvider
+    app.json = CodecJSONProvider(app)
+    
     # Configure CORS to allow requests from any frontend
     CORS(app, origins=["*"])  # In production, specify your frontend domain
     
@@ -16,6 +20,34 @@ def create_app():
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     app.config['DEBUG'] = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Deadline budget for routes that may go upstream; keep it below gunicorn's timeout
+    app.config['REQUEST_DEADLINE_SECONDS'] = float(os.environ.get('REQUEST_DEADLINE_SECONDS', '20'))
+    # Stop starting upstream calls once less than this much budget is left
+    app.config['DEADLINE_RESERVE_SECONDS'] = float(os.environ.get('DEADLINE_RESERVE_SECONDS', '1'))
+    
+    # Request tracing (off by default; see app/utils/tracing.py)
+    app.config['TRACE_ENABLED'] = os.environ.get('TRACE_ENABLED', 'False').lower() == 'true'
+    app.config['TRACE_SLOW_MS'] = float(os.environ.get('TRACE_SLOW_MS', '1000'))
+    app.config['TRACE_LOG_FILE'] = os.environ.get('TRACE_LOG_FILE', 'slow_requests.log')
+    app.config['TRACE_PROFILE'] = os.environ.get('TRACE_PROFILE', 'False').lower() == 'true'
+    app.config['TRACE_PROFILE_INTERVAL_MS'] = float(os.environ.get('TRACE_PROFILE_INTERVAL_MS', '5'))
+    app.config['TRACE_SAMPLE_RATE'] = float(os.environ.get('TRACE_SAMPLE_RATE', '1.0'))
+    
+    # Admission control: cold (upstream-bound) routes and long-lived streams each get a
+    # concurrency limit, so a burst is shed with 503 + Retry-After instead of tying up
+    # every worker thread; cached reads and health checks are never limited
+    app.config['ADMISSION_ENABLED'] = os.environ.get('ADMISSION_ENABLED', 'True').lower() == 'true'
+    app.config['ADMISSION_UPSTREAM_CONCURRENCY'] = int(os.environ.get('ADMISSION_UPSTREAM_CONCURRENCY', '4'))
+    app.config['ADMISSION_UPSTREAM_QUEUE'] = int(os.environ.get('ADMISSION_UPSTREAM_QUEUE', '8'))
+    app.config['ADMISSION_QUEUE_TIMEOUT_SECONDS'] = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT_SECONDS', '2'))
+    app.config['ADMISSION_STREAM_CONCURRENCY'] = int(os.environ.get('ADMISSION_STREAM_CONCURRENCY', '16'))
+    
+    from app.utils.tracing import init_tracing
+    init_tracing(app)
+    
+    from app.utils.admission import init_admission
+    init_admission(app)
+    
     # Register blueprints
     from app.api import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
@@ -1,16 +1,205 @@
-from flask import jsonify, request, send_file
+from flask import Response, current_app, g, jsonify, request, send_file, stream_with_context
 from app.api import api_bp
 from app.services.alpha_vantage import AlphaVantageService
+from app.services.events import EventBroker
+from app.services.refresh_jobs import REFRESHABLE_DATA_TYPES, RefreshJobManager
+from app.services.snapshot import VendorSnapshot, build_vendor_entries, iter_chunks
 from app.utils.vendor_analysis import VendorAnalyzer
+from app.utils.flag_rules import DEFAULT_RULES, RuleSet, load_rule_sets
+from app.utils.tracing import span
+from app.utils.deadline import Deadline
+from app.utils.admission import get_admission_stats, limited, release_admission
+from app.utils import json_codec
 import os
+import re
 import tempfile
+import time
 
 # Initialize services
 alpha_vantage = AlphaVantageService()
 analyzer = VendorAnalyzer()
+events = EventBroker()
+refresh_jobs = RefreshJobManager(
+    alpha_vantage,
+    max_workers=int(os.environ.get('REFRESH_MAX_WORKERS', '1'))
+)
+# Pre-encoded vendor responses shared by every worker on the box
+snapshot = None
+if os.environ.get('SNAPSHOT_ENABLED', 'True').lower() == 'true':
+    snapshot = VendorSnapshot(
+        os.environ.get('SNAPSHOT_PATH', 'vendor_snapshot.bin'),
+        max_age_seconds=float(os.environ.get('SNAPSHOT_MAX_AGE_SECONDS', '3600')),
+        data_version=alpha_vantage.cache.current_version
+    )
+
+def _key_status() -> dict:
+    """Key rotation stats plus circuit breaker, negative cache and fetch queue state"""
+    stats = alpha_vantage.key_manager.get_key_stats()
+    stats['circuit_breaker'] = alpha_vantage.circuit_breaker.get_state()
+    stats['negative_cache'] = alpha_vantage.negative_cache.get_stats()
+    stats['fetch_queue'] = alpha_vantage.scheduler.get_stats()
+    stats['snapshot'] = snapshot.get_stats() if snapshot else None
+    return stats
+
+# Push key-state changes and vendor data-version bumps to /api/events subscribers
+alpha_vantage.key_manager.add_listener(lambda: events.publish('keys', _key_status()))
+alpha_vantage.circuit_breaker.add_listener(lambda: events.publish('keys', _key_status()))
+alpha_vantage.add_vendor_listener(events.publish_vendor_change)
+if snapshot:
+    alpha_vantage.add_vendor_listener(snapshot.invalidate)
 
 # Vendor symbols
-VENDOR_SYMBOLS = ['TEL', 'ST', 'DD', 'CE', 'LYB']
+VENDOR_SYMBOLS = [
+    symbol.strip().upper()
+    for symbol in os.environ.get('VENDOR_SYMBOLS', 'TEL,ST,DD,CE,LYB').split(',')
+    if symbol.strip()
+]
+MAX_CHANGES_PER_RESPONSE = 1000
+
+# Symbols dropped from the list since the last start become tombstones in /vendors/changes
+try:
+    alpha_vantage.sync_vendor_universe(VENDOR_SYMBOLS)
+except Exception as e:
+    print(f"Error syncing vendor list with the change log: {str(e)}")
+
+SYMBOL_PATTERN = re.compile(r'^[A-Z][A-Z0-9.\-]{0,9}$')
+MAX_REFRESH_SYMBOLS = int(os.environ.get('REFRESH_MAX_SYMBOLS', '10000'))
+MAX_BATCH_SYMBOLS = int(os.environ.get('BATCH_MAX_SYMBOLS', '100'))
+
+# Flag rule sets selectable with ?rules=<name>; "default" is built in
+RULE_SETS = load_rule_sets(os.environ.get('FLAG_RULES_DIR', 'flag_rules'))
+
+def _request_deadline() -> Deadline:
+    """Deadline for this request; ?budget=<seconds> may lower the configured one"""
+    # Less whatever the request already spent waiting for admission
+    budget = max(0.0, current_app.config['REQUEST_DEADLINE_SECONDS'] - g.get('admission_wait', 0.0))
+    requested = request.args.get('budget', type=float)
+    if requested is not None and requested > 0:
+        budget = min(budget, requested)
+    return Deadline(budget, reserve=min(current_app.config['DEADLINE_RESERVE_SECONDS'], budget / 2))
+
+def _normalize_symbols(raw_symbols) -> tuple:
+    """Upper-case, strip and de-duplicate symbols; returns (valid, invalid)"""
+    symbols, invalid, seen = [], [], set()
+    for raw in raw_symbols:
+        symbol = str(raw).strip().upper()
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        if SYMBOL_PATTERN.match(symbol):
+            symbols.append(symbol)
+        else:
+            invalid.append(raw)
+    return symbols, invalid
+
+def _parse_symbols_request(body: dict, max_symbols: int) -> tuple:
+    """(symbols, data_types, error) from a {"symbols": [...], "data_types": [...]} body"""
+    raw_symbols = body.get('symbols')
+    if not isinstance(raw_symbols, list) or not raw_symbols:
+        return None, None, 'symbols must be a non-empty list'
+    
+    symbols, invalid = _normalize_symbols(raw_symbols)
+    if invalid:
+        return None, None, f"Invalid symbols: {', '.join(map(str, invalid[:20]))}"
+    if len(symbols) > max_symbols:
+        return None, None, f"At most {max_symbols} symbols per request"
+    
+    data_types = [str(t).upper() for t in body.get('data_types', ['OVERVIEW', 'INCOME_STATEMENT'])]
+    unknown = [t for t in data_types if t not in REFRESHABLE_DATA_TYPES]
+    if unknown or not data_types:
+        return None, None, f"data_types must be drawn from {', '.join(REFRESHABLE_DATA_TYPES)}"
+    return symbols, list(dict.fromkeys(data_types)), None
+
+def _requested_rules(name=None) -> tuple:
+    """(rule set, error) for `name`, or ?rules=<name> when not given"""
+    name = name if name is not None else request.args.get('rules')
+    if not name:
+        return DEFAULT_RULES, None
+    if name not in RULE_SETS:
+        return None, f"Unknown rule set '{name}'; available: {', '.join(RULE_SETS)}"
+    return RULE_SETS[name], None
+
+def _cached(symbols: list, snapshot_entry: str = None) -> bool:
+    """Whether a request can be answered without upstream calls (admission fast path)"""
+    if snapshot_entry and snapshot and request.args.get('rules') in (None, '', DEFAULT_RULES.name) \
+            and snapshot.has(snapshot_entry):
+        return True
+    return alpha_vantage.is_cached(symbols)
+
+def _vendors_cached() -> bool:
+    return _cached(VENDOR_SYMBOLS, 'vendors')
+
+def _vendor_cached() -> bool:
+    symbol = request.view_args['symbol'].upper()
+    # Unknown symbols are rejected without any fetch
+    return symbol not in VENDOR_SYMBOLS or _cached([symbol], f"vendor/{symbol}")
+
+def _universe_cached() -> bool:
+    return _cached(VENDOR_SYMBOLS)
+
+def _batch_cached() -> bool:
+    symbols, data_types, error = _parse_symbols_request(request.get_json(silent=True) or {}, MAX_BATCH_SYMBOLS)
+    # Invalid bodies are rejected without any fetch
+    return error is not None or alpha_vantage.is_cached(symbols, tuple(data_types))
+
+def _degraded_symbols(vendors_data: dict) -> list:
+    return [symbol for symbol, data in vendors_data.items() if data.get('degraded')]
+
+def _snapshot_response(name: str):
+    """Serve a pre-encoded response from the shared snapshot, if it has one"""
+    if not snapshot:
+        return None
+    with span('snapshot.read', entry=name):
+        body = snapshot.get(name)
+    if body is None:
+        return None
+    # Already bytes chunks, so they go to the server as they are (and hold no admission slot)
+    response = Response(iter_chunks(body), mimetype='application/json', direct_passthrough=True)
+    response.content_length = len(body)
+    return response
+
+def _current_version():
+    """Latest change-log version, or None if the store cannot be read
+
+    A version is only a resume point for /vendors/changes, so a failed read
+    must not fail the request serving the data.
+    """
+    try:
+        return alpha_vantage.cache.current_version()
+    except Exception as e:
+        print(f"Error reading change-log version: {str(e)}")
+        return None
+
+def _attach_versions(vendors_data: dict) -> dict:
+    """Stamp each vendor record with its latest change-log version (0 if unknown)"""
+    try:
+        versions = alpha_vantage.cache.get_symbol_versions(list(vendors_data))
+    except Exception as e:
+        print(f"Error reading vendor versions: {str(e)}")
+        versions = {}
+    for symbol, data in vendors_data.items():
+        data['version'] = versions.get(symbol, 0)
+    return vendors_data
+
+def _shareable(vendors_data: dict) -> bool:
+    """Whether every vendor holds real, current data (failed, sample and degraded results are never shared)"""
+    return all(
+        'error' not in data and not data.get('degraded') and not alpha_vantage.is_sample_data(data)
+        for data in vendors_data.values()
+    )
+
+def _write_snapshot(token, vendors_data: dict, analysis: dict, version: int):
+    """Publish a fresh snapshot, unless any vendor failed or fell back to stand-in data"""
+    if not snapshot or not _shareable(vendors_data):
+        return
+    try:
+        with span('snapshot.write'):
+            vendor_analyses = {
+                symbol: analyzer.analyze_vendor(symbol, data) for symbol, data in vendors_data.items()
+            }
+            snapshot.write(build_vendor_entries(vendors_data, analysis, vendor_analyses, [], version), token)
+    except Exception as e:
+        print(f"Error writing vendor snapshot: {str(e)}")
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
@@ -32,17 +221,313 @@ def test_endpoint():
     })
 
 @api_bp.route('/vendors', methods=['GET'])
+@limited('upstream', cheap=_vendors_cached)
 def get_vendors():
     """Get all vendor data"""
+    rules, error = _requested_rules()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    # The snapshot holds default-rule analysis only
+    shared = rules is DEFAULT_RULES
+    
     try:
-        vendors_data = alpha_vantage.get_all_vendors_data(VENDOR_SYMBOLS)
-        analysis = analyzer.analyze_vendor_data(vendors_data)
+        cached_response = _snapshot_response('vendors') if shared else None
+        if cached_response is not None:
+            return cached_response
+        
+        token = snapshot.begin_build() if snapshot and shared else None
+        # Read before fetching, so /vendors/changes?since=<version> cannot miss a write made meanwhile
+        version = _current_version()
+        deadline = _request_deadline()
+        with span('vendors.fetch', symbols=len(VENDOR_SYMBOLS)):
+            vendors_data = _attach_versions(alpha_vantage.get_all_vendors_data(VENDOR_SYMBOLS, deadline))
+        with span('vendors.analyze'):
+            analysis = analyzer.analyze_vendor_data(vendors_data, rules)
+        if version is None:
+            # Resuming from 0 replays the whole log, so clients miss nothing; just don't share it
+            version = 0
+        elif shared:
+            _write_snapshot(token, vendors_data, analysis, version)
         
+        with span('serialize'):
+            return jsonify({
+                'success': True,
+                'data': {
+                    'vendors': vendors_data,
+                    'analysis': analysis,
+                    'version': version
+                },
+                'degraded': _degraded_symbols(vendors_data)
+            })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _sse_message(event: str, payload: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json_codec.dumps_response(payload).decode('utf-8')}\n\n"
+
+def _release_after_last(items):
+    """Yield from `items`, giving back the admission slot once the last one is produced
+
+    Reads one item ahead, so the slot is free before the last message is
+    written: a slow reader only holds it while there is upstream work left.
+    """
+    items = iter(items)
+    pending = next(items, None)
+    for following in items:
+        yield pending
+        pending = following
+    release_admission()
+    if pending is not None:
+        yield pending
+
+@api_bp.route('/vendors/stream', methods=['GET'])
+@limited('upstream', cheap=_universe_cached)
+def stream_vendors():
+    """Stream each vendor's data and analysis row as Server-Sent Events"""
+    rules, error = _requested_rules()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    # Taken before the body starts, so it bounds the whole stream like /vendors
+    deadline = _request_deadline()
+    
+    def generate():
+        comparison_table = []
+        # Send something immediately so proxies and the browser open the stream
+        yield ': stream open\n\n'
+        try:
+            vendors = _release_after_last(alpha_vantage.iter_vendors_data(VENDOR_SYMBOLS, deadline))
+            for symbol, vendor_data in vendors:
+                vendor_analysis = analyzer.analyze_vendor(symbol, vendor_data, rules)
+                if vendor_analysis['row'] is not None:
+                    comparison_table.append(vendor_analysis['row'])
+                yield _sse_message('vendor', {
+                    'symbol': symbol,
+                    'data': vendor_data,
+                    'summary': vendor_analysis['summary'],
+                    'row': vendor_analysis['row'],
+                    'flags': vendor_analysis['flags']
+                })
+            
+            peer_benchmarks, peer_ranks = analyzer.compute_peer_benchmarks(comparison_table)
+            yield _sse_message('complete', {
+                'total': len(VENDOR_SYMBOLS),
+                'insights': analyzer.generate_insights(comparison_table),
+                'peer_benchmarks': peer_benchmarks,
+                'peer_ranks': peer_ranks
+            })
+        except Exception as e:
+            release_admission()
+            yield _sse_message('error', {'error': str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@api_bp.route('/vendors/batch', methods=['POST'])
+@limited('upstream', cheap=_batch_cached)
+def get_vendors_batch():
+    """Several symbols and data types in one response, optionally analyzed as their own group"""
+    try:
+        body = request.get_json(silent=True) or {}
+        symbols, data_types, error = _parse_symbols_request(body, MAX_BATCH_SYMBOLS)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        include_analysis = bool(body.get('analysis', False))
+        rules, error = _requested_rules(body.get('rules'))
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        if include_analysis and not {'OVERVIEW', 'INCOME_STATEMENT'} <= set(data_types):
+            return jsonify({
+                'success': False,
+                'error': 'analysis needs the OVERVIEW and INCOME_STATEMENT data types'
+            }), 400
+        
+        with span('vendors.batch', symbols=len(symbols), data_types=len(data_types)):
+            payloads, errors, degraded = alpha_vantage.get_batch_data(symbols, data_types, _request_deadline())
+        result = {
+            'vendors': payloads,
+            'errors': errors
+        }
+        
+        if include_analysis:
+            vendors_data = {}
+            for symbol in symbols:
+                parts = payloads[symbol]
+                if 'OVERVIEW' in parts and 'INCOME_STATEMENT' in parts:
+                    vendors_data[symbol] = alpha_vantage.build_vendor_data(
+                        symbol, parts['OVERVIEW'], parts['INCOME_STATEMENT']
+                    )
+                else:
+                    vendors_data[symbol] = {'error': '; '.join(errors.get(symbol, {}).values()), 'symbol': symbol}
+            with span('vendors.analyze'):
+                result['analysis'] = analyzer.analyze_vendor_data(vendors_data, rules)
+        
+        with span('serialize'):
+            return jsonify({
+                'success': True,
+                'data': result,
+                'degraded': degraded
+            })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/vendors/changes', methods=['GET'])
+@limited('upstream', cheap=_universe_cached)
+def get_vendor_changes():
+    """Vendors, analysis rows, flags and insights changed since ?since=<version>, plus tombstones"""
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({
+            'success': False,
+            'error': 'since must be a non-negative version from a previous response'
+        }), 400
+    rules, error = _requested_rules()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    
+    try:
+        with span('vendors.changes', since=since):
+            log = alpha_vantage.cache.get_changes(since, limit=MAX_CHANGES_PER_RESPONSE)
+        current_version = log['current_version']
+        if since > current_version or since < log['oldest_version'] - 1:
+            # Unknown version, or the log no longer reaches back that far
+            return jsonify({
+                'success': True,
+                'data': {
+                    'since': since,
+                    'version': current_version,
+                    'reset': True
+                }
+            })
+        
+        changes = log['changes']
+        has_more = len(changes) == MAX_CHANGES_PER_RESPONSE and changes[-1][0] < current_version
+        version = changes[-1][0] if has_more else current_version
+        
+        last_kind = {}
+        for _, symbol, kind in changes:
+            last_kind[symbol] = kind
+        removed = [symbol for symbol, kind in last_kind.items() if kind == 'removed' or symbol not in VENDOR_SYMBOLS]
+        updated = [symbol for symbol in VENDOR_SYMBOLS if symbol in last_kind and symbol not in removed]
+        
+        result = {
+            'since': since,
+            'version': version,
+            'reset': False,
+            'has_more': has_more,
+            'vendors': {},
+            'removed': removed
+        }
+        degraded = []
+        if updated or removed:
+            # Insights compare every vendor, so they are recomputed over the full list
+            with span('vendors.fetch', symbols=len(VENDOR_SYMBOLS)):
+                vendors_data = alpha_vantage.get_all_vendors_data(VENDOR_SYMBOLS, _request_deadline())
+            with span('vendors.analyze'):
+                analysis = analyzer.analyze_vendor_data(vendors_data, rules)
+            changed_rows = set(updated)
+            result['vendors'] = _attach_versions({symbol: vendors_data[symbol] for symbol in updated})
+            result['analysis'] = {
+                'summary': {symbol: analysis['summary'][symbol] for symbol in updated if symbol in analysis['summary']},
+                'comparison_table': [row for row in analysis['comparison_table'] if row.get('Symbol') in changed_rows],
+                'flags': {symbol: analysis['flags'][symbol] for symbol in updated if symbol in analysis['flags']},
+                'insights': analysis['insights'],
+                # Peer statistics move with every vendor in the category; ranks only for changed vendors
+                'peer_benchmarks': analysis['peer_benchmarks'],
+                'peer_ranks': {symbol: analysis['peer_ranks'][symbol] for symbol in updated if symbol in analysis['peer_ranks']}
+            }
+            degraded = _degraded_symbols(result['vendors'])
+        
+        with span('serialize'):
+            return jsonify({
+                'success': True,
+                'data': result,
+                'degraded': degraded
+            })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/rules', methods=['GET'])
+def list_rule_sets():
+    """Flag rule sets selectable with ?rules=<name>"""
+    return jsonify({
+        'success': True,
+        'data': [rule_set.to_dict() for rule_set in RULE_SETS.values()]
+    })
+
+@api_bp.route('/vendors/flags', methods=['POST'])
+def evaluate_vendor_flags():
+    """Flag the cached vendors with a named or inline rule set, without any upstream calls"""
+    body = request.get_json(silent=True) or {}
+    definition = body.get('rules')
+    if isinstance(definition, dict):
+        try:
+            rules = RuleSet(definition)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+    else:
+        rules, error = _requested_rules(definition if isinstance(definition, str) else None)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+    
+    try:
+        started = time.perf_counter()
+        with span('vendors.cache_read', symbols=len(VENDOR_SYMBOLS)):
+            # Any age will do: this only re-checks thresholds against what is already stored
+            cached, rebuilt = alpha_vantage.read_vendor_cache(VENDOR_SYMBOLS, max_age_hours=None)
+        vendors_data = {symbol: cached.get(symbol) or rebuilt[symbol]
+                        for symbol in VENDOR_SYMBOLS if symbol in cached or symbol in rebuilt}
+        with span('vendors.flags', rules=rules.name):
+            flags = analyzer.evaluate_flags(vendors_data, rules)
+        
+        counts = {}
+        for vendor_flags in flags.values():
+            for flag in vendor_flags:
+                counts[flag] = counts.get(flag, 0) + 1
         return jsonify({
             'success': True,
             'data': {
-                'vendors': vendors_data,
-                'analysis': analysis
+                'rules': rules.name,
+                'flags': flags,
+                'counts': counts,
+                'missing': [symbol for symbol in VENDOR_SYMBOLS if symbol not in vendors_data],
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
             }
         })
     except Exception as e:
@@ -52,6 +537,7 @@ def get_vendors():
         }), 500
 
 @api_bp.route('/vendors/<symbol>', methods=['GET'])
+@limited('upstream', cheap=_vendor_cached)
 def get_vendor(symbol):
     """Get data for a specific vendor"""
     try:
@@ -60,12 +546,28 @@ def get_vendor(symbol):
                 'success': False,
                 'error': 'Invalid vendor symbol'
             }), 400
+        rules, error = _requested_rules()
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
         
-        vendor_data = alpha_vantage.get_vendor_data(symbol.upper())
-        return jsonify({
-            'success': True,
-            'data': vendor_data
-        })
+        if rules is DEFAULT_RULES:
+            cached_response = _snapshot_response(f"vendor/{symbol.upper()}")
+            if cached_response is not None:
+                return cached_response
+        
+        with span('vendors.fetch', symbols=1):
+            vendor_data = alpha_vantage.get_vendor_data(symbol.upper(), _request_deadline())
+        _attach_versions({symbol.upper(): vendor_data})
+        vendor_analysis = analyzer.analyze_vendor(symbol.upper(), vendor_data, rules)
+        with span('serialize'):
+            return jsonify({
+                'success': True,
+                'data': vendor_data,
+                'analysis': vendor_analysis
+            })
     except Exception as e:
         return jsonify({
             'success': False,
@@ -73,15 +575,26 @@ def get_vendor(symbol):
         }), 500
 
 @api_bp.route('/vendors/export/csv', methods=['GET'])
+@limited('upstream', cheap=_universe_cached)
 def export_vendors_csv():
     """Export vendor comparison data to CSV"""
+    rules, error = _requested_rules()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    
     try:
-        vendors_data = alpha_vantage.get_all_vendors_data(VENDOR_SYMBOLS)
-        analysis = analyzer.analyze_vendor_data(vendors_data)
+        with span('vendors.fetch', symbols=len(VENDOR_SYMBOLS)):
+            vendors_data = alpha_vantage.get_all_vendors_data(VENDOR_SYMBOLS, _request_deadline())
+        with span('vendors.analyze'):
+            analysis = analyzer.analyze_vendor_data(vendors_data, rules)
         
         # Create temporary CSV file
         temp_file = tempfile.NamedTemporaryFile(mode='w+', suffix='.csv', delete=False)
-        filename = analyzer.export_to_csv(analysis['comparison_table'], temp_file.name)
+        with span('export.csv', rows=len(analysis['comparison_table'])):
+            filename = analyzer.export_to_csv(analysis['comparison_table'], temp_file.name)
         
         return send_file(
             filename,
@@ -102,6 +615,9 @@ def handle_data():
         'message': 'This endpoint is deprecated. Use /api/vendors for vendor data.',
         'available_endpoints': [
             '/api/vendors - Get all vendor data',
+            '/api/vendors/stream - Stream vendor data as Server-Sent Events',
+            '/api/vendors/changes?since=<version> - Vendors changed since a version',
+            'POST /api/vendors/batch - Several symbols and data types in one request',
             '/api/vendors/<symbol> - Get specific vendor data',
             '/api/vendors/export/csv - Export vendor data as CSV'
         ]
@@ -111,7 +627,8 @@ def handle_data():
 def get_key_status():
     """Get API key rotation status"""
     try:
-        stats = alpha_vantage.key_manager.get_key_stats()
+        stats = _key_status()
+        stats['admission'] = get_admission_stats()
         return jsonify({
             'success': True,
             'data': stats
@@ -119,6 +636,90 @@ def get_key_status():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/events', methods=['GET'])
+@limited('stream')
+def stream_events():
+    """Push key-state changes and vendor data-version bumps as Server-Sent Events"""
+    subscription = events.subscribe()
+    initial = {
+        'keys': _key_status(),
+        'vendor_versions': events.get_vendor_versions()
+    }
+    return Response(
+        events.stream(subscription, initial),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@api_bp.route('/refresh', methods=['POST'])
+def start_refresh_job():
+    """Start a background refresh of a symbol list; returns a job id"""
+    try:
+        body = request.get_json(silent=True) or {}
+        symbols, data_types, error = _parse_symbols_request(body, MAX_REFRESH_SYMBOLS)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        job = refresh_jobs.submit(symbols, data_types)
+        return jsonify({
+            'success': True,
+            'data': {
+                'job_id': job.id,
+                'status_url': f"/api/refresh/{job.id}",
+                **job.to_dict(refresh_jobs.estimate_seconds_remaining(job), include_symbols=False)
+            }
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/refresh', methods=['GET'])
+def list_refresh_jobs():
+    """List recent refresh jobs without per-symbol detail"""
+    return jsonify({
+        'success': True,
+        'data': [
+            job.to_dict(refresh_jobs.estimate_seconds_remaining(job), include_symbols=False)
+            for job in refresh_jobs.list_jobs()
+        ]
+    })
+
+@api_bp.route('/refresh/<job_id>', methods=['GET'])
+def get_refresh_job(job_id):
+    """Per-symbol progress, ETA and failures of a refresh job"""
+    job = refresh_jobs.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown refresh job'
+        }), 404
+    return jsonify({
+        'success': True,
+        'data': job.to_dict(refresh_jobs.estimate_seconds_remaining(job))
+    })
+
+@api_bp.route('/refresh/<job_id>', methods=['DELETE'])
+def cancel_refresh_job(job_id):
+    """Stop a refresh job after its current call"""
+    job = refresh_jobs.cancel(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown refresh job'
+        }), 404
+    return jsonify({
+        'success': True,
+        'data': job.to_dict(refresh_jobs.estimate_seconds_remaining(job), include_symbols=False)
+    })
+
 @api_bp.route('/keys/reset', methods=['POST'])
 def reset_key_blacklist():
     """Reset API key blacklist (for testing)"""
@@ -1,78 +1,206 @@
+import contextvars
+import hashlib
 import os
 import requests
 import time
-from typing import Dict, List, Optional
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from .key_manager import APIKeyManager
+from .cache_backends import create_cache_backend
+from .circuit_breaker import CircuitBreaker, NegativeCache
+from .fetch_scheduler import FetchScheduler, PRIORITY_INTERACTIVE
+from app.utils import json_codec
+from app.utils.statement_stream import REPORT_KEYS, STATEMENT_FUNCTIONS, parse_statement, selection_from_env
+from app.utils.tracing import span
+from app.utils.deadline import Deadline, DeadlineExceeded, clamp_timeout
+
+# Parts of the composite vendor_ record and the component entries that hold them
+VENDOR_PARTS = {'overview': 'OVERVIEW', 'income_statement': 'INCOME_STATEMENT'}
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def content_hash(payload: str) -> str:
+    """Hash identifying an encoded cache payload"""
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 class AlphaVantageService:
     def __init__(self):
         self.key_manager = APIKeyManager()
-        self.base_url = 'https://www.alphavantage.co/query'
-        self.cache_db = 'cache.db'
-        self.init_cache()
-    
-    def init_cache(self):
-        """Initialize SQLite cache database"""
-        conn = sqlite3.connect(self.cache_db)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS api_cache (
-                key TEXT PRIMARY KEY,
-                data TEXT,
-                timestamp DATETIME
-            )
-        ''')
-        conn.commit()
-        conn.close()
-    
-    def get_cached_data(self, key: str) -> Optional[Dict]:
-        """Get cached data if it's less than 1 hour old"""
-        conn = sqlite3.connect(self.cache_db)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT data, timestamp FROM api_cache 
-            WHERE key = ? AND timestamp > datetime('now', '-1 hour')
-        ''', (key,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            import json
-            return json.loads(result[0])
+        self.base_url = os.environ.get('ALPHA_VANTAGE_BASE_URL', 'https://www.alphavantage.co/query')
+        # Pause after each upstream call (free tier allows 5 calls per minute)
+        self.request_delay = float(os.environ.get('ALPHA_VANTAGE_REQUEST_DELAY', '2'))
+        self._vendor_listeners = []  # Called with the symbol whenever vendor_ data is rewritten
+        # Failed lookups are remembered briefly, and repeated upstream failures
+        # open the breaker so error paths return without waiting on timeouts
+        self.negative_cache = NegativeCache(
+            ttl_seconds=float(os.environ.get('NEGATIVE_CACHE_TTL', '300'))
+        )
+        self.circuit_breaker = CircuitBreaker(
+            'alpha_vantage',
+            failure_threshold=int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '5')),
+            recovery_timeout=float(os.environ.get('CIRCUIT_RECOVERY_SECONDS', '60'))
+        )
+        # All upstream calls queue here so interactive requests go ahead of background refresh
+        self.scheduler = FetchScheduler(
+            self.key_manager.get_remaining_quota,
+            max_concurrent=int(os.environ.get('FETCH_MAX_CONCURRENT', '1')),
+            interactive_reserve=int(os.environ.get('FETCH_INTERACTIVE_RESERVE', '5'))
+        )
+        # Local SQLite by default; CACHE_BACKEND=redis shares one cache across replicas
+        self.cache = create_cache_backend()
+        # Statement reports and fields worth keeping; None parses and caches whole responses
+        self.statement_selection = selection_from_env()
+    
+    def get_cached_data(self, key: str, max_age_hours: Optional[float] = 1) -> Optional[Dict]:
+        """Get cached data if it's less than max_age_hours old (any age if None)"""
+        with span('cache.read', key=key, backend=self.cache.name) as read_span:
+            result = self.cache.get(key, max_age_hours)
+            read_span.set(hit=result is not None)
+        
+        if result is not None:
+            with span('cache.decode', key=key, bytes=len(result)):
+                return json_codec.loads(result)
         return None
     
     def cache_data(self, key: str, data: Dict):
         """Cache API response data"""
-        conn = sqlite3.connect(self.cache_db)
-        cursor = conn.cursor()
+        with span('cache.encode', key=key):
+            payload = json_codec.dumps_payload(data)
+        
+        with span('cache.write', key=key, bytes=len(payload), backend=self.cache.name):
+            self.cache.set(key, payload)
+        
+        self._record_vendor_changes([key])
+        if key.startswith('vendor_'):
+            self._notify_vendor_listeners(key[len('vendor_'):])
+    
+    def get_many_cached_data(self, keys: List[str], max_age_hours: Optional[float] = 1) -> Dict[str, Dict]:
+        """Batch form of get_cached_data: one storage round trip; misses are left out"""
+        with span('cache.read_many', keys=len(keys), backend=self.cache.name) as read_span:
+            results = self.cache.get_many(keys, max_age_hours)
+            read_span.set(hits=len(results))
+        
+        with span('cache.decode', keys=len(results), bytes=sum(len(p) for p in results.values())):
+            return {key: json_codec.loads(payload) for key, payload in results.items()}
+    
+    def cache_many_data(self, items: Dict[str, Dict]):
+        """Batch form of cache_data: one storage round trip"""
+        if not items:
+            return
+        with span('cache.encode', keys=len(items)):
+            payloads = {key: json_codec.dumps_payload(data) for key, data in items.items()}
         
-        import json
-        cursor.execute('''
-            INSERT OR REPLACE INTO api_cache (key, data, timestamp)
-            VALUES (?, ?, datetime('now'))
-        ''', (key, json.dumps(data)))
+        with span('cache.write_many', keys=len(items), bytes=sum(len(p) for p in payloads.values()),
+                  backend=self.cache.name):
+            self.cache.set_many(payloads)
         
-        conn.commit()
-        conn.close()
+        self._record_vendor_changes(list(items))
+        for key in items:
+            if key.startswith('vendor_'):
+                self._notify_vendor_listeners(key[len('vendor_'):])
+    
+    @staticmethod
+    def vendor_symbol_for_key(key: str) -> Optional[str]:
+        """Vendor whose data a cache key holds (composite or component), if any"""
+        if key.startswith('vendor_'):
+            return key[len('vendor_'):]
+        for function in VENDOR_PARTS.values():
+            if key.startswith(f"{function}_"):
+                return key[len(function) + 1:]
+        return None
+    
+    def _record_vendor_changes(self, keys: List[str], kind: str = 'updated'):
+        """Append to the change log behind /api/vendors/changes"""
+        symbols = list(dict.fromkeys(filter(None, map(self.vendor_symbol_for_key, keys))))
+        if not symbols:
+            return
+        try:
+            with span('cache.change_log', symbols=len(symbols)):
+                self.cache.append_changes([(symbol, kind) for symbol in symbols])
+        except Exception as e:
+            # The data itself was written; clients just see the change on a full reload
+            print(f"Error recording vendor changes: {str(e)}")
+    
+    def sync_vendor_universe(self, symbols: List[str]):
+        """Log symbols added to or dropped from the tracked vendor list since the last start"""
+        previous = self.get_cached_data('meta_vendor_universe', max_age_hours=None)
+        if previous is not None and previous.get('symbols') != symbols:
+            removed = [symbol for symbol in previous.get('symbols', []) if symbol not in symbols]
+            added = [symbol for symbol in symbols if symbol not in previous.get('symbols', [])]
+            if removed:
+                self._record_vendor_changes([f"vendor_{symbol}" for symbol in removed], kind='removed')
+            if added:
+                self._record_vendor_changes([f"vendor_{symbol}" for symbol in added])
+        # Rewritten every start so cache retention never drops it
+        self.cache_data('meta_vendor_universe', {'symbols': symbols})
+    
+    def add_vendor_listener(self, callback: Callable[[str], None]):
+        """Register a callback invoked with the symbol when a vendor's data changes"""
+        self._vendor_listeners.append(callback)
+    
+    def _notify_vendor_listeners(self, symbol: str):
+        for callback in self._vendor_listeners:
+            try:
+                callback(symbol)
+            except Exception as e:
+                print(f"Vendor listener failed for {symbol}: {str(e)}")
     
-    def make_api_request(self, function: str, symbol: str) -> Dict:
+    def make_api_request(self, function: str, symbol: str, deadline: Optional[Deadline] = None,
+                         priority: int = PRIORITY_INTERACTIVE, force_refresh: bool = False) -> Dict:
         """Make API request with caching, rate limiting, and key rotation"""
+        with span('make_api_request', function=function, symbol=symbol):
+            return self._make_api_request(function, symbol, deadline, priority, force_refresh)
+    
+    def _make_api_request(self, function: str, symbol: str, deadline: Optional[Deadline], priority: int,
+                          force_refresh: bool) -> Dict:
         cache_key = f"{function}_{symbol}"
         
         # Check cache first
-        cached_data = self.get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
+        if not force_refresh:
+            cached_data = self.get_cached_data(cache_key)
+            if cached_data:
+                return cached_data
+        
+        # Fail fast on lookups that failed recently or while the upstream is down
+        cached_failure = self.negative_cache.get(function, symbol)
+        if cached_failure:
+            raise Exception(f"{cached_failure} (cached failure)")
+        
+        # Don't start an upstream call the request can no longer wait for
+        if deadline:
+            deadline.check(f"{function} {symbol}")
+        
+        # Wait our turn behind more urgent fetches; identical queued fetches share one call
+        with span('fetch.queue', priority=priority):
+            return self.scheduler.run(
+                cache_key,
+                lambda: self._fetch_upstream(function, symbol, deadline, force_refresh),
+                priority,
+                deadline
+            )
+    
+    def _fetch_upstream(self, function: str, symbol: str, deadline: Optional[Deadline],
+                        force_refresh: bool = False) -> Dict:
+        """Call Alpha Vantage for one function/symbol; runs inside a scheduler slot"""
+        cache_key = f"{function}_{symbol}"
+        
+        # A fetch for the same key may have completed while we were queued
+        if not force_refresh:
+            cached_data = self.get_cached_data(cache_key)
+            if cached_data:
+                return cached_data
+        if deadline:
+            deadline.check(f"{function} {symbol}")
         
         # Get available API key
         api_key = self.key_manager.get_available_key()
         if not api_key:
             raise Exception("No available API keys - all keys are rate limited")
         
+        if not self.circuit_breaker.allow_request():
+            raise Exception(f"Alpha Vantage unavailable - circuit open, retry in "
+                            f"{self.circuit_breaker.retry_after():.0f}s")
+        
         # Make API request
         params = {
             'function': function,
@@ -81,13 +209,17 @@ class AlphaVantageService:
         }
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            with span('upstream.http', function=function, symbol=symbol):
+                response = self._get(function, params, deadline)
+            # Any well-formed HTTP response means the upstream itself is healthy
+            self.circuit_breaker.record_success()
+            data = self._read_json(function, response)
             
             # Check for API errors
             if 'Error Message' in data:
-                raise Exception(f"API Error: {data['Error Message']}")
+                message = f"API Error: {data['Error Message']}"
+                self.negative_cache.add(function, symbol, message)
+                raise Exception(message)
             
             # Check for rate limit messages in various fields
             rate_limit_message = None
@@ -106,9 +238,9 @@ class AlphaVantageService:
                 if next_api_key and next_api_key != api_key:
                     print(f"Retrying with key {next_api_key[:8]}...")
                     params['apikey'] = next_api_key
-                    response = requests.get(self.base_url, params=params, timeout=30)
-                    response.raise_for_status()
-                    data = response.json()
+                    with span('upstream.http', function=function, symbol=symbol, retry=True):
+                        response = self._get(function, params, deadline)
+                    data = self._read_json(function, response)
                     
                     # Check again for rate limit
                     if 'Information' in data and 'rate limit' in data['Information'].lower():
@@ -120,49 +252,238 @@ class AlphaVantageService:
             # Mark key as successful
             self.key_manager.mark_key_success(api_key)
             
-            # Check if we got valid data (not just rate limit info)
-            if not data or len(data) < 5:
-                raise Exception("API returned empty or invalid data")
+            # Check if we got valid data (not just rate limit info).
+            # Statement endpoints only return symbol and the selected report arrays.
+            if not data or (len(data) < 5 and not any(key in data for key in REPORT_KEYS)):
+                message = "API returned empty or invalid data"
+                self.negative_cache.add(function, symbol, message)
+                raise Exception(message)
             
             # Cache successful response
             self.cache_data(cache_key, data)
             
             # Rate limiting - Alpha Vantage allows 5 calls per minute
-            time.sleep(2)  # Wait 2 seconds between calls
+            with span('upstream.sleep'):
+                time.sleep(min(self.request_delay, deadline.remaining()) if deadline else self.request_delay)
             
             return data
             
+        except requests.exceptions.Timeout as e:
+            if deadline and deadline.nearly_spent():
+                # Cut short by our own budget, not an upstream failure
+                self.circuit_breaker.release()
+                raise DeadlineExceeded(f"Deadline reached waiting for {function} {symbol}: {str(e)}")
+            self.circuit_breaker.record_failure()
+            message = f"Request failed: {str(e)}"
+            self.negative_cache.add(function, symbol, message)
+            raise Exception(message)
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Request failed: {str(e)}")
+            self.circuit_breaker.record_failure()
+            message = f"Request failed: {str(e)}"
+            self.negative_cache.add(function, symbol, message)
+            raise Exception(message)
+    
+    def _streams(self, function: str) -> bool:
+        return self.statement_selection is not None and function in STATEMENT_FUNCTIONS
+    
+    def _get(self, function: str, params: Dict, deadline: Optional[Deadline]) -> requests.Response:
+        """GET the query URL; statement bodies are left unread for _read_json to stream"""
+        streamed = self._streams(function)
+        response = requests.get(self.base_url, params=params, timeout=clamp_timeout(deadline, 30), stream=streamed)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return response
+    
+    def _read_json(self, function: str, response: requests.Response) -> Dict:
+        """Decode a response body
+        
+        Statements are parsed as the body arrives, keeping only the reports and
+        fields in self.statement_selection, so neither the whole body nor the
+        quarterly reports are ever held in memory or written to the cache.
+        """
+        if not self._streams(function):
+            with span('upstream.json', bytes=len(response.content)):
+                return response.json()
+        
+        received = 0
+        def chunks():
+            nonlocal received
+            for chunk in response.iter_content(STREAM_CHUNK_BYTES):
+                received += len(chunk)
+                yield chunk
+        
+        with span('upstream.json', streamed=True) as json_span:
+            try:
+                return parse_statement(chunks(), self.statement_selection)
+            except ValueError as e:
+                # Same handling as a body response.json() cannot decode
+                raise requests.exceptions.InvalidJSONError(f"Invalid JSON in {function} response: {str(e)}")
+            finally:
+                response.close()
+                json_span.set(bytes=received)
     
-    def get_company_overview(self, symbol: str) -> Dict:
+    def get_company_overview(self, symbol: str, deadline: Optional[Deadline] = None,
+                             priority: int = PRIORITY_INTERACTIVE) -> Dict:
         """Get company overview data"""
-        return self.make_api_request('OVERVIEW', symbol)
+        return self.make_api_request('OVERVIEW', symbol, deadline, priority)
     
-    def get_income_statement(self, symbol: str) -> Dict:
+    def get_income_statement(self, symbol: str, deadline: Optional[Deadline] = None,
+                             priority: int = PRIORITY_INTERACTIVE) -> Dict:
         """Get annual income statement data"""
-        return self.make_api_request('INCOME_STATEMENT', symbol)
+        return self.make_api_request('INCOME_STATEMENT', symbol, deadline, priority)
     
-    def get_balance_sheet(self, symbol: str) -> Dict:
+    def get_balance_sheet(self, symbol: str, deadline: Optional[Deadline] = None,
+                          priority: int = PRIORITY_INTERACTIVE) -> Dict:
         """Get annual balance sheet data"""
-        return self.make_api_request('BALANCE_SHEET', symbol)
+        return self.make_api_request('BALANCE_SHEET', symbol, deadline, priority)
     
-    def get_cash_flow(self, symbol: str) -> Dict:
+    def get_cash_flow(self, symbol: str, deadline: Optional[Deadline] = None,
+                      priority: int = PRIORITY_INTERACTIVE) -> Dict:
         """Get annual cash flow data"""
-        return self.make_api_request('CASH_FLOW', symbol)
+        return self.make_api_request('CASH_FLOW', symbol, deadline, priority)
     
-    def get_vendor_data(self, symbol: str) -> Dict:
+    def get_degraded_vendor_data(self, symbol: str, reason: str) -> Dict:
+        """Best data available without going upstream: stale cache, else sample data"""
+        cached, rebuilt = self.read_vendor_cache([symbol], max_age_hours=None)
+        stale_data = cached.get(symbol) or rebuilt.get(symbol)
+        if stale_data and 'error' not in stale_data:
+            degraded_data = dict(stale_data)
+            degraded_data['source'] = 'stale_cache'
+        else:
+            from app.utils.sample_data import get_sample_vendor_data
+            sample_data = get_sample_vendor_data(symbol)
+            degraded_data = {
+                'overview': sample_data['overview'],
+                'income_statement': sample_data['income_statement'],
+                'symbol': symbol,
+                'last_updated': datetime.now().isoformat(),
+                'source': 'sample_data'
+            }
+        
+        # Not cached: the next request with budget to spare should fetch real data
+        degraded_data['degraded'] = True
+        degraded_data['warning'] = f"Showing {degraded_data['source'].replace('_', ' ')}: {reason}"
+        return degraded_data
+    
+    @staticmethod
+    def is_sample_data(data: Dict) -> bool:
+        """Whether a vendor record holds placeholder sample data rather than real figures"""
+        # Records cached before 'source' was set only carry the warning
+        return data.get('source') == 'sample_data' or 'sample data' in data.get('warning', '')
+    
+    @staticmethod
+    def build_vendor_data(symbol: str, overview: Dict, income_statement: Dict) -> Dict:
+        """Composite vendor record from its component payloads"""
+        return {
+            'overview': overview,
+            'income_statement': income_statement,
+            'symbol': symbol,
+            'last_updated': datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def vendor_manifest(vendor_data: Dict) -> Dict:
+        """vendor_ cache record that references its component entries instead of copying them"""
+        symbol = vendor_data['symbol']
+        manifest = {field: value for field, value in vendor_data.items() if field not in VENDOR_PARTS}
+        manifest['parts'] = {
+            part: {'key': f"{function}_{symbol}", 'sha256': content_hash(json_codec.dumps_payload(vendor_data[part]))}
+            for part, function in VENDOR_PARTS.items()
+        }
+        return manifest
+    
+    def cache_vendor_data(self, vendors: Dict[str, Dict]):
+        """Cache composite records (built from cached components) as manifests, in one batch"""
+        self.cache_many_data({
+            f"vendor_{symbol}": self.vendor_manifest(vendor_data) for symbol, vendor_data in vendors.items()
+        })
+    
+    def store_vendor_data(self, symbol: str, overview: Dict, income_statement: Dict) -> Dict:
+        """Build and cache the composite vendor record from its component payloads"""
+        vendor_data = self.build_vendor_data(symbol, overview, income_statement)
+        
+        # Cache the complete vendor data
+        self.cache_vendor_data({symbol: vendor_data})
+        return vendor_data
+    
+    def read_vendor_cache(self, symbols: List[str], max_age_hours: Optional[float] = 1) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """(cached, rebuilt) composites from one batched read
+
+        Each symbol's vendor_ record is read together with its component
+        entries. A manifest only counts as cached while every component it
+        references is present, fresh enough and unchanged (same content hash);
+        otherwise, if all components are cached, a fresh composite is rebuilt
+        from them (not yet written back).
+        """
+        keys = []
+        for symbol in symbols:
+            keys.append(f"vendor_{symbol}")
+            keys.extend(f"{function}_{symbol}" for function in VENDOR_PARTS.values())
+        
+        with span('cache.read_many', keys=len(keys), backend=self.cache.name) as read_span:
+            raw = self.cache.get_many(keys, max_age_hours)
+            read_span.set(hits=len(raw))
+        
+        cached, rebuilt = {}, {}
+        with span('cache.decode', keys=len(raw), bytes=sum(len(p) for p in raw.values())):
+            for symbol in symbols:
+                record = raw.get(f"vendor_{symbol}")
+                record = json_codec.loads(record) if record is not None else None
+                if record and 'parts' not in record:
+                    # Self-contained record (sample data, or written before manifests)
+                    cached[symbol] = record
+                    continue
+                
+                components = {part: raw.get(f"{function}_{symbol}") for part, function in VENDOR_PARTS.items()}
+                if any(payload is None for payload in components.values()):
+                    continue
+                vendor_data = {part: json_codec.loads(payload) for part, payload in components.items()}
+                if record and all(self._component_matches(components[part], vendor_data[part], record['parts'][part]['sha256'])
+                                  for part in VENDOR_PARTS):
+                    vendor_data.update((field, value) for field, value in record.items() if field != 'parts')
+                    cached[symbol] = vendor_data
+                else:
+                    rebuilt[symbol] = self.build_vendor_data(
+                        symbol, vendor_data['overview'], vendor_data['income_statement']
+                    )
+        return cached, rebuilt
+    
+    @staticmethod
+    def _component_matches(payload: str, data: Dict, sha256: str) -> bool:
+        """Whether a stored component is the one a manifest was built from
+
+        Components written in the older payload format hash differently from
+        a manifest built from them since, so those are re-encoded to compare.
+        """
+        return content_hash(payload) == sha256 or content_hash(json_codec.dumps_payload(data)) == sha256
+    
+    def is_cached(self, symbols: List[str], functions: Tuple[str, ...] = tuple(VENDOR_PARTS.values())) -> bool:
+        """Whether every component is cached and fresh, i.e. serving these symbols needs no upstream call"""
+        keys = [f"{function}_{symbol}" for symbol in symbols for function in functions]
+        return len(self.cache.get_many(keys, 1)) == len(keys)
+    
+    def get_vendor_data(self, symbol: str, deadline: Optional[Deadline] = None,
+                        priority: int = PRIORITY_INTERACTIVE) -> Dict:
         """Get comprehensive vendor data using multiple endpoints"""
         try:
             # Check if we already have cached vendor data
             vendor_cache_key = f"vendor_{symbol}"
-            cached_vendor_data = self.get_cached_data(vendor_cache_key)
-            if cached_vendor_data:
+            cached, rebuilt = self.read_vendor_cache([symbol])
+            if symbol in cached:
                 print(f"Using cached data for {symbol}")
-                return cached_vendor_data
+                return cached[symbol]
+            if symbol in rebuilt:
+                self.cache_vendor_data(rebuilt)
+                return rebuilt[symbol]
+            
+            if deadline:
+                deadline.check(f"fetching {symbol}")
             
             # Get overview data (contains key metrics)
-            overview = self.get_company_overview(symbol)
+            overview = self.get_company_overview(symbol, deadline, priority)
             
             # Check if we got rate limit response instead of real data
             if 'Information' in overview and 'rate limit' in overview['Information'].lower():
@@ -174,6 +495,7 @@ class AlphaVantageService:
                     'income_statement': sample_data['income_statement'],
                     'symbol': symbol,
                     'last_updated': datetime.now().isoformat(),
+                    'source': 'sample_data',
                     'warning': 'Using sample data due to API rate limit. Upgrade to premium for real-time data.'
                 }
                 
@@ -182,7 +504,7 @@ class AlphaVantageService:
                 return sample_vendor_data
             
             # Get income statement for additional financial data
-            income_statement = self.get_income_statement(symbol)
+            income_statement = self.get_income_statement(symbol, deadline, priority)
             
             # Check if we got rate limit response instead of real data
             if 'Information' in income_statement and 'rate limit' in income_statement['Information'].lower():
@@ -194,6 +516,7 @@ class AlphaVantageService:
                     'income_statement': sample_data['income_statement'],
                     'symbol': symbol,
                     'last_updated': datetime.now().isoformat(),
+                    'source': 'sample_data',
                     'warning': 'Using sample data due to API rate limit. Upgrade to premium for real-time data.'
                 }
                 
@@ -201,17 +524,11 @@ class AlphaVantageService:
                 self.cache_data(vendor_cache_key, sample_vendor_data)
                 return sample_vendor_data
             
-            vendor_data = {
-                'overview': overview,
-                'income_statement': income_statement,
-                'symbol': symbol,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            # Cache the complete vendor data
-            self.cache_data(vendor_cache_key, vendor_data)
-            return vendor_data
+            return self.store_vendor_data(symbol, overview, income_statement)
             
+        except DeadlineExceeded as e:
+            print(f"Deadline reached for {symbol}, degrading: {str(e)}")
+            return self.get_degraded_vendor_data(symbol, 'request deadline reached')
         except Exception as e:
             print(f"Exception in get_vendor_data for {symbol}: {str(e)}")
             # If API is rate limited, use sample data for demonstration
@@ -225,6 +542,7 @@ class AlphaVantageService:
                     'income_statement': sample_data['income_statement'],
                     'symbol': symbol,
                     'last_updated': datetime.now().isoformat(),
+                    'source': 'sample_data',
                     'warning': 'Using sample data due to API rate limit. Upgrade to premium for real-time data.'
                 }
                 
@@ -238,12 +556,87 @@ class AlphaVantageService:
                 'last_updated': datetime.now().isoformat()
             }
     
-    def get_all_vendors_data(self, symbols: List[str]) -> Dict:
-        """Get data for all vendor symbols"""
-        vendors_data = {}
+    def iter_vendors_data(self, symbols: List[str], deadline: Optional[Deadline] = None) -> Iterator[Tuple[str, Dict]]:
+        """Yield (symbol, data) for each vendor as soon as it is fetched
+
+        Cached vendors come first, read with one batched lookup that also
+        covers their component payloads; composites rebuilt from cached
+        components are written back in one batch. Only the rest go through
+        get_vendor_data one by one.
+        """
+        cached, rebuilt = self.read_vendor_cache(symbols)
+        for symbol in symbols:
+            if symbol in cached:
+                yield symbol, cached[symbol]
         
+        self.cache_vendor_data(rebuilt)
         for symbol in symbols:
-            print(f"Fetching data for {symbol}...")
-            vendors_data[symbol] = self.get_vendor_data(symbol)
+            if symbol in cached:
+                continue
+            if symbol in rebuilt:
+                yield symbol, rebuilt[symbol]
+            else:
+                print(f"Fetching data for {symbol}...")
+                yield symbol, self.get_vendor_data(symbol, deadline)
+    
+    def get_all_vendors_data(self, symbols: List[str], deadline: Optional[Deadline] = None) -> Dict:
+        """Get data for all vendor symbols, in the order given"""
+        results = dict(self.iter_vendors_data(symbols, deadline))
+        return {symbol: results[symbol] for symbol in symbols}
+    
+    def get_batch_data(self, symbols: List[str], data_types: List[str],
+                       deadline: Optional[Deadline] = None) -> Tuple[Dict[str, Dict], Dict[str, Dict], List[str]]:
+        """(payloads, errors, degraded) for every symbol and data type
+
+        Cache hits come from one batched read. Misses are fetched on as many
+        threads as the scheduler has upstream slots (FETCH_MAX_CONCURRENT, so
+        one at a time by default), and only as many as the remaining key quota
+        covers; anything skipped or failed falls back to a stale cache entry
+        when there is one (those symbols are listed as degraded).
+        """
+        keys = {(function, symbol): f"{function}_{symbol}" for symbol in symbols for function in data_types}
+        fresh = self.get_many_cached_data(list(keys.values()))
+        payloads = {symbol: {} for symbol in symbols}
+        errors = {}
+        misses = []
+        for (function, symbol), key in keys.items():
+            if key in fresh:
+                payloads[symbol][function] = fresh[key]
+            else:
+                misses.append((function, symbol))
+        
+        remaining_quota = self.key_manager.get_remaining_quota()
+        if remaining_quota is not None and len(misses) > remaining_quota:
+            for function, symbol in misses[remaining_quota:]:
+                errors.setdefault(symbol, {})[function] = "Not fetched - not enough API quota left today"
+            misses = misses[:remaining_quota]
+        
+        if misses:
+            workers = max(1, min(len(misses), self.scheduler.max_concurrent))
+            with span('batch.fetch', misses=len(misses), workers=workers):
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-fetch') as executor:
+                    # Each fetch runs in its own copy of the request context, so its spans join the trace
+                    futures = {
+                        executor.submit(contextvars.copy_context().run, self.make_api_request,
+                                        function, symbol, deadline): (function, symbol)
+                        for function, symbol in misses
+                    }
+                    for future in as_completed(futures):
+                        function, symbol = futures[future]
+                        try:
+                            payloads[symbol][function] = future.result()
+                        except Exception as e:
+                            errors.setdefault(symbol, {})[function] = str(e)
         
-        return vendors_data
+        degraded = []
+        failed = [keys[(function, symbol)] for symbol, failures in errors.items() for function in failures]
+        if failed:
+            stale = self.get_many_cached_data(failed, max_age_hours=None)
+            for symbol, failures in errors.items():
+                for function in failures:
+                    key = keys[(function, symbol)]
+                    if key in stale:
+                        payloads[symbol][function] = stale[key]
+                        if symbol not in degraded:
+                            degraded.append(symbol)
+        return payloads, errors, degraded
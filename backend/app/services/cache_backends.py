@@ -0,0 +1,941 @@
+"""
+Cache storage backends: local SQLite or a shared Redis-protocol server
+"""
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from queue import Empty, LifoQueue
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+# Same format as SQLite's datetime('now'), which is UTC
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+DATA_TYPE_LABELS = [
+    ('OVERVIEW_', 'Overview'),
+    ('INCOME_STATEMENT_', 'Income Statement'),
+    ('BALANCE_SHEET_', 'Balance Sheet'),
+    ('CASH_FLOW_', 'Cash Flow')
+]
+
+AGE_GROUPS = [
+    (1, 'Fresh (< 1h)'),
+    (6, 'Recent (< 6h)'),
+    (24, 'Stale (< 24h)')
+]
+
+
+def classify_key(key: str) -> str:
+    """Human-readable data type of a cache key"""
+    for prefix, label in DATA_TYPE_LABELS:
+        if key.startswith(prefix):
+            return label
+    return 'Other'
+
+
+def age_group(age_hours: float) -> str:
+    for limit, label in AGE_GROUPS:
+        if age_hours < limit:
+            return label
+    return 'Old (> 24h)'
+
+
+class CacheBackend:
+    """Storage for encoded cache payloads keyed by string
+
+    Payloads are stored as already-encoded strings; freshness is checked on
+    read so callers can ask for stale data when upstream is unavailable.
+    """
+
+    name = 'base'
+
+    def get(self, key: str, max_age_hours: Optional[float] = None) -> Optional[str]:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str], max_age_hours: Optional[float] = None) -> Dict[str, str]:
+        """Payloads for every key found (and fresh enough); missing keys are left out"""
+        result = {}
+        for key in keys:
+            payload = self.get(key, max_age_hours)
+            if payload is not None:
+                result[key] = payload
+        return result
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, str]]:
+        """(payload, timestamp) regardless of age"""
+        raise NotImplementedError
+
+    def set(self, key: str, payload: str):
+        raise NotImplementedError
+
+    def set_many(self, items: Dict[str, str], timestamps: Optional[Dict[str, str]] = None):
+        """Store several payloads at once
+
+        `timestamps` (TIMESTAMP_FORMAT, UTC) keeps the original write time of
+        bulk-loaded entries; keys without one are stamped now.
+        """
+        for key, payload in items.items():
+            self.set(key, payload)
+
+    def iter_entries(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, str]]:
+        """(key, payload, timestamp) for every entry, read in batches"""
+        raise NotImplementedError
+
+    def clear_older_than(self, hours: float) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> int:
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict:
+        raise NotImplementedError
+
+    def compact(self) -> Dict:
+        """Reclaim space held by expired entries (no-op where the store expires them itself)"""
+        return {'expired_deleted': 0, 'pages_freed': 0}
+
+    # Vendor change log behind /api/vendors/changes. Versions are shared by
+    # every process using the same store and never go backwards; clearing the
+    # cache leaves the log alone. Only the newest entries are kept.
+    CHANGE_LOG_MAX_ENTRIES = 100000
+
+    def append_changes(self, changes: List[Tuple[str, str]]) -> int:
+        """Record (symbol, kind) changes in order; returns the latest version"""
+        raise NotImplementedError
+
+    def get_changes(self, since: int, limit: int = 1000) -> Dict:
+        """Changes after version `since` as (version, symbol, kind), oldest first
+
+        Also returns `oldest_version` (first version still logged) and
+        `current_version`, so callers can tell when `since` has been trimmed.
+        """
+        raise NotImplementedError
+
+    def get_symbol_versions(self, symbols: List[str]) -> Dict[str, int]:
+        """Latest logged version per symbol (symbols never logged are left out)"""
+        raise NotImplementedError
+
+    def current_version(self) -> int:
+        return self.get_changes(0, limit=0)['current_version']
+
+    # Backends that need compaction set these in __init__
+    compaction_interval = 0.0
+    _compactor_pid = None
+    _compactor_lock = None
+
+    def _ensure_compactor(self):
+        """Start the compaction thread in this process (threads do not survive a fork)"""
+        if not self.compaction_interval or self._compactor_pid == os.getpid():
+            return
+        with self._compactor_lock:
+            if self._compactor_pid == os.getpid():
+                return
+            self._compactor_pid = os.getpid()
+            threading.Thread(target=self._compaction_loop, name='cache-compactor', daemon=True).start()
+
+    def _compaction_loop(self):
+        while True:
+            time.sleep(self.compaction_interval)
+            try:
+                result = self.compact()
+                if result['expired_deleted'] or result['pages_freed']:
+                    print(f"Cache compaction: removed {result['expired_deleted']} expired entries, "
+                          f"freed {result['pages_freed']} pages")
+            except Exception as e:
+                print(f"Cache compaction failed: {str(e)}")
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache in a local SQLite file (one per replica)
+
+    Rows carry their data type and expiry so maintenance queries use indexes.
+    Per-type and per-hour counters are kept up to date by triggers, which
+    keeps get_stats independent of the number of rows, and a background
+    thread purges expired rows and returns freed pages to the filesystem.
+    """
+
+    name = 'sqlite'
+
+    SCHEMA_VERSION = 2
+
+    # Stay well below SQLite's bound-parameter limit
+    MAX_KEYS_PER_QUERY = 500
+
+    # Expired rows are deleted in batches so writers are never blocked for long
+    COMPACTION_BATCH_SIZE = 5000
+
+    def __init__(self, db_path: str = 'cache.db', retention_hours: float = 168.0,
+                 compaction_interval: float = 3600.0):
+        self.db_path = db_path
+        self.retention_hours = retention_hours
+        self.compaction_interval = compaction_interval
+        self._compactor_pid = None
+        self._compactor_lock = threading.Lock()
+        self.init_cache()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.create_function('classify_key', 1, classify_key, deterministic=True)
+        return conn
+
+    def init_cache(self):
+        """Initialize SQLite cache database, migrating older layouts in place"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        if cursor.execute('PRAGMA user_version').fetchone()[0] >= self.SCHEMA_VERSION:
+            conn.close()
+            return
+
+        # Incremental vacuum only applies once set; VACUUM rewrites an existing file to enable it
+        if cursor.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+
+        cursor.execute('BEGIN IMMEDIATE')
+        # Another process may have migrated while we waited for the lock
+        if cursor.execute('PRAGMA user_version').fetchone()[0] >= self.SCHEMA_VERSION:
+            conn.rollback()
+            conn.close()
+            return
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS api_cache (
+                key TEXT PRIMARY KEY,
+                data TEXT,
+                timestamp DATETIME,
+                data_type TEXT,
+                expires_at DATETIME
+            )
+        ''')
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(api_cache)')}
+        if 'data_type' not in columns:
+            cursor.execute('ALTER TABLE api_cache ADD COLUMN data_type TEXT')
+        if 'expires_at' not in columns:
+            cursor.execute('ALTER TABLE api_cache ADD COLUMN expires_at DATETIME')
+        cursor.execute('''
+            UPDATE api_cache
+            SET data_type = classify_key(key), expires_at = datetime(timestamp, ?)
+            WHERE data_type IS NULL OR expires_at IS NULL
+        ''', (f'+{self.retention_hours} hours',))
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_cache_timestamp ON api_cache (timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_cache_expires_at ON api_cache (expires_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_cache_data_type ON api_cache (data_type)')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS api_cache_counts (
+                data_type TEXT PRIMARY KEY,
+                entries INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS api_cache_hours (
+                hour TEXT PRIMARY KEY,
+                entries INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        for statement in self._trigger_statements():
+            cursor.execute(statement)
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vendor_changes (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                changed_at DATETIME
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vendor_changes_symbol ON vendor_changes (symbol, version)')
+
+        # One full pass to seed the counters; triggers keep them current afterwards
+        cursor.execute('DELETE FROM api_cache_counts')
+        cursor.execute('''
+            INSERT INTO api_cache_counts (data_type, entries, bytes)
+            SELECT data_type, COUNT(*), COALESCE(SUM(length(CAST(data AS BLOB))), 0)
+            FROM api_cache GROUP BY data_type
+        ''')
+        cursor.execute('DELETE FROM api_cache_hours')
+        cursor.execute('''
+            INSERT INTO api_cache_hours (hour, entries)
+            SELECT strftime('%Y-%m-%d %H', timestamp), COUNT(*)
+            FROM api_cache GROUP BY 1
+        ''')
+
+        cursor.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _trigger_statements() -> List[str]:
+        add = '''
+                INSERT INTO api_cache_counts (data_type, entries, bytes)
+                VALUES (NEW.data_type, 1, length(CAST(NEW.data AS BLOB)))
+                ON CONFLICT (data_type) DO UPDATE SET
+                    entries = entries + 1, bytes = bytes + length(CAST(NEW.data AS BLOB));
+                INSERT INTO api_cache_hours (hour, entries)
+                VALUES (strftime('%Y-%m-%d %H', NEW.timestamp), 1)
+                ON CONFLICT (hour) DO UPDATE SET entries = entries + 1;
+        '''
+        remove = '''
+                UPDATE api_cache_counts
+                SET entries = entries - 1, bytes = bytes - length(CAST(OLD.data AS BLOB))
+                WHERE data_type IS OLD.data_type;
+                UPDATE api_cache_hours SET entries = entries - 1
+                WHERE hour = strftime('%Y-%m-%d %H', OLD.timestamp);
+                DELETE FROM api_cache_hours
+                WHERE hour = strftime('%Y-%m-%d %H', OLD.timestamp) AND entries <= 0;
+        '''
+        return [
+            f'CREATE TRIGGER IF NOT EXISTS api_cache_after_insert AFTER INSERT ON api_cache BEGIN {add} END',
+            f'CREATE TRIGGER IF NOT EXISTS api_cache_after_delete AFTER DELETE ON api_cache BEGIN {remove} END',
+            f'CREATE TRIGGER IF NOT EXISTS api_cache_after_update AFTER UPDATE ON api_cache BEGIN {remove} {add} END'
+        ]
+
+    def get(self, key: str, max_age_hours: Optional[float] = None) -> Optional[str]:
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        if max_age_hours is None:
+            cursor.execute('''
+                SELECT data FROM api_cache
+                WHERE key = ?
+            ''', (key,))
+        else:
+            cursor.execute('''
+                SELECT data FROM api_cache
+                WHERE key = ? AND timestamp > datetime('now', ?)
+            ''', (key, f'-{max_age_hours} hours'))
+
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else None
+
+    def get_many(self, keys: List[str], max_age_hours: Optional[float] = None) -> Dict[str, str]:
+        result = {}
+        conn = self._connect()
+        cursor = conn.cursor()
+        for start in range(0, len(keys), self.MAX_KEYS_PER_QUERY):
+            chunk = keys[start:start + self.MAX_KEYS_PER_QUERY]
+            placeholders = ','.join('?' * len(chunk))
+            if max_age_hours is None:
+                cursor.execute(f'''
+                    SELECT key, data FROM api_cache
+                    WHERE key IN ({placeholders})
+                ''', chunk)
+            else:
+                cursor.execute(f'''
+                    SELECT key, data FROM api_cache
+                    WHERE key IN ({placeholders}) AND timestamp > datetime('now', ?)
+                ''', [*chunk, f'-{max_age_hours} hours'])
+            result.update(cursor.fetchall())
+        conn.close()
+        return result
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, str]]:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT data, timestamp FROM api_cache
+            WHERE key = ?
+        ''', (key,))
+        result = cursor.fetchone()
+        conn.close()
+        return tuple(result) if result else None
+
+    # Upsert rather than INSERT OR REPLACE: REPLACE deletes the old row without
+    # firing delete triggers, which would leave the counters out of step
+    UPSERT_SQL = '''
+        INSERT INTO api_cache (key, data, timestamp, data_type, expires_at)
+        VALUES (?, ?, COALESCE(?, datetime('now')), ?, datetime(COALESCE(?, 'now'), ?))
+        ON CONFLICT (key) DO UPDATE SET
+            data = excluded.data,
+            timestamp = excluded.timestamp,
+            data_type = excluded.data_type,
+            expires_at = excluded.expires_at
+    '''
+
+    def set(self, key: str, payload: str):
+        self.set_many({key: payload})
+
+    def set_many(self, items: Dict[str, str], timestamps: Optional[Dict[str, str]] = None):
+        self._ensure_compactor()
+        expires = f'+{self.retention_hours} hours'
+        timestamps = timestamps or {}
+        # One transaction (and one fsync) for the whole batch
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.executemany(self.UPSERT_SQL, [
+            (key, payload, timestamps.get(key), classify_key(key), timestamps.get(key), expires)
+            for key, payload in items.items()
+        ])
+        conn.commit()
+        conn.close()
+
+    def iter_entries(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, str]]:
+        conn = self._connect()
+        try:
+            cursor = conn.execute('SELECT key, data, timestamp FROM api_cache ORDER BY key')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def clear_older_than(self, hours: float) -> int:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            DELETE FROM api_cache
+            WHERE timestamp < datetime('now', ?)
+        ''', (f'-{hours} hours',))
+        deleted_count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted_count
+
+    def clear(self) -> int:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM api_cache')
+        deleted_count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted_count
+
+    def compact(self) -> Dict:
+        """Purge rows past expires_at, then release free pages"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        deleted = 0
+        while True:
+            cursor.execute('''
+                DELETE FROM api_cache WHERE rowid IN (
+                    SELECT rowid FROM api_cache
+                    WHERE expires_at < datetime('now')
+                    LIMIT ?
+                )
+            ''', (self.COMPACTION_BATCH_SIZE,))
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < self.COMPACTION_BATCH_SIZE:
+                break
+
+        # Keep the newest change-log entries; AUTOINCREMENT never reuses versions
+        cursor.execute('''
+            DELETE FROM vendor_changes
+            WHERE version <= (SELECT seq FROM sqlite_sequence WHERE name = 'vendor_changes') - ?
+        ''', (self.CHANGE_LOG_MAX_ENTRIES,))
+        conn.commit()
+
+        free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+        if free_pages:
+            # executescript steps the pragma to completion; execute() frees a single page
+            conn.executescript('PRAGMA incremental_vacuum;')
+        conn.close()
+        return {'expired_deleted': deleted, 'pages_freed': free_pages}
+
+    @staticmethod
+    def _current_version(cursor: sqlite3.Cursor) -> int:
+        row = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'vendor_changes'").fetchone()
+        return row[0] if row else 0
+
+    def append_changes(self, changes: List[Tuple[str, str]]) -> int:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO vendor_changes (symbol, kind, changed_at)
+            VALUES (?, ?, datetime('now'))
+        ''', changes)
+        version = self._current_version(cursor)
+        conn.commit()
+        conn.close()
+        return version
+
+    def get_changes(self, since: int, limit: int = 1000) -> Dict:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT version, symbol, kind FROM vendor_changes
+            WHERE version > ?
+            ORDER BY version LIMIT ?
+        ''', (since, limit))
+        changes = cursor.fetchall()
+        current_version = self._current_version(cursor)
+        oldest = cursor.execute('SELECT MIN(version) FROM vendor_changes').fetchone()[0]
+        conn.close()
+        return {
+            'changes': changes,
+            'oldest_version': oldest if oldest is not None else current_version + 1,
+            'current_version': current_version
+        }
+
+    def get_symbol_versions(self, symbols: List[str]) -> Dict[str, int]:
+        result = {}
+        conn = self._connect()
+        cursor = conn.cursor()
+        for start in range(0, len(symbols), self.MAX_KEYS_PER_QUERY):
+            chunk = symbols[start:start + self.MAX_KEYS_PER_QUERY]
+            cursor.execute(f'''
+                SELECT symbol, MAX(version) FROM vendor_changes
+                WHERE symbol IN ({','.join('?' * len(chunk))})
+                GROUP BY symbol
+            ''', chunk)
+            result.update(cursor.fetchall())
+        conn.close()
+        return result
+
+    def get_stats(self) -> Dict:
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        # Entries by type, from the trigger-maintained counters
+        cursor.execute('SELECT data_type, entries, bytes FROM api_cache_counts WHERE entries > 0')
+        counts = cursor.fetchall()
+        entries_by_type = {data_type: entries for data_type, entries, _ in counts}
+        total_entries = sum(entries_by_type.values())
+
+        # Recent entries (walks the timestamp index backwards)
+        cursor.execute('''
+            SELECT key, timestamp FROM api_cache
+            ORDER BY timestamp DESC LIMIT 10
+        ''')
+        recent_entries = cursor.fetchall()
+
+        # Cache age distribution, to the hour, from the per-hour counters
+        cursor.execute('SELECT hour, entries FROM api_cache_hours')
+        hours = cursor.fetchall()
+        page_count = cursor.execute('PRAGMA page_count').fetchone()[0]
+        page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+        free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+
+        conn.close()
+
+        now = datetime.now(timezone.utc)
+        age_distribution = {}
+        for hour, entries in hours:
+            if not hour:
+                continue
+            started = datetime.strptime(hour, '%Y-%m-%d %H').replace(tzinfo=timezone.utc)
+            # Place each hour by its midpoint
+            group = age_group((now - started).total_seconds() / 3600 - 0.5)
+            age_distribution[group] = age_distribution.get(group, 0) + entries
+
+        return {
+            'total_entries': total_entries,
+            'entries_by_type': entries_by_type,
+            'recent_entries': recent_entries,
+            'age_distribution': age_distribution,
+            'cache_size_mb': page_count * page_size / (1024 * 1024),
+            'payload_size_mb': sum(size for _, _, size in counts) / (1024 * 1024),
+            'free_pages': free_pages
+        }
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+    pass
+
+
+class _RespConnection:
+    """One socket speaking RESP2"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    def send(self, commands: List[Tuple]):
+        chunks = []
+        for command in commands:
+            chunks.append(b'*%d\r\n' % len(command))
+            for arg in command:
+                if not isinstance(arg, bytes):
+                    arg = str(arg).encode('utf-8')
+                chunks.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self.sock.sendall(b''.join(chunks))
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError('Connection closed by cache server')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode('utf-8')
+        if kind == b'-':
+            return RespError(rest.decode('utf-8'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            if count < 0:
+                return None
+            return [self.read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply from cache server: {line[:40]!r}")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RespClient:
+    """Minimal pooled Redis-protocol client (commands and pipelines)"""
+
+    def __init__(self, url: str, timeout: float = 2.0, pool_size: int = 16):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._pool = LifoQueue(maxsize=pool_size)
+
+    def _connect(self) -> _RespConnection:
+        conn = _RespConnection(self.host, self.port, self.timeout)
+        setup = []
+        if self.password:
+            setup.append(('AUTH', self.password))
+        if self.db:
+            setup.append(('SELECT', self.db))
+        if setup:
+            conn.send(setup)
+            for _ in setup:
+                reply = conn.read_reply()
+                if isinstance(reply, RespError):
+                    conn.close()
+                    raise reply
+        return conn
+
+    def _checkout(self) -> _RespConnection:
+        try:
+            return self._pool.get_nowait()
+        except Empty:
+            return self._connect()
+
+    def _checkin(self, conn: _RespConnection):
+        try:
+            self._pool.put_nowait(conn)
+        except Exception:
+            conn.close()
+
+    @staticmethod
+    def _round_trip(conn: _RespConnection, commands: List[Tuple]) -> List:
+        try:
+            conn.send(commands)
+            return [conn.read_reply() for _ in commands]
+        except (OSError, ConnectionError):
+            # The stream may be out of sync; never reuse this socket
+            conn.close()
+            raise
+
+    def pipeline(self, commands: List[Tuple]) -> List:
+        """Send all commands in one round trip; error replies are returned, not raised"""
+        conn = self._checkout()
+        replies = self._round_trip(conn, commands)
+        self._checkin(conn)
+        return replies
+
+    def transaction(self, watch: Tuple, reads: List[Tuple],
+                    build: Callable[[List], Optional[List[Tuple]]], attempts: int = 100) -> Optional[List]:
+        """Run `build(replies to reads)` atomically unless a key in `watch` changes first
+
+        Uses WATCH/MULTI/EXEC on one connection and starts over from the reads
+        whenever another client wrote a watched key in between. Returns the
+        replies to the built commands, or None if `build` returned None.
+        """
+        conn = self._checkout()
+        try:
+            for attempt in range(attempts):
+                if attempt:
+                    # Back off with jitter so contending writers stop colliding
+                    time.sleep(random.uniform(0, 0.001 * 2 ** min(attempt, 6)))
+                replies = self._round_trip(conn, [('WATCH', *watch), *reads])
+                for reply in replies:
+                    if isinstance(reply, RespError):
+                        raise reply
+                commands = build(replies[1:])
+                if commands is None:
+                    self._round_trip(conn, [('UNWATCH',)])
+                    break
+                result = self._round_trip(conn, [('MULTI',), *commands, ('EXEC',)])[-1]
+                if isinstance(result, RespError):
+                    raise result
+                if result is not None:
+                    errors = [reply for reply in result if isinstance(reply, RespError)]
+                    if errors:
+                        raise errors[0]
+                    break
+            else:
+                raise RespError(f"Transaction on {watch[0]} kept conflicting after {attempts} attempts")
+        except BaseException:
+            # It may still be inside MULTI or watching keys
+            conn.close()
+            raise
+        self._checkin(conn)
+        return result if commands is not None else None
+
+    def execute(self, *command):
+        reply = self.pipeline([command])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def scan_keys(self, pattern: str, count: int = 1000):
+        """Iterate over keys matching `pattern` without blocking the server"""
+        cursor = b'0'
+        while True:
+            cursor, keys = self.execute('SCAN', cursor, 'MATCH', pattern, 'COUNT', count)
+            for key in keys:
+                yield key.decode('utf-8')
+            if cursor in (b'0', 0):
+                break
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every replica, on any Redis-protocol server
+
+    Values are stored as "<unix timestamp>|<payload>" with a server-side TTL of
+    `retention_hours`; freshness is still checked on read so stale entries stay
+    available for degraded responses until the server expires them.
+    """
+
+    name = 'redis'
+
+    MAX_KEYS_PER_BATCH = 1000
+
+    def __init__(self, url: str, prefix: str = 'windborne:', retention_hours: float = 168.0,
+                 timeout: float = 2.0, compaction_interval: float = 3600.0):
+        self.url = url
+        self.prefix = prefix
+        self.retention_seconds = int(retention_hours * 3600)
+        self.client = RespClient(url, timeout=timeout)
+        self.compaction_interval = compaction_interval
+        self._compactor_pid = None
+        self._compactor_lock = threading.Lock()
+        # Change log: a list of "symbol|kind" whose position gives the version,
+        # a count of entries trimmed from its head, and the latest version per symbol
+        self.changes_key = f"{prefix}meta:changes"
+        self.trimmed_key = f"{prefix}meta:changes:trimmed"
+        self.latest_key = f"{prefix}meta:changes:latest"
+
+    def _encode(self, payload: str, stored_at: Optional[float] = None) -> bytes:
+        stored_at = time.time() if stored_at is None else stored_at
+        return f"{stored_at:.3f}|".encode('utf-8') + payload.encode('utf-8')
+
+    @staticmethod
+    def _decode(value: bytes) -> Tuple[float, str]:
+        stamp, _, payload = value.partition(b'|')
+        return float(stamp), payload.decode('utf-8')
+
+    @staticmethod
+    def _fresh(stored_at: float, max_age_hours: Optional[float]) -> bool:
+        return max_age_hours is None or time.time() - stored_at < max_age_hours * 3600
+
+    def get(self, key: str, max_age_hours: Optional[float] = None) -> Optional[str]:
+        return self.get_many([key], max_age_hours).get(key)
+
+    def get_many(self, keys: List[str], max_age_hours: Optional[float] = None) -> Dict[str, str]:
+        result = {}
+        try:
+            batches = [keys[i:i + self.MAX_KEYS_PER_BATCH] for i in range(0, len(keys), self.MAX_KEYS_PER_BATCH)]
+            replies = self.client.pipeline([('MGET', *(self.prefix + key for key in batch)) for batch in batches])
+        except (OSError, ConnectionError, RespError) as e:
+            # A cache outage should cost upstream calls, not failed requests
+            print(f"Cache read failed ({self.url}): {str(e)}")
+            return result
+
+        for batch, values in zip(batches, replies):
+            if isinstance(values, RespError):
+                print(f"Cache read failed ({self.url}): {str(values)}")
+                continue
+            for key, value in zip(batch, values):
+                if value is None:
+                    continue
+                stored_at, payload = self._decode(value)
+                if self._fresh(stored_at, max_age_hours):
+                    result[key] = payload
+        return result
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, str]]:
+        value = self.client.execute('GET', self.prefix + key)
+        if value is None:
+            return None
+        stored_at, payload = self._decode(value)
+        return payload, datetime.fromtimestamp(stored_at, timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+    def set(self, key: str, payload: str):
+        try:
+            self.client.execute('SET', self.prefix + key, self._encode(payload), 'EX', self.retention_seconds)
+        except (OSError, ConnectionError, RespError) as e:
+            print(f"Cache write failed ({self.url}): {str(e)}")
+
+    def set_many(self, items: Dict[str, str], timestamps: Optional[Dict[str, str]] = None):
+        now = time.time()
+        commands = []
+        for key, payload in items.items():
+            stored_at = now
+            if timestamps and timestamps.get(key):
+                stored_at = datetime.strptime(timestamps[key], TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+            ttl = int(self.retention_seconds - (now - stored_at))
+            if ttl > 0:  # Already past retention: the server would expire it at once
+                commands.append(('SET', self.prefix + key, self._encode(payload, stored_at), 'EX', ttl))
+        if not commands:
+            return
+        try:
+            replies = self.client.pipeline(commands)
+        except (OSError, ConnectionError, RespError) as e:
+            print(f"Cache write failed ({self.url}): {str(e)}")
+            return
+        errors = [reply for reply in replies if isinstance(reply, RespError)]
+        if errors:
+            print(f"Cache write failed for {len(errors)} keys ({self.url}): {str(errors[0])}")
+
+    def _entry_keys(self) -> List[str]:
+        """Full keys of every cache entry, leaving out the change log and its counters"""
+        return [key for key in self.client.scan_keys(self.prefix + '*') if not key.startswith(self.changes_key)]
+
+    def _scan_entries(self):
+        """(key, stored_at, size) for every cache entry"""
+        keys = self._entry_keys()
+        for start in range(0, len(keys), self.MAX_KEYS_PER_BATCH):
+            batch = keys[start:start + self.MAX_KEYS_PER_BATCH]
+            values = self.client.execute('MGET', *batch)
+            for full_key, value in zip(batch, values):
+                if value is not None:
+                    stored_at, _ = self._decode(value)
+                    yield full_key[len(self.prefix):], stored_at, len(value)
+
+    def iter_entries(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, str]]:
+        keys = self._entry_keys()
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            for full_key, value in zip(batch, self.client.execute('MGET', *batch)):
+                if value is not None:
+                    stored_at, payload = self._decode(value)
+                    yield (full_key[len(self.prefix):], payload,
+                           datetime.fromtimestamp(stored_at, timezone.utc).strftime(TIMESTAMP_FORMAT))
+
+    def _delete(self, keys: List[str]) -> int:
+        deleted = 0
+        for start in range(0, len(keys), self.MAX_KEYS_PER_BATCH):
+            deleted += self.client.execute('DEL', *(self.prefix + key for key in keys[start:start + self.MAX_KEYS_PER_BATCH]))
+        return deleted
+
+    def clear_older_than(self, hours: float) -> int:
+        cutoff = time.time() - hours * 3600
+        return self._delete([key for key, stored_at, _ in self._scan_entries() if stored_at < cutoff])
+
+    def clear(self) -> int:
+        return self._delete([key for key, _, _ in self._scan_entries()])
+
+    def compact(self) -> Dict:
+        # Entries expire server-side; only the change log needs trimming. The trim
+        # and the trimmed count move together, so versions never shift under readers
+        def trim(replies):
+            excess = replies[0] - self.CHANGE_LOG_MAX_ENTRIES
+            if excess <= 0:
+                return None
+            return [('LTRIM', self.changes_key, excess, -1), ('INCRBY', self.trimmed_key, excess)]
+
+        self.client.transaction((self.changes_key,), [('LLEN', self.changes_key)], trim)
+        return {'expired_deleted': 0, 'pages_freed': 0}
+
+    def append_changes(self, changes: List[Tuple[str, str]]) -> int:
+        # Only the log grows without bound, so appends are what start the compactor
+        self._ensure_compactor()
+        entries = [f"{symbol}|{kind}" for symbol, kind in changes]
+        first_version = []
+
+        def push(replies):
+            length, trimmed = replies
+            first_version[:] = [int(trimmed or 0) + length + 1]
+            latest = {}
+            for offset, (symbol, _) in enumerate(changes):
+                latest[symbol] = first_version[0] + offset
+            return [
+                ('RPUSH', self.changes_key, *entries),
+                ('HSET', self.latest_key, *(item for pair in latest.items() for item in pair))
+            ]
+
+        # Versions come from the log's position, so the push and the per-symbol
+        # versions are only written if no other writer moved the log meanwhile
+        self.client.transaction((self.changes_key, self.trimmed_key),
+                                [('LLEN', self.changes_key), ('GET', self.trimmed_key)], push)
+        return first_version[0] + len(changes) - 1
+
+    def get_changes(self, since: int, limit: int = 1000) -> Dict:
+        trimmed, length = self.client.pipeline([('GET', self.trimmed_key), ('LLEN', self.changes_key)])
+        trimmed = int(trimmed or 0)
+        current_version = trimmed + length
+        start = max(0, since - trimmed)
+        entries = self.client.execute('LRANGE', self.changes_key, start, start + limit - 1) if limit > 0 else []
+        changes = []
+        for index, entry in enumerate(entries):
+            symbol, _, kind = entry.decode('utf-8').partition('|')
+            changes.append((trimmed + start + index + 1, symbol, kind))
+        return {
+            'changes': changes,
+            'oldest_version': trimmed + 1 if length else current_version + 1,
+            'current_version': current_version
+        }
+
+    def get_symbol_versions(self, symbols: List[str]) -> Dict[str, int]:
+        if not symbols:
+            return {}
+        values = self.client.execute('HMGET', self.latest_key, *symbols)
+        return {symbol: int(value) for symbol, value in zip(symbols, values) if value is not None}
+
+    def get_stats(self) -> Dict:
+        now = time.time()
+        entries = list(self._scan_entries())
+        entries_by_type, age_distribution = {}, {}
+        for key, stored_at, _ in entries:
+            data_type = classify_key(key)
+            entries_by_type[data_type] = entries_by_type.get(data_type, 0) + 1
+            group = age_group((now - stored_at) / 3600)
+            age_distribution[group] = age_distribution.get(group, 0) + 1
+        recent = sorted(entries, key=lambda entry: entry[1], reverse=True)[:10]
+        return {
+            'total_entries': len(entries),
+            'entries_by_type': entries_by_type,
+            'recent_entries': [
+                (key, datetime.fromtimestamp(stored_at, timezone.utc).strftime(TIMESTAMP_FORMAT))
+                for key, stored_at, _ in recent
+            ],
+            'age_distribution': age_distribution,
+            'cache_size_mb': sum(size for _, _, size in entries) / (1024 * 1024)
+        }
+
+
+def create_cache_backend() -> CacheBackend:
+    """Backend selected by CACHE_BACKEND ('sqlite' or 'redis')"""
+    backend = os.environ.get('CACHE_BACKEND', 'sqlite').lower()
+    if backend == 'redis':
+        return RedisCacheBackend(
+            os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+            prefix=os.environ.get('CACHE_REDIS_PREFIX', 'windborne:'),
+            retention_hours=float(os.environ.get('CACHE_RETENTION_HOURS', '168')),
+            compaction_interval=float(os.environ.get('CACHE_COMPACTION_INTERVAL_SECONDS', '3600'))
+        )
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown CACHE_BACKEND '{backend}' (expected 'sqlite' or 'redis')")
+    return SQLiteCacheBackend(
+        os.environ.get('CACHE_DB_PATH', 'cache.db'),
+        retention_hours=float(os.environ.get('CACHE_RETENTION_HOURS', '168')),
+        compaction_interval=float(os.environ.get('CACHE_COMPACTION_INTERVAL_SECONDS', '3600'))
+    )
@@ -0,0 +1,160 @@
+"""
+Circuit breaker and negative cache for failing upstream calls
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker guarding one upstream service"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.total_failures = 0
+        self.rejected_calls = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go upstream right now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self._set_state(self.HALF_OPEN)
+
+            # Half-open lets a single trial call through to probe the upstream
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self._set_state(self.OPEN)
+
+    def release(self):
+        """Give back a half-open trial slot without recording an outcome"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker will allow a trial call"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked whenever the breaker changes state"""
+        self._listeners.append(callback)
+
+    def _set_state(self, state: str):
+        print(f"Circuit breaker '{self.name}': {self.state} -> {state}")
+        self.state = state
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Circuit breaker listener failed: {str(e)}")
+
+    def get_state(self) -> Dict:
+        return {
+            'name': self.name,
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'failure_threshold': self.failure_threshold,
+            'total_failures': self.total_failures,
+            'rejected_calls': self.rejected_calls,
+            'retry_after_seconds': round(self.retry_after(), 1)
+        }
+
+
+class NegativeCache:
+    """Short-lived memory of failed (function, symbol) lookups"""
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}  # (function, symbol) -> (expires_at, message, recorded_at)
+        self._hits = 0
+        self._lock = threading.Lock()
+
+    def get(self, function: str, symbol: str) -> Optional[str]:
+        """Return the cached failure message if the lookup failed recently"""
+        key = (function, symbol)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                del self._entries[key]
+                return None
+            self._hits += 1
+            return entry[1]
+
+    def add(self, function: str, symbol: str, message: str):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._purge_expired()
+            if len(self._entries) < self.max_entries:
+                self._entries[(function, symbol)] = (
+                    time.monotonic() + self.ttl_seconds, message, datetime.now().isoformat()
+                )
+
+    def discard(self, function: str, symbol: str):
+        with self._lock:
+            self._entries.pop((function, symbol), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if now >= entry[0]]
+        for key in expired:
+            del self._entries[key]
+
+    def get_stats(self, limit: int = 50) -> Dict:
+        with self._lock:
+            self._purge_expired()
+            # Most recent failures first; the full set can be large during an outage
+            recent = sorted(self._entries.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+            total = len(self._entries)
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'entries': total,
+            'hits': self._hits,
+            'failures': {
+                f"{function}_{symbol}": {'error': message, 'recorded_at': recorded_at}
+                for (function, symbol), (_, message, recorded_at) in recent
+            }
+        }
@@ -0,0 +1,104 @@
+"""
+In-process pub/sub broker for pushing change notifications to browsers
+"""
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from app.utils import json_codec
+
+
+class Subscription:
+    """One connected client's bounded message queue"""
+
+    def __init__(self, max_queue: int):
+        self.messages = queue.Queue(maxsize=max_queue)
+        self.lagged = False
+
+    def deliver(self, message: str):
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            # Slow client: drop its backlog and ask it to re-fetch everything
+            self.lagged = True
+
+    def next_message(self, timeout: float) -> Optional[str]:
+        if self.lagged:
+            self.lagged = False
+            while not self.messages.empty():
+                try:
+                    self.messages.get_nowait()
+                except queue.Empty:
+                    break
+            return EventBroker.format_message('resync', {})
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """Broadcasts key-state changes and vendor data-version bumps to subscribers"""
+
+    def __init__(self, max_queue: int = 100, keepalive_seconds: float = 15.0):
+        self.max_queue = max_queue
+        self.keepalive_seconds = keepalive_seconds
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._vendor_versions = {}
+        self._version = 0
+
+    @staticmethod
+    def format_message(event: str, payload: Dict) -> str:
+        """Format one Server-Sent Events message"""
+        return f"event: {event}\ndata: {json_codec.dumps_response(payload).decode('utf-8')}\n\n"
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event: str, payload: Dict):
+        """Serialize once and hand the same message to every subscriber"""
+        message = self.format_message(event, payload)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def publish_vendor_change(self, symbol: str):
+        """Bump a vendor's data version and notify subscribers"""
+        with self._lock:
+            self._version += 1
+            self._vendor_versions[symbol] = self._version
+            version = self._version
+        self.publish('vendor', {
+            'symbol': symbol,
+            'version': version,
+            'timestamp': datetime.now().isoformat()
+        })
+
+    def get_vendor_versions(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._vendor_versions)
+
+    def stream(self, subscription: Subscription, initial: Dict) -> Iterator[str]:
+        """Yield SSE messages for one client until it disconnects"""
+        try:
+            yield self.format_message('hello', initial)
+            while True:
+                message = subscription.next_message(self.keepalive_seconds)
+                # Comment lines keep proxies from closing an idle connection
+                yield message if message is not None else ': keepalive\n\n'
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,202 @@
+"""
+Priority scheduler for upstream fetches
+"""
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREFETCH = 1
+PRIORITY_BACKFILL = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_PREFETCH: 'prefetch',
+    PRIORITY_BACKFILL: 'backfill'
+}
+
+
+class _Ticket:
+    """A queued upstream fetch, shared by every caller asking for the same key
+
+    Callers keep their own deadlines: whoever holds the ticket when a slot
+    frees up runs the fetch, and the ticket is only dropped once every caller
+    waiting on it has given up.
+    """
+
+    def __init__(self, key: str, priority: int):
+        self.key = key
+        self.priority = priority
+        self.future = Future()
+        self.started = False
+        self.waiters = 0
+        self.enqueued_at = time.monotonic()
+
+
+class FetchScheduler:
+    """Runs upstream fetches one slot at a time, most urgent first
+
+    Callers run their fetch on their own thread once admitted, so request
+    context (tracing, deadlines) is kept. Identical queued fetches are
+    deduplicated, and background classes only run while the remaining key
+    quota stays above the reserve kept for interactive requests.
+    """
+
+    def __init__(self, remaining_quota: Callable[[], Optional[int]], max_concurrent: int = 1,
+                 interactive_reserve: int = 5):
+        self.remaining_quota = remaining_quota
+        self.max_concurrent = max_concurrent
+        self.interactive_reserve = interactive_reserve
+        self._heap = []  # (priority, seq, ticket); stale entries are skipped lazily
+        self._tickets = {}  # key -> queued or running ticket
+        self._active = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # Last read of remaining_quota(); it is only ever called with _cond released,
+        # since the key manager calls listeners that read get_stats() under its own lock
+        self._quota = None
+        self._stats = {'completed': 0, 'failed': 0, 'deduplicated': 0, 'expired': 0, 'quota_waits': 0}
+
+    def run(self, key: str, fetch: Callable[[], Dict], priority: int = PRIORITY_INTERACTIVE,
+            deadline: Optional[Deadline] = None) -> Dict:
+        """Run `fetch` when a slot is free, or join an identical queued fetch
+
+        Each caller waits only as long as its own `deadline` allows; a caller
+        that gives up leaves the ticket to the others.
+        """
+        quota = self.remaining_quota() if priority != PRIORITY_INTERACTIVE else None
+        with self._cond:
+            if priority != PRIORITY_INTERACTIVE:
+                self._quota = quota
+            ticket = self._tickets.get(key)
+            if ticket is not None:
+                self._stats['deduplicated'] += 1
+                if priority < ticket.priority and not ticket.started:
+                    ticket.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), ticket))
+                    self._cond.notify_all()
+            else:
+                ticket = _Ticket(key, priority)
+                self._tickets[key] = ticket
+                heapq.heappush(self._heap, (priority, next(self._seq), ticket))
+            ticket.waiters += 1
+            self._wait_for_turn(ticket, deadline)
+
+        if ticket.future.done():
+            # Someone else fetched this key while we waited
+            return ticket.future.result()
+
+        try:
+            result = fetch()
+        except DeadlineExceeded:
+            # Our own budget ran out; callers with time left may still fetch it
+            self._requeue(ticket)
+            raise
+        except Exception as e:
+            ticket.future.set_exception(e)
+            self._finish(ticket, failed=True)
+            raise
+        ticket.future.set_result(result)
+        self._finish(ticket, failed=False)
+        return result
+
+    def _wait_for_turn(self, ticket: _Ticket, deadline: Optional[Deadline]):
+        """Wait (holding the lock) until the result is in or this caller gets the slot"""
+        while not ticket.future.done():
+            if ticket.started:
+                # Another caller is fetching; its result is worth waiting for to the end
+                if deadline is not None and deadline.remaining() <= 0:
+                    self._leave(ticket, f"Deadline reached waiting for queued fetch of {ticket.key}")
+            elif deadline is not None and deadline.nearly_spent():
+                self._leave(ticket, f"Deadline reached while queued for {ticket.key}")
+            elif self._active < self.max_concurrent and self._peek() is ticket:
+                if self._has_quota_for(ticket.priority):
+                    heapq.heappop(self._heap)
+                    ticket.started = True
+                    self._active += 1
+                    return
+                self._stats['quota_waits'] += 1
+
+            timeout = 1.0
+            if deadline is not None:
+                spare = deadline.remaining() - (0 if ticket.started else deadline.reserve)
+                timeout = min(timeout, max(0.001, spare))
+            self._cond.wait(timeout)
+            if not ticket.started and ticket.priority != PRIORITY_INTERACTIVE:
+                self._reread_quota()
+
+    def _reread_quota(self):
+        """Refresh the cached quota from inside the wait loop, letting go of _cond meanwhile"""
+        self._cond.release()
+        try:
+            quota = self.remaining_quota()
+        finally:
+            self._cond.acquire()
+        self._quota = quota
+
+    def _leave(self, ticket: _Ticket, message: str):
+        """Give up on a ticket; it is dropped once no caller is left waiting for it"""
+        ticket.waiters -= 1
+        if not ticket.waiters and not ticket.started:
+            self._stats['expired'] += 1
+            self._tickets.pop(ticket.key, None)
+            ticket.started = True  # Marks its heap entries stale
+            self._cond.notify_all()
+        raise DeadlineExceeded(message)
+
+    def _requeue(self, ticket: _Ticket):
+        """Put a ticket back in line after its fetcher ran out of time mid-fetch"""
+        with self._cond:
+            self._active -= 1
+            ticket.waiters -= 1
+            if ticket.waiters:
+                ticket.started = False
+                heapq.heappush(self._heap, (ticket.priority, next(self._seq), ticket))
+            else:
+                self._tickets.pop(ticket.key, None)
+                self._stats['expired'] += 1
+            self._cond.notify_all()
+
+    def _peek(self) -> Optional[_Ticket]:
+        """Most urgent live ticket, dropping stale heap entries"""
+        while self._heap:
+            priority, _, ticket = self._heap[0]
+            if ticket.started or priority != ticket.priority:
+                heapq.heappop(self._heap)
+                continue
+            return ticket
+        return None
+
+    def _has_quota_for(self, priority: int) -> bool:
+        if priority == PRIORITY_INTERACTIVE:
+            return True
+        return self._quota is None or self._quota > self.interactive_reserve
+
+    def _finish(self, ticket: _Ticket, failed: bool):
+        with self._cond:
+            self._active -= 1
+            self._tickets.pop(ticket.key, None)
+            self._stats['failed' if failed else 'completed'] += 1
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        remaining_quota = self.remaining_quota()
+        with self._cond:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for ticket in self._tickets.values():
+                if not ticket.started:
+                    queued[PRIORITY_NAMES.get(ticket.priority, str(ticket.priority))] += 1
+            return {
+                'active': self._active,
+                'max_concurrent': self.max_concurrent,
+                'queued': queued,
+                'interactive_reserve': self.interactive_reserve,
+                'remaining_quota': remaining_quota,
+                **self._stats
+            }
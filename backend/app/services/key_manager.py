@@ -3,7 +3,8 @@ API Key Management and Rotation System
 """
 import os
 import random
-from typing import List, Optional
+import threading
+from typing import Callable, List, Optional
 from datetime import datetime, timedelta
 
 class APIKeyManager:
@@ -14,6 +15,13 @@ class APIKeyManager:
         self.key_usage = {}  # Track usage per key
         self.key_blacklist = {}  # Track blacklisted keys and their reset time
         self.current_key_index = 0
+        # Free-tier keys allow a fixed number of calls per day
+        self.daily_limit = int(os.environ.get('ALPHA_VANTAGE_DAILY_LIMIT', '25'))
+        self.daily_usage = {}  # Calls per key index since daily_usage_date
+        self.daily_usage_date = datetime.now().date()
+        # Request threads share one manager under the gthread worker
+        self._lock = threading.RLock()
+        self._listeners = []  # Called whenever key availability changes
         
     def _load_api_keys(self) -> List[str]:
         """Load API keys from environment variables"""
@@ -44,27 +52,33 @@ class APIKeyManager:
         if not self.keys:
             return None
         
-        # Filter out blacklisted keys
-        available_keys = []
-        current_time = datetime.now()
-        
-        for i, key in enumerate(self.keys):
-            if i not in self.key_blacklist or current_time > self.key_blacklist[i]:
-                available_keys.append((i, key))
-        
-        if not available_keys:
-            # All keys are blacklisted, reset blacklist
-            print("All keys blacklisted, resetting blacklist...")
-            self.key_blacklist.clear()
-            available_keys = [(i, key) for i, key in enumerate(self.keys)]
-        
-        if not available_keys:
-            return None
-        
-        # Use round-robin selection
-        selected_index, selected_key = available_keys[self.current_key_index % len(available_keys)]
-        self.current_key_index += 1
+        reset = False
+        with self._lock:
+            # Filter out blacklisted keys
+            available_keys = []
+            current_time = datetime.now()
+            
+            for i, key in enumerate(self.keys):
+                if i not in self.key_blacklist or current_time > self.key_blacklist[i]:
+                    available_keys.append((i, key))
+            
+            if not available_keys:
+                # All keys are blacklisted, reset blacklist
+                print("All keys blacklisted, resetting blacklist...")
+                self.key_blacklist.clear()
+                available_keys = [(i, key) for i, key in enumerate(self.keys)]
+                reset = True
+            
+            if available_keys:
+                # Use round-robin selection
+                selected_index, selected_key = available_keys[self.current_key_index % len(available_keys)]
+                self.current_key_index += 1
+            else:
+                selected_key = None
         
+        if reset:
+            # Outside the lock: listeners read state (e.g. the fetch queue) guarded by other locks
+            self._notify_listeners()
         return selected_key
     
     def mark_key_rate_limited(self, key: str):
@@ -72,8 +86,10 @@ class APIKeyManager:
         try:
             key_index = self.keys.index(key)
             # Blacklist for 24 hours (rate limit resets daily)
-            self.key_blacklist[key_index] = datetime.now() + timedelta(hours=24)
+            with self._lock:
+                self.key_blacklist[key_index] = datetime.now() + timedelta(hours=24)
             print(f"Key {key[:8]}... blacklisted due to rate limit until {self.key_blacklist[key_index]}")
+            self._notify_listeners()
         except ValueError:
             print(f"Key {key[:8]}... not found in key list")
     
@@ -81,13 +97,33 @@ class APIKeyManager:
         """Mark a key as successfully used"""
         try:
             key_index = self.keys.index(key)
-            if key_index in self.key_usage:
-                self.key_usage[key_index] += 1
-            else:
-                self.key_usage[key_index] = 1
+            with self._lock:
+                self.key_usage[key_index] = self.key_usage.get(key_index, 0) + 1
+                self._roll_daily_usage()
+                self.daily_usage[key_index] = self.daily_usage.get(key_index, 0) + 1
         except ValueError:
             pass
     
+    def _roll_daily_usage(self):
+        today = datetime.now().date()
+        if today != self.daily_usage_date:
+            self.daily_usage.clear()
+            self.daily_usage_date = today
+    
+    def get_remaining_quota(self) -> Optional[int]:
+        """Calls left today across keys that are not blacklisted (None if no keys)"""
+        if not self.keys:
+            return None
+        with self._lock:
+            self._roll_daily_usage()
+            current_time = datetime.now()
+            remaining = 0
+            for i in range(len(self.keys)):
+                if i in self.key_blacklist and current_time <= self.key_blacklist[i]:
+                    continue
+                remaining += max(0, self.daily_limit - self.daily_usage.get(i, 0))
+            return remaining
+    
     def get_key_stats(self) -> dict:
         """Get usage statistics for all keys"""
         current_time = datetime.now()
@@ -101,6 +137,7 @@ class APIKeyManager:
             'available_keys': available_count,
             'blacklisted_keys': len(self.key_blacklist),
             'key_usage': self.key_usage.copy(),
+            'remaining_quota_today': self.get_remaining_quota(),
             'blacklist_expiry': {str(k): v.isoformat() for k, v in self.key_blacklist.items()}
         }
         return stats
@@ -109,15 +146,29 @@ class APIKeyManager:
         """Reset all blacklisted keys (useful for testing)"""
         self.key_blacklist.clear()
         print("Blacklist reset - all keys available again")
+        self._notify_listeners()
     
     def add_key(self, key: str):
         """Add a new API key to the rotation"""
         if key and key not in self.keys:
             self.keys.append(key.strip())
             print(f"Added new API key: {key[:8]}...")
+            self._notify_listeners()
     
     def remove_key(self, key: str):
         """Remove an API key from rotation"""
         if key in self.keys:
             self.keys.remove(key)
             print(f"Removed API key: {key[:8]}...")
+            self._notify_listeners()
+    
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback invoked whenever key availability changes"""
+        self._listeners.append(callback)
+    
+    def _notify_listeners(self):
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Key state listener failed: {str(e)}")
@@ -0,0 +1,186 @@
+"""
+Background bulk refresh jobs with progress tracking
+"""
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .fetch_scheduler import PRIORITY_BACKFILL
+
+REFRESHABLE_DATA_TYPES = ['OVERVIEW', 'INCOME_STATEMENT', 'BALANCE_SHEET', 'CASH_FLOW']
+
+
+class RefreshJob:
+    """Progress of one bulk refresh request"""
+
+    def __init__(self, symbols: List[str], data_types: List[str]):
+        self.id = uuid.uuid4().hex
+        self.symbols = symbols
+        self.data_types = data_types
+        self.status = 'queued'
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        self.progress = OrderedDict(
+            (symbol, {'status': 'pending', 'completed': [], 'failed': {}}) for symbol in symbols
+        )
+        self.calls_done = 0
+        self.call_seconds = 0.0
+
+    @property
+    def total_calls(self) -> int:
+        return len(self.symbols) * len(self.data_types)
+
+    @property
+    def remaining_calls(self) -> int:
+        return sum(
+            len(self.data_types) - len(p['completed']) - len(p['failed'])
+            for p in self.progress.values()
+        )
+
+    def to_dict(self, eta_seconds: Optional[float], include_symbols: bool = True) -> Dict:
+        failed = {symbol: dict(p['failed']) for symbol, p in self.progress.items() if p['failed']}
+        counts = {}
+        for p in self.progress.values():
+            counts[p['status']] = counts.get(p['status'], 0) + 1
+
+        result = {
+            'id': self.id,
+            'status': self.status,
+            'data_types': self.data_types,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'total_symbols': len(self.symbols),
+            'symbol_counts': counts,
+            'total_calls': self.total_calls,
+            'remaining_calls': self.remaining_calls,
+            'percent_complete': round(100 * (1 - self.remaining_calls / self.total_calls), 1) if self.total_calls else 100.0,
+            'eta_seconds': round(eta_seconds, 1) if eta_seconds is not None else None,
+            'failures': failed
+        }
+        if include_symbols:
+            # Copy: the job thread keeps mutating progress while we serialize
+            result['symbols'] = {
+                symbol: {'status': p['status'], 'completed': list(p['completed']), 'failed': dict(p['failed'])}
+                for symbol, p in list(self.progress.items())
+            }
+        return result
+
+
+class RefreshJobManager:
+    """Runs refresh jobs on a background executor at backfill priority"""
+
+    def __init__(self, service, max_workers: int = 1, max_jobs_kept: int = 100):
+        self.service = service
+        self.max_jobs_kept = max_jobs_kept
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='refresh-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, symbols: List[str], data_types: List[str]) -> RefreshJob:
+        job = RefreshJob(symbols, data_types)
+        with self._lock:
+            self._jobs[job.id] = job
+            # Forget the oldest finished jobs
+            while len(self._jobs) > self.max_jobs_kept:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status in ('queued', 'running'):
+                    break
+                del self._jobs[oldest_id]
+        self._executor.submit(self._run, job)
+        print(f"Queued refresh job {job.id} for {len(symbols)} symbols x {len(data_types)} data types")
+        return job
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[RefreshJob]:
+        job = self.get(job_id)
+        if job and job.status in ('queued', 'running'):
+            job.cancel_requested = True
+        return job
+
+    def list_jobs(self) -> List[RefreshJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self, job: RefreshJob):
+        job.status = 'running'
+        job.started_at = datetime.now()
+
+        for symbol, progress in job.progress.items():
+            if job.cancel_requested:
+                break
+            progress['status'] = 'running'
+            fetched = {}
+
+            for data_type in job.data_types:
+                if job.cancel_requested:
+                    break
+                start = time.monotonic()
+                try:
+                    fetched[data_type] = self.service.make_api_request(
+                        data_type, symbol, priority=PRIORITY_BACKFILL, force_refresh=True
+                    )
+                    progress['completed'].append(data_type)
+                except Exception as e:
+                    progress['failed'][data_type] = str(e)
+                job.calls_done += 1
+                job.call_seconds += time.monotonic() - start
+
+            # Keep the composite record the dashboard reads in step with its parts
+            if 'OVERVIEW' in fetched and 'INCOME_STATEMENT' in fetched:
+                self.service.store_vendor_data(symbol, fetched['OVERVIEW'], fetched['INCOME_STATEMENT'])
+
+            if progress['failed']:
+                progress['status'] = 'failed' if not progress['completed'] else 'partial'
+            elif progress['completed']:
+                progress['status'] = 'done'
+            else:
+                progress['status'] = 'cancelled'
+
+        job.finished_at = datetime.now()
+        if job.cancel_requested:
+            job.status = 'cancelled'
+        elif any(p['failed'] for p in job.progress.values()):
+            job.status = 'completed_with_errors'
+        else:
+            job.status = 'completed'
+        print(f"Refresh job {job.id} {job.status}: {job.calls_done}/{job.total_calls} calls")
+
+    def estimate_seconds_remaining(self, job: RefreshJob) -> Optional[float]:
+        """ETA from observed call time and the key budget left today"""
+        if job.status not in ('queued', 'running'):
+            return 0.0 if job.finished_at else None
+
+        remaining = job.remaining_calls
+        if remaining == 0:
+            return 0.0
+
+        key_manager = self.service.key_manager
+        seconds_per_call = (job.call_seconds / job.calls_done) if job.calls_done else self.service.request_delay + 1.0
+        remaining_quota = key_manager.get_remaining_quota()
+        if remaining_quota is None:
+            return None
+
+        # Backfill leaves part of the quota for interactive requests
+        usable_today = max(0, remaining_quota - self.service.scheduler.interactive_reserve)
+        if remaining <= usable_today:
+            return remaining * seconds_per_call
+
+        # The rest waits for the daily quota to reset
+        daily_capacity = max(1, key_manager.daily_limit * len(key_manager.keys) - self.service.scheduler.interactive_reserve)
+        now = datetime.now()
+        next_reset = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        overflow = remaining - usable_today
+        extra_days = math.ceil(overflow / daily_capacity) - 1
+        return ((next_reset - now).total_seconds() + extra_days * 86400
+                + usable_today * seconds_per_call + (overflow - extra_days * daily_capacity) * seconds_per_call)
@@ -0,0 +1,244 @@
+"""
+Read-only memory-mapped snapshot of pre-encoded vendor responses
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.utils import json_codec
+
+# Header: magic, format version, generation, created_at (unix), index offset, index length
+SNAPSHOT_MAGIC = b'VSNP'
+SNAPSHOT_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHxxQdQQ')
+# WSGI servers only accept bytes, so entries are sent as copies of slices this size
+SNAPSHOT_CHUNK_BYTES = 64 * 1024
+
+
+def write_snapshot(path: str, entries: Dict[str, bytes], generation: int,
+                   still_current: Optional[Callable[[], bool]] = None) -> int:
+    """Write `entries` (name -> encoded bytes) and atomically swap it into `path`
+
+    Returns the number of bytes written, or 0 if `still_current()` turned
+    false while the file was written (it is then never published).
+    """
+    index = {}
+    offset = _HEADER.size
+    for name, blob in entries.items():
+        index[name] = [offset, len(blob)]
+        offset += len(blob)
+    index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, generation, time.time(),
+                             offset, len(index_bytes)))
+        for blob in entries.values():
+            f.write(blob)
+        f.write(index_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    if still_current is not None and not still_current():
+        os.remove(tmp_path)
+        return 0
+    # Readers still holding the old mapping keep the old inode until they remap
+    os.replace(tmp_path, path)
+    return offset + len(index_bytes)
+
+
+class _Mapping:
+    """One mapped snapshot file and its decoded index"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.inode = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        self.size = stat.st_size
+
+        magic, version, self.generation, self.created_at, index_offset, index_length = \
+            _HEADER.unpack_from(self.mm, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+            self.mm.close()
+            raise ValueError(f"Unsupported snapshot format in {path}")
+        self.index = json.loads(self.mm[index_offset:index_offset + index_length])
+
+    def get(self, name: str) -> Optional[memoryview]:
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+        offset, length = entry
+        # The view keeps the map alive after a remap drops this _Mapping
+        return memoryview(self.mm)[offset:offset + length]
+
+
+class VendorSnapshot:
+    """Shared snapshot file that every worker maps read-only
+
+    The file holds fully encoded response bodies, so serving from it costs a
+    view of the page cache rather than a decode, analysis and re-encode per
+    worker. Writers swap in a new file atomically; readers notice the swap by
+    stat-ing the path at most every `check_interval` seconds and remap.
+
+    `data_version` reads a version that every process's cache writes advance
+    (the vendor change log). A build is only published if it is unchanged, so
+    an invalidation in another worker is noticed even when there was no file
+    for it to remove.
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 3600.0, check_interval: float = 1.0,
+                 data_version: Optional[Callable[[], int]] = None):
+        self.path = path
+        self.data_version = data_version
+        self.max_age_seconds = max_age_seconds
+        self.check_interval = check_interval
+        self._mapping = None
+        self._checked_at = 0.0
+        self._invalidations = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'remaps': 0, 'writes': 0}
+
+    def _current(self) -> Optional[_Mapping]:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._mapping
+
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._mapping
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                # Invalidated (or never written); drop our mapping
+                self._mapping = None
+                return None
+
+            mapping = self._mapping
+            if mapping is None or mapping.inode != (stat.st_dev, stat.st_ino, stat.st_mtime_ns):
+                try:
+                    # The old mapping is released once in-flight readers drop it
+                    self._mapping = _Mapping(self.path)
+                    self._stats['remaps'] += 1
+                except (OSError, ValueError) as e:
+                    print(f"Error mapping snapshot {self.path}: {str(e)}")
+                    self._mapping = None
+            return self._mapping
+
+    def get(self, name: str) -> Optional[memoryview]:
+        """Read-only view of the bytes stored under `name` (not copied), or None if missing or expired"""
+        mapping = self._current()
+        if mapping is None or time.time() - mapping.created_at > self.max_age_seconds:
+            self._stats['misses'] += 1
+            return None
+        blob = mapping.get(name)
+        self._stats['hits' if blob is not None else 'misses'] += 1
+        return blob
+
+    def has(self, name: str) -> bool:
+        """Whether get(name) would hit, without counting it"""
+        mapping = self._current()
+        return mapping is not None and time.time() - mapping.created_at <= self.max_age_seconds and name in mapping.index
+
+    def begin_build(self) -> tuple:
+        """Token to pass to write(); lets it detect invalidations during a build"""
+        return (self._invalidations, self._file_identity(), self._data_version())
+
+    def _data_version(self):
+        if self.data_version is None:
+            return None
+        try:
+            return self.data_version()
+        except Exception as e:
+            print(f"Error reading data version for snapshot {self.path}: {str(e)}")
+            # Never equal to anything, so the build is not published
+            return object()
+
+    def _file_identity(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+    def write(self, entries: Dict[str, bytes], token: tuple) -> bool:
+        """Publish a new snapshot to every worker unless the data changed since begin_build()"""
+        if token != self.begin_build():
+            # Built from data that has since been refreshed here or in another worker
+            return False
+        self._checked_at = 0.0
+        mapping = self._current()
+        generation = max(mapping.generation if mapping else 0, self._generation) + 1
+        # Checked again just before the swap: the data may have changed while we wrote
+        size = write_snapshot(self.path, entries, generation, lambda: token == self.begin_build())
+        if not size:
+            return False
+        if self._data_version() != token[2]:
+            # Changed between that check and the swap; take back what we published
+            self.invalidate()
+            return False
+        self._generation = generation
+        self._stats['writes'] += 1
+        self._checked_at = 0.0
+        print(f"Wrote vendor snapshot generation {generation} ({size} bytes)")
+        return True
+
+    def invalidate(self, *_):
+        """Remove the snapshot so every worker falls back to the cache"""
+        self._invalidations += 1
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._checked_at = 0.0
+
+    def get_stats(self) -> Dict:
+        mapping = self._current()
+        return {
+            'path': self.path,
+            'generation': mapping.generation if mapping else None,
+            'size_bytes': mapping.size if mapping else 0,
+            'age_seconds': round(time.time() - mapping.created_at, 1) if mapping else None,
+            'max_age_seconds': self.max_age_seconds,
+            'entries': len(mapping.index) if mapping else 0,
+            **self._stats
+        }
+
+
+def iter_chunks(view: memoryview, size: int = SNAPSHOT_CHUNK_BYTES) -> Iterator[bytes]:
+    """A snapshot entry as bytes, copied out one chunk at a time as the server sends it"""
+    for start in range(0, len(view), size):
+        yield bytes(view[start:start + size])
+
+
+def encode_response(payload: Dict) -> bytes:
+    """Encode a response body the way jsonify serves it"""
+    return json_codec.dumps_response(payload)
+
+
+def build_vendor_entries(vendors_data: Dict, analysis: Dict, vendor_analyses: Dict[str, Dict],
+                         degraded: List[str], version: int) -> Dict[str, bytes]:
+    """Pre-encode the /vendors and /vendors/<symbol> responses for a snapshot"""
+    entries = {
+        'vendors': encode_response({
+            'success': True,
+            'data': {
+                'vendors': vendors_data,
+                'analysis': analysis,
+                'version': version
+            },
+            'degraded': degraded
+        })
+    }
+    for symbol, vendor_data in vendors_data.items():
+        entries[f"vendor/{symbol}"] = encode_response({
+            'success': True,
+            'data': vendor_data,
+            'analysis': vendor_analyses[symbol]
+        })
+    return entries
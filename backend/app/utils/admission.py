@@ -0,0 +1,221 @@
+"""
+Admission control: per-route-class concurrency limits with a bounded wait queue
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from flask import current_app, g, jsonify, request
+
+
+class RouteClass:
+    """Concurrency limit and bounded FIFO wait queue for one class of routes
+
+    Requests over `max_concurrent` wait up to `queue_timeout` seconds, in
+    arrival order, while fewer than `max_queue` are already waiting; the rest
+    are turned away at once rather than tying up a worker thread.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiting = deque()
+        self._cond = threading.Condition()
+        self._hold_seconds = None  # Moving average of how long a slot is held
+        self._stats = {'admitted': 0, 'queued': 0, 'bypassed': 0, 'shed_queue_full': 0, 'shed_timeout': 0}
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting in line if there is room; False if the request should be shed"""
+        with self._cond:
+            if self._active < self.max_concurrent and not self._waiting:
+                self._active += 1
+                self._stats['admitted'] += 1
+                return True
+            if len(self._waiting) >= self.max_queue:
+                self._stats['shed_queue_full'] += 1
+                return False
+
+            ticket = object()
+            self._waiting.append(ticket)
+            self._stats['queued'] += 1
+            expires_at = time.monotonic() + self.queue_timeout
+            try:
+                while self._waiting[0] is not ticket or self._active >= self.max_concurrent:
+                    remaining = expires_at - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['shed_timeout'] += 1
+                        return False
+                    self._cond.wait(remaining)
+                self._active += 1
+                self._stats['admitted'] += 1
+                return True
+            finally:
+                self._waiting.remove(ticket)
+                # The next in line may now be at the head
+                self._cond.notify_all()
+
+    def release(self, held_seconds: float):
+        with self._cond:
+            self._active -= 1
+            self._hold_seconds = held_seconds if self._hold_seconds is None else \
+                0.8 * self._hold_seconds + 0.2 * held_seconds
+            self._cond.notify_all()
+
+    def bypass(self):
+        with self._cond:
+            self._stats['bypassed'] += 1
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new arrival, by recent hold times"""
+        with self._cond:
+            hold = self._hold_seconds if self._hold_seconds is not None else self.queue_timeout
+            ahead = len(self._waiting) + 1
+        return min(60, max(1, math.ceil(hold * ahead / self.max_concurrent)))
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                'active': self._active,
+                'waiting': len(self._waiting),
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'queue_timeout_seconds': self.queue_timeout,
+                'avg_hold_seconds': round(self._hold_seconds, 3) if self._hold_seconds is not None else None,
+                **self._stats
+            }
+
+
+class _Slot:
+    """A held slot, released exactly once"""
+
+    def __init__(self, route_class: RouteClass):
+        self.route_class = route_class
+        self.started = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self.route_class.release(time.monotonic() - self.started)
+
+
+def limited(class_name: str, cheap: Optional[Callable[[], bool]] = None):
+    """Put a view in an admission class; `cheap()` returning True lets a request skip the limit
+
+    Apply below @route, so the registered view carries the attributes.
+    """
+    def decorate(view):
+        view.admission_class = class_name
+        view.admission_cheap = cheap
+        return view
+    return decorate
+
+
+def release_admission():
+    """Give back this request's slot before its response has been sent
+
+    For generator bodies (wrapped in stream_with_context) that are done with
+    their upstream work but may still spend a long time writing to a slow
+    client. Releasing twice is harmless.
+    """
+    slot = g.pop('admission_slot', None) or g.pop('admission_streaming_slot', None)
+    if slot is not None:
+        slot.release()
+
+
+def get_admission_stats() -> Optional[Dict]:
+    classes = current_app.extensions.get('admission')
+    if classes is None:
+        return None
+    return {name: route_class.get_stats() for name, route_class in classes.items()}
+
+
+def init_admission(app):
+    """Register admission hooks for the classes configured in app.config
+
+    Views without a class (health checks, cached and cache-only reads) are
+    never limited.
+    """
+    if not app.config.get('ADMISSION_ENABLED', True):
+        return
+
+    classes = {
+        'upstream': RouteClass(
+            'upstream',
+            app.config['ADMISSION_UPSTREAM_CONCURRENCY'],
+            app.config['ADMISSION_UPSTREAM_QUEUE'],
+            app.config['ADMISSION_QUEUE_TIMEOUT_SECONDS']
+        ),
+        'stream': RouteClass(
+            'stream',
+            app.config['ADMISSION_STREAM_CONCURRENCY'],
+            0,
+            0.0
+        )
+    }
+    app.extensions['admission'] = classes
+
+    @app.before_request
+    def _admit():
+        view = app.view_functions.get(request.endpoint)
+        route_class = classes.get(getattr(view, 'admission_class', None))
+        if route_class is None:
+            return None
+
+        cheap = getattr(view, 'admission_cheap', None)
+        if cheap is not None:
+            try:
+                is_cheap = cheap()
+            except Exception as e:
+                print(f"Admission check for {request.endpoint} failed: {str(e)}")
+                is_cheap = False
+            if is_cheap:
+                route_class.bypass()
+                return None
+
+        started = time.monotonic()
+        admitted = route_class.acquire()
+        # Time spent in line comes out of the request's deadline budget
+        g.admission_wait = time.monotonic() - started
+        if admitted:
+            g.admission_slot = _Slot(route_class)
+            return None
+
+        retry_after = route_class.retry_after()
+        response = jsonify({
+            'success': False,
+            'error': f"Server busy: too many {route_class.name} requests in progress, retry in {retry_after}s"
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    @app.after_request
+    def _release(response):
+        slot = g.pop('admission_slot', None)
+        if slot is None:
+            return response
+        if response.is_streamed and not response.direct_passthrough:
+            # Generator bodies (Server-Sent Events) do their work as they are sent,
+            # so they keep the slot until the server closes the response, unless
+            # they hand it back earlier with release_admission()
+            g.admission_streaming_slot = slot
+            response.call_on_close(slot.release)
+        else:
+            slot.release()
+        return response
+
+    @app.teardown_request
+    def _release_on_error(_):
+        # No response went out (the request failed before after_request)
+        slot = g.pop('admission_slot', None)
+        if slot is not None:
+            slot.release()
@@ -0,0 +1,42 @@
+"""
+Per-request deadline budgets
+"""
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is not enough budget left to start more work"""
+    pass
+
+
+class Deadline:
+    """A time budget that is passed down through a request's call chain"""
+
+    def __init__(self, seconds: float, reserve: float = 1.0):
+        self.budget = seconds
+        # Stop starting new upstream work once less than this is left
+        self.reserve = reserve
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def nearly_spent(self) -> bool:
+        """True once the remaining budget is within the reserve"""
+        return self.remaining() <= self.reserve
+
+    def timeout(self, default: float) -> float:
+        """Clamp a timeout so it cannot run past the deadline"""
+        return max(0.001, min(default, self.remaining()))
+
+    def check(self, what: str = 'request'):
+        """Raise DeadlineExceeded if no budget is left to start `what`"""
+        if self.nearly_spent():
+            raise DeadlineExceeded(f"Deadline budget of {self.budget:g}s spent before {what}")
+
+
+def clamp_timeout(deadline: Optional[Deadline], default: float) -> float:
+    """Timeout to use for a blocking call, honouring an optional deadline"""
+    return deadline.timeout(default) if deadline else default
@@ -0,0 +1,136 @@
+"""
+Declarative vendor risk-flag rules, compiled into a column-wise evaluator
+"""
+import json
+import operator
+import os
+from itertools import compress, repeat
+from typing import Dict, List, Optional
+
+# Numeric vendor summary fields a rule can test
+RULE_METRICS = [
+    'market_cap', 'revenue', 'pe_ratio', 'roe', 'debt_to_equity', 'current_ratio', 'dividend_yield',
+    'operating_margin', 'profit_margin', 'price_to_sales', 'ev_to_ebitda'
+]
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+DEFAULT_RULE_SET = {
+    'name': 'default',
+    'description': 'Standard procurement risk thresholds',
+    'rules': [
+        {'flag': 'LOW_REVENUE', 'metric': 'revenue', 'op': '<', 'threshold': 1000000000},  # Less than $1B
+        {'flag': 'HIGH_PE', 'metric': 'pe_ratio', 'op': '>', 'threshold': 30},
+        {'flag': 'HIGH_DEBT', 'metric': 'debt_to_equity', 'op': '>', 'threshold': 1.0},
+        {'flag': 'LOW_LIQUIDITY', 'metric': 'current_ratio', 'op': '<', 'threshold': 1.0},
+        {'flag': 'LOW_ROE', 'metric': 'roe', 'op': '<', 'threshold': 0.1},
+        {'flag': 'LOW_OPERATING_MARGIN', 'metric': 'operating_margin', 'op': '<', 'threshold': 0.05},  # Less than 5%
+        {'flag': 'LOW_PROFIT_MARGIN', 'metric': 'profit_margin', 'op': '<', 'threshold': 0.03},  # Less than 3%
+        {'flag': 'HIGH_PRICE_TO_SALES', 'metric': 'price_to_sales', 'op': '>', 'threshold': 10},
+        {'flag': 'HIGH_EV_TO_EBITDA', 'metric': 'ev_to_ebitda', 'op': '>', 'threshold': 20}
+    ]
+}
+
+
+class RuleSet:
+    """A validated rule set, evaluated one rule at a time over all vendors
+
+    Each rule becomes (flag, metric, comparison, threshold, per-category
+    overrides). evaluate() pulls each metric into a column once and runs a
+    rule as a single map/compress over that column, so the per-vendor work
+    happens in C rather than in an if-chain per vendor.
+    """
+
+    def __init__(self, definition: Dict):
+        if not isinstance(definition, dict) or not isinstance(definition.get('rules'), list):
+            raise ValueError('A rule set is an object with a "rules" list')
+        self.name = str(definition.get('name', 'custom'))
+        self.description = str(definition.get('description', ''))
+        self.definition = definition
+        self._rules = [self._compile(rule, index) for index, rule in enumerate(definition['rules'])]
+
+    @staticmethod
+    def _compile(rule: Dict, index: int) -> tuple:
+        where = f"rule {index + 1}"
+        if not isinstance(rule, dict):
+            raise ValueError(f"{where}: expected an object")
+        flag = rule.get('flag')
+        if not isinstance(flag, str) or not flag:
+            raise ValueError(f"{where}: 'flag' must be a non-empty string")
+        if rule.get('metric') not in RULE_METRICS:
+            raise ValueError(f"{where} ({flag}): 'metric' must be one of {', '.join(RULE_METRICS)}")
+        if rule.get('op') not in OPERATORS:
+            raise ValueError(f"{where} ({flag}): 'op' must be one of {' '.join(OPERATORS)}")
+
+        overrides = rule.get('categories') or {}
+        if not isinstance(overrides, dict):
+            raise ValueError(f"{where} ({flag}): 'categories' maps a category to its threshold")
+        for threshold in [rule.get('threshold'), *overrides.values()]:
+            if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+                raise ValueError(f"{where} ({flag}): thresholds must be numbers")
+        return flag, rule['metric'], OPERATORS[rule['op']], float(rule['threshold']), \
+            {str(category): float(value) for category, value in overrides.items()}
+
+    def evaluate(self, summaries: List[Dict]) -> List[List[str]]:
+        """Flags for each vendor summary, in rule order"""
+        count = len(summaries)
+        flags = [[] for _ in range(count)]
+        if not count:
+            return flags
+
+        columns = {}
+        categories = None
+        for flag, metric, compare, threshold, overrides in self._rules:
+            column = columns.get(metric)
+            if column is None:
+                column = columns[metric] = [summary[metric] for summary in summaries]
+            if overrides:
+                if categories is None:
+                    categories = [summary['category'] for summary in summaries]
+                thresholds = [overrides.get(category, threshold) for category in categories]
+            else:
+                thresholds = repeat(threshold, count)
+            for index in compress(range(count), map(compare, column, thresholds)):
+                flags[index].append(flag)
+        return flags
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'description': self.description,
+            'rules': self.definition['rules']
+        }
+
+
+DEFAULT_RULES = RuleSet(DEFAULT_RULE_SET)
+
+
+def load_rule_sets(directory: Optional[str]) -> Dict[str, RuleSet]:
+    """The default rule set plus one per *.json file in `directory` (named by "name" or the file)"""
+    rule_sets = {DEFAULT_RULES.name: DEFAULT_RULES}
+    if not directory or not os.path.isdir(directory):
+        return rule_sets
+
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.json'):
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            with open(path) as f:
+                definition = json.load(f)
+            definition.setdefault('name', os.path.splitext(filename)[0])
+            rule_set = RuleSet(definition)
+        except (OSError, ValueError) as e:
+            # One bad file shouldn't take the API down; the set just isn't offered
+            print(f"Skipping flag rule set {path}: {str(e)}")
+            continue
+        rule_sets[rule_set.name] = rule_set
+    print(f"Loaded flag rule sets: {', '.join(rule_sets)}")
+    return rule_sets
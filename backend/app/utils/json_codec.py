@@ -0,0 +1,86 @@
+"""
+JSON codec for API responses and cache payloads, using orjson when installed
+"""
+import json
+import os
+from typing import Any, Callable, Optional, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib path writes the same bytes
+    orjson = None
+
+# JSON_CODEC=json forces the stdlib path (e.g. to compare the two)
+if os.environ.get('JSON_CODEC', 'auto').lower() == 'json':
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'json'
+
+if orjson:
+    # Non-string keys (e.g. key indexes in key_usage) are written as strings, as the stdlib does
+    _PAYLOAD_OPTIONS = orjson.OPT_NON_STR_KEYS
+    # Leave dates and dataclasses to the caller's default(), as the stdlib encoder does
+    _RESPONSE_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME |
+                         orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON text or bytes"""
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN and Infinity, which the stdlib writes but orjson rejects
+            pass
+    return json.loads(data)
+
+
+def dumps_response(obj: Any, default: Optional[Callable] = None) -> bytes:
+    """Compact, key-sorted UTF-8 JSON: the body of every API response
+
+    Both paths produce the same bytes, except that orjson spells floats below
+    1e-4 or from 1e16 up without the stdlib's exponent padding (1e16, not 1e+16),
+    and sorts non-string keys by their string form (10 before 2).
+    """
+    if orjson:
+        try:
+            return orjson.dumps(obj, default=default, option=_RESPONSE_OPTIONS)
+        except TypeError:
+            # Integers beyond 64 bits and the like
+            pass
+    return json.dumps(obj, default=default, separators=(',', ':'), sort_keys=True,
+                      ensure_ascii=False).encode('utf-8')
+
+
+def dumps_payload(obj: Any) -> str:
+    """Encode a cache payload as compact UTF-8 JSON, keeping key order
+
+    Entries written before this format (the stdlib's ", " / ": " separators)
+    still decode, and vendor manifests that reference them are re-checked
+    against this encoding (see AlphaVantageService.read_vendor_cache).
+    """
+    if orjson:
+        try:
+            return orjson.dumps(obj, option=_PAYLOAD_OPTIONS).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes jsonify() bodies with dumps_response"""
+
+    # Match the orjson path, which always writes UTF-8
+    ensure_ascii = False
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return super().loads(s, **kwargs) if kwargs else loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Indented debug output stays on the stdlib path
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_response(obj, default=self.default) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,196 @@
+"""
+Incremental, field-selective parsing of Alpha Vantage statement responses
+"""
+import codecs
+import json
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Functions whose responses are streamed, and the report arrays in them
+STATEMENT_FUNCTIONS = ('INCOME_STATEMENT', 'BALANCE_SHEET', 'CASH_FLOW')
+REPORT_KEYS = ('annualReports', 'quarterlyReports')
+# Kept in every selected report whatever the field list says
+REPORT_ID_FIELDS = ('fiscalDateEnding', 'reportedCurrency')
+
+_scan = json.JSONDecoder().scan_once
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# What may still follow a number's digits ("-12" then ".5e-3")
+_NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*')
+
+
+class StatementSelection:
+    """Which report arrays, how many periods of each, and which fields to keep
+
+    `periods` maps a report key to the number of leading (most recent) periods
+    kept, or None for all of them; report keys not listed are dropped. `fields`
+    limits each kept report to those fields (None keeps every field).
+    """
+
+    def __init__(self, periods: Dict[str, Optional[int]], fields: Optional[List[str]] = None):
+        self.periods = dict(periods)
+        self.fields = set(fields) | set(REPORT_ID_FIELDS) if fields else None
+
+    @classmethod
+    def from_env(cls, periods: str, fields: str) -> 'StatementSelection':
+        """Parse "annualReports:5,quarterlyReports:4" and "totalRevenue,netIncome" settings"""
+        selected = {}
+        for item in periods.split(','):
+            key, _, count = item.strip().partition(':')
+            if key:
+                selected[key] = int(count) if count.strip() else None
+        return cls(selected, [field.strip() for field in fields.split(',') if field.strip()] or None)
+
+    def project(self, report):
+        if self.fields is None or not isinstance(report, dict):
+            return report
+        return {field: value for field, value in report.items() if field in self.fields}
+
+    def apply(self, data: Dict) -> Dict:
+        """The same selection over an already decoded response"""
+        selected = {}
+        for key, value in data.items():
+            if key not in REPORT_KEYS:
+                selected[key] = value
+            elif key in self.periods and isinstance(value, list):
+                limit = self.periods[key]
+                selected[key] = [self.project(report) for report in (value if limit is None else value[:limit])]
+        return selected
+
+
+def selection_from_env() -> Optional[StatementSelection]:
+    """STATEMENT_PERIODS / STATEMENT_FIELDS, or None when STATEMENT_STREAMING is off"""
+    if os.environ.get('STATEMENT_STREAMING', 'True').lower() != 'true':
+        return None
+    return StatementSelection.from_env(
+        os.environ.get('STATEMENT_PERIODS', 'annualReports:5'),
+        os.environ.get('STATEMENT_FIELDS', '')
+    )
+
+
+class _Buffer:
+    """Decoded text from a byte stream, refilled on demand and trimmed as it is consumed"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def fill(self) -> bool:
+        """Append the next chunk; False once the stream is exhausted"""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.bytes_read += len(chunk)
+            # Drop what has been parsed so the buffer stays about one chunk long
+            self.text = self.text[self.pos:] + self._utf8.decode(chunk)
+            self.pos = 0
+            return True
+        self.text = self.text[self.pos:] + self._utf8.decode(b'', final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at the end of the stream)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.bytes_read - len(self.text) + self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the JSON value at the cursor"""
+        self.peek()
+        while True:
+            try:
+                # The C scanner behind raw_decode(), without its per-call wrapper
+                value, end = _scan(self.text, self.pos)
+            except (StopIteration, json.JSONDecodeError) as e:
+                if self.fill():
+                    continue
+                if isinstance(e, StopIteration):
+                    raise json.JSONDecodeError('Expecting value', self.text, e.value) from None
+                raise
+            if (not self.eof and isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and _NUMBER_TAIL.fullmatch(self.text, end) and self.fill()):
+                # A number cut off at the chunk boundary (even mid-fraction or mid-exponent)
+                # decodes "successfully"; re-read it whole
+                continue
+            self.pos = end
+            return value
+
+
+def _members(buffer: _Buffer, open_char: str, close_char: str) -> Iterator[None]:
+    """Step through an object's or array's members, consuming separators; yields at each member"""
+    buffer.expect(open_char)
+    if buffer.peek() == close_char:
+        buffer.pos += 1
+        return
+    while True:
+        yield
+        separator = buffer.peek()
+        buffer.pos += 1
+        if separator == close_char:
+            return
+        if separator != ',':
+            raise ValueError(f"Expected ',' or {close_char!r}, got {separator!r}")
+
+
+def _reports(buffer: _Buffer, limit: Optional[int]) -> List:
+    """The first `limit` elements of the array at the cursor (all if None); the rest are skipped
+
+    Skipped reports are still decoded one at a time (the C decoder is faster
+    than any pure-Python scan for their end), but each is dropped at once.
+    """
+    reports = []
+    for _ in _members(buffer, '[', ']'):
+        report = buffer.value()
+        if limit is None or len(reports) < limit:
+            reports.append(report)
+    return reports
+
+
+def parse_statement(chunks: Iterable[bytes], selection: StatementSelection) -> Dict:
+    """Decode a statement response from its body chunks, keeping only `selection`
+
+    Top-level fields other than report arrays (symbol, and Note / Information
+    / Error Message notices) are kept as they are. Reports are decoded one at a
+    time, so memory holds about one chunk of text plus what is kept, never the
+    whole body or the whole decoded tree.
+    """
+    buffer = _Buffer(chunks)
+    data = {}
+    if buffer.peek() != '{':
+        # Not an object: let the caller see the same thing response.json() would
+        value = buffer.value()
+        if buffer.peek():
+            raise ValueError('Extra data after JSON value')
+        return value
+
+    for _ in _members(buffer, '{', '}'):
+        key = buffer.value()
+        buffer.expect(':')
+        if key not in REPORT_KEYS or buffer.peek() != '[':
+            data[key] = buffer.value()
+            continue
+
+        if key in selection.periods:
+            data[key] = [selection.project(report) for report in _reports(buffer, selection.periods[key])]
+        else:
+            _reports(buffer, 0)
+
+    if buffer.peek():
+        raise ValueError('Extra data after JSON value')
+    return data
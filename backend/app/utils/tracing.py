@@ -0,0 +1,257 @@
+"""
+Request-scoped tracing and slow-request profiling
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import g, has_request_context, request
+
+# Module-level switch checked by span(); flipped once by init_tracing()
+_enabled = False
+_settings = {
+    'slow_ms': 1000.0,
+    'log_file': 'slow_requests.log',
+    'profile': False,
+    'profile_interval': 0.005,
+    'sample_rate': 1.0
+}
+_log_lock = threading.Lock()
+
+
+class _NullSpan:
+    """No-op span returned when tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed section of work within a request"""
+
+    def __init__(self, trace: 'RequestTrace', name: str, attrs: Dict):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.children = []
+        self.start = 0.0
+        self.end = 0.0
+        self.error = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.trace.push(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.trace.pop(self)
+        return False
+
+    def set(self, **attrs):
+        """Attach extra attributes to the span"""
+        self.attrs.update(attrs)
+
+    def to_dict(self, origin: float) -> Dict:
+        result = {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 3),
+            'duration_ms': round((self.end - self.start) * 1000, 3)
+        }
+        if self.attrs:
+            result['attrs'] = self.attrs
+        if self.error:
+            result['error'] = self.error
+        if self.children:
+            result['children'] = [child.to_dict(origin) for child in self.children]
+        return result
+
+
+class SamplingProfiler:
+    """Statistical profiler that samples one thread's stack on an interval"""
+
+    def __init__(self, thread_id: int, interval: float, max_depth: int = 40):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='trace-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[';'.join(stack)] += 1
+            self.sample_count += 1
+
+    def top_stacks(self, limit: int = 20) -> List[Dict]:
+        return [
+            {'stack': stack, 'samples': count}
+            for stack, count in self.samples.most_common(limit)
+        ]
+
+
+class RequestTrace:
+    """Span tree collected for a single Flask request"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.origin = time.perf_counter()
+        self.root = Span(self, f"{method} {path}", {})
+        self.root.start = self.origin
+        self.thread_id = threading.get_ident()
+        # Open spans per thread; worker threads running in a copy of the request's
+        # context nest under the span the request thread had open when they started
+        self._stacks = {self.thread_id: [self.root]}
+        self.profiler = None
+
+    def _stack(self) -> List[Span]:
+        stack = self._stacks.get(threading.get_ident())
+        if stack is None:
+            stack = self._stacks[threading.get_ident()] = [self._stacks[self.thread_id][-1]]
+        return stack
+
+    def push(self, span: Span):
+        stack = self._stack()
+        stack[-1].children.append(span)
+        stack.append(span)
+
+    def pop(self, span: Span):
+        stack = self._stack()
+        if len(stack) > 1 and stack[-1] is span:
+            stack.pop()
+
+    def finish(self, status_code: int) -> float:
+        self.root.end = time.perf_counter()
+        self.root.set(status=status_code)
+        if self.profiler:
+            self.profiler.stop()
+        return (self.root.end - self.origin) * 1000
+
+    def to_dict(self) -> Dict:
+        result = {
+            'timestamp': datetime.now().isoformat(),
+            'method': self.method,
+            'path': self.path,
+            'duration_ms': round((self.root.end - self.origin) * 1000, 3),
+            'spans': self.root.to_dict(self.origin)
+        }
+        if self.profiler:
+            result['profile'] = {
+                'interval_ms': self.profiler.interval * 1000,
+                'sample_count': self.profiler.sample_count,
+                'top_stacks': self.profiler.top_stacks()
+            }
+        return result
+
+
+def span(name: str, **attrs):
+    """Open a span on the current request trace; a no-op when tracing is off"""
+    if not _enabled or not has_request_context():
+        return _NULL_SPAN
+    trace = g.get('_trace')
+    if trace is None:
+        return _NULL_SPAN
+    return Span(trace, name, attrs)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """Return the trace attached to the current request, if any"""
+    if not _enabled or not has_request_context():
+        return None
+    return g.get('_trace')
+
+
+def _write_slow_request(trace: RequestTrace):
+    """Append a slow request's span tree and profile to the trace log"""
+    record = trace.to_dict()
+    line = json.dumps(record)
+    with _log_lock:
+        with open(_settings['log_file'], 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    print(f"Slow request: {trace.method} {trace.path} took {record['duration_ms']:.1f}ms "
+          f"(trace written to {_settings['log_file']})")
+
+
+def init_tracing(app):
+    """Register request hooks for tracing if enabled in the app config"""
+    global _enabled
+
+    _enabled = app.config.get('TRACE_ENABLED', False)
+    if not _enabled:
+        return
+
+    _settings.update({
+        'slow_ms': app.config.get('TRACE_SLOW_MS', _settings['slow_ms']),
+        'log_file': app.config.get('TRACE_LOG_FILE', _settings['log_file']),
+        'profile': app.config.get('TRACE_PROFILE', _settings['profile']),
+        'profile_interval': app.config.get('TRACE_PROFILE_INTERVAL_MS', 5) / 1000,
+        'sample_rate': app.config.get('TRACE_SAMPLE_RATE', _settings['sample_rate'])
+    })
+
+    @app.before_request
+    def _start_trace():
+        if _settings['sample_rate'] < 1.0 and random.random() >= _settings['sample_rate']:
+            return
+        trace = RequestTrace(request.method, request.path)
+        if _settings['profile']:
+            trace.profiler = SamplingProfiler(threading.get_ident(), _settings['profile_interval'])
+            trace.profiler.start()
+        g._trace = trace
+
+    @app.after_request
+    def _finish_trace(response):
+        trace = g.pop('_trace', None)
+        if trace is None:
+            return response
+        duration_ms = trace.finish(response.status_code)
+        if duration_ms >= _settings['slow_ms']:
+            try:
+                _write_slow_request(trace)
+            except OSError as e:
+                print(f"Failed to write slow request trace: {str(e)}")
+        return response
+
+    @app.teardown_request
+    def _discard_trace(exc):
+        # after_request is skipped on unhandled errors; make sure the profiler stops
+        trace = g.pop('_trace', None)
+        if trace is not None and trace.profiler:
+            trace.profiler.stop()
+
+    print(f"Request tracing enabled (slow threshold {_settings['slow_ms']}ms, "
+          f"profiling {'on' if _settings['profile'] else 'off'})")
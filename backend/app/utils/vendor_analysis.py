@@ -1,40 +1,83 @@
 import csv
-from typing import Dict, List, Any
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Tuple
 from datetime import datetime
 
+from app.utils.flag_rules import DEFAULT_RULES, RuleSet
+
+# Numeric comparison-table columns benchmarked against category peers
+PEER_METRICS = [
+    'Market Cap ($B)', 'Revenue ($B)', 'P/E Ratio', 'ROE (%)', 'Debt/Equity', 'Current Ratio',
+    'Dividend Yield (%)', 'Operating Margin (%)', 'Profit Margin (%)', 'Price/Sales', 'EV/EBITDA'
+]
+
 class VendorAnalyzer:
-    def __init__(self):
+    def __init__(self, rules: RuleSet = DEFAULT_RULES):
+        self.rules = rules
         self.vendor_categories = {
             'Sensors': ['TEL', 'ST'],
             'Plastics/Materials': ['DD', 'CE', 'LYB']
         }
     
-    def analyze_vendor_data(self, vendors_data: Dict) -> Dict:
-        """Analyze vendor data and generate insights"""
+    def analyze_vendor_data(self, vendors_data: Dict, rules: RuleSet = None) -> Dict:
+        """Analyze vendor data and generate insights, flagging with `rules` (default: self.rules)"""
         analysis = {
             'summary': {},
             'comparison_table': [],
             'flags': {},
-            'insights': []
+            'insights': [],
+            'peer_benchmarks': {},
+            'peer_ranks': {}
         }
         
         for symbol, data in vendors_data.items():
             if 'error' in data:
                 analysis['flags'][symbol] = ['API_ERROR']
                 continue
-            
-            vendor_analysis = self._analyze_single_vendor(symbol, data)
-            analysis['summary'][symbol] = vendor_analysis['summary']
-            analysis['comparison_table'].append(vendor_analysis['row'])
-            analysis['flags'][symbol] = vendor_analysis['flags']
+            analysis['flags'][symbol] = None  # Keeps vendor order; filled in below
+            analysis['summary'][symbol] = self._summarize_vendor(symbol, data)
+        
+        # One pass of the rule set over every vendor at once
+        summaries = list(analysis['summary'].values())
+        for summary, flags in zip(summaries, (rules or self.rules).evaluate(summaries)):
+            analysis['flags'][summary['symbol']] = flags
+            analysis['comparison_table'].append(self._comparison_row(summary, flags))
         
         # Generate comparative insights
-        analysis['insights'] = self._generate_insights(analysis['comparison_table'])
+        analysis['insights'] = self.generate_insights(analysis['comparison_table'])
+        analysis['peer_benchmarks'], analysis['peer_ranks'] = self.compute_peer_benchmarks(analysis['comparison_table'])
         
         return analysis
     
-    def _analyze_single_vendor(self, symbol: str, data: Dict) -> Dict:
+    def evaluate_flags(self, vendors_data: Dict, rules: RuleSet = None) -> Dict[str, List[str]]:
+        """Flags only, for re-checking cached vendors against another rule set"""
+        summaries = [self._summarize_vendor(symbol, data) for symbol, data in vendors_data.items() if 'error' not in data]
+        flags = dict(zip((summary['symbol'] for summary in summaries), (rules or self.rules).evaluate(summaries)))
+        return {symbol: flags.get(symbol, ['API_ERROR']) for symbol in vendors_data}
+    
+    def analyze_vendor(self, symbol: str, data: Dict, rules: RuleSet = None) -> Dict:
+        """Analyze one vendor; summary and row are None if its data failed to load"""
+        if 'error' in data:
+            return {
+                'summary': None,
+                'row': None,
+                'flags': ['API_ERROR']
+            }
+        return self._analyze_single_vendor(symbol, data, rules)
+    
+    def _analyze_single_vendor(self, symbol: str, data: Dict, rules: RuleSet = None) -> Dict:
         """Analyze a single vendor's data"""
+        summary = self._summarize_vendor(symbol, data)
+        flags = (rules or self.rules).evaluate([summary])[0]
+        return {
+            'summary': summary,
+            'row': self._comparison_row(summary, flags),
+            'flags': flags
+        }
+    
+    def _summarize_vendor(self, symbol: str, data: Dict) -> Dict:
+        """Key metrics of one vendor, as tested by flag rules"""
         overview = data.get('overview', {})
         
         # Extract key metrics from OVERVIEW endpoint
@@ -61,27 +104,6 @@ class VendorAnalyzer:
         ev_to_revenue = self._safe_float(overview.get('EVToRevenue', '0'))
         ev_to_ebitda = self._safe_float(overview.get('EVToEBITDA', '0'))
         
-        # Calculate flags
-        flags = []
-        if revenue < 1000000000:  # Less than $1B
-            flags.append('LOW_REVENUE')
-        if pe_ratio > 30:
-            flags.append('HIGH_PE')
-        if debt_to_equity > 1.0:
-            flags.append('HIGH_DEBT')
-        if current_ratio < 1.0:
-            flags.append('LOW_LIQUIDITY')
-        if roe < 0.1:
-            flags.append('LOW_ROE')
-        if operating_margin < 0.05:  # Less than 5%
-            flags.append('LOW_OPERATING_MARGIN')
-        if profit_margin < 0.03:  # Less than 3%
-            flags.append('LOW_PROFIT_MARGIN')
-        if price_to_sales > 10:
-            flags.append('HIGH_PRICE_TO_SALES')
-        if ev_to_ebitda > 20:
-            flags.append('HIGH_EV_TO_EBITDA')
-        
         # Determine category
         category = 'Unknown'
         for cat, symbols in self.vendor_categories.items():
@@ -89,7 +111,7 @@ class VendorAnalyzer:
                 category = cat
                 break
         
-        summary = {
+        return {
             'name': name,
             'symbol': symbol,
             'category': category,
@@ -105,29 +127,25 @@ class VendorAnalyzer:
             'price_to_sales': price_to_sales,
             'ev_to_ebitda': ev_to_ebitda
         }
-        
-        row = {
-            'Symbol': symbol,
-            'Name': name,
-            'Category': category,
-            'Market Cap ($B)': round(market_cap / 1e9, 2),
-            'Revenue ($B)': round(revenue / 1e9, 2),
-            'P/E Ratio': round(pe_ratio, 2),
-            'ROE (%)': round(roe * 100, 2),
-            'Debt/Equity': round(debt_to_equity, 2),
-            'Current Ratio': round(current_ratio, 2),
-            'Dividend Yield (%)': round(dividend_yield * 100, 2),
-            'Operating Margin (%)': round(operating_margin * 100, 2),
-            'Profit Margin (%)': round(profit_margin * 100, 2),
-            'Price/Sales': round(price_to_sales, 2),
-            'EV/EBITDA': round(ev_to_ebitda, 2),
-            'Flags': ', '.join(flags) if flags else 'None'
-        }
-        
+    
+    def _comparison_row(self, summary: Dict, flags: List[str]) -> Dict:
+        """Comparison-table row for a vendor summary"""
         return {
-            'summary': summary,
-            'row': row,
-            'flags': flags
+            'Symbol': summary['symbol'],
+            'Name': summary['name'],
+            'Category': summary['category'],
+            'Market Cap ($B)': round(summary['market_cap'] / 1e9, 2),
+            'Revenue ($B)': round(summary['revenue'] / 1e9, 2),
+            'P/E Ratio': round(summary['pe_ratio'], 2),
+            'ROE (%)': round(summary['roe'] * 100, 2),
+            'Debt/Equity': round(summary['debt_to_equity'], 2),
+            'Current Ratio': round(summary['current_ratio'], 2),
+            'Dividend Yield (%)': round(summary['dividend_yield'] * 100, 2),
+            'Operating Margin (%)': round(summary['operating_margin'] * 100, 2),
+            'Profit Margin (%)': round(summary['profit_margin'] * 100, 2),
+            'Price/Sales': round(summary['price_to_sales'], 2),
+            'EV/EBITDA': round(summary['ev_to_ebitda'], 2),
+            'Flags': ', '.join(flags) if flags else 'None'
         }
     
     def _safe_float(self, value: str) -> float:
@@ -140,7 +158,7 @@ class VendorAnalyzer:
             return 0.0
     
     
-    def _generate_insights(self, comparison_table: List[Dict]) -> List[str]:
+    def generate_insights(self, comparison_table: List[Dict]) -> List[str]:
         """Generate insights from comparison data"""
         insights = []
         
@@ -173,6 +191,59 @@ class VendorAnalyzer:
         
         return insights
     
+    def compute_peer_benchmarks(self, comparison_table: List[Dict]) -> Tuple[Dict, Dict]:
+        """(benchmarks, ranks) of every PEER_METRICS column within each category
+        
+        benchmarks: category -> metric -> min, quartiles, max, mean and std
+        ranks: symbol -> metric -> percentile (ties share their mid-rank) and z-score
+        One sort per category and metric; ranks are looked up by binary search
+        once per distinct value, so ties cost nothing extra.
+        """
+        groups = {}
+        for row in comparison_table:
+            groups.setdefault(row['Category'], []).append(row)
+        
+        benchmarks = {}
+        ranks = {row['Symbol']: {} for row in comparison_table}
+        for category, rows in groups.items():
+            count = len(rows)
+            metrics = {}
+            for metric in PEER_METRICS:
+                values = [row[metric] for row in rows]
+                ordered = sorted(values)
+                mean = math.fsum(ordered) / count
+                std = math.sqrt(math.fsum((value - mean) ** 2 for value in ordered) / count)
+                metrics[metric] = {
+                    'min': ordered[0],
+                    'q1': self._quantile(ordered, 0.25),
+                    'median': self._quantile(ordered, 0.5),
+                    'q3': self._quantile(ordered, 0.75),
+                    'max': ordered[-1],
+                    'mean': round(mean, 2),
+                    'std': round(std, 2)
+                }
+                
+                rank_by_value = {
+                    value: {
+                        'percentile': round(50 * (bisect_left(ordered, value) + bisect_right(ordered, value)) / count, 1),
+                        'z_score': round((value - mean) / std, 2) if std else 0.0
+                    }
+                    for value in set(values)
+                }
+                for row, value in zip(rows, values):
+                    ranks[row['Symbol']][metric] = rank_by_value[value]
+            benchmarks[category] = {'vendors': count, 'metrics': metrics}
+        
+        return benchmarks, ranks
+    
+    @staticmethod
+    def _quantile(ordered: List[float], q: float) -> float:
+        """Linearly interpolated quantile of an already sorted list"""
+        position = q * (len(ordered) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return round(ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower), 2)
+    
     def export_to_csv(self, comparison_table: List[Dict], filename: str = None) -> str:
         """Export comparison table to CSV"""
         if not filename:
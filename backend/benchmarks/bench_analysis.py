@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks and scaling curves for VendorAnalyzer and CSV export
+
+Usage (from backend/):
+    python -m benchmarks.bench_analysis --sizes 5 500 50000 --json analysis.json
+    python -m benchmarks.bench_analysis --baseline analysis.json --max-regression 0.25
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from app.utils.sample_data import get_sample_vendor_data
+from app.utils.vendor_analysis import VendorAnalyzer
+
+DEFAULT_SIZES = [5, 50, 500, 5000, 50000]
+STAGES = ['analyze_vendor_data', 'generate_insights', 'compute_peer_benchmarks', 'export_to_csv']
+SEED_SYMBOLS = ['TEL', 'ST', 'DD', 'CE', 'LYB']
+# Synthetic vendors are dealt round-robin into these; None leaves them 'Unknown'
+SYNTHETIC_CATEGORIES = ['Sensors', 'Plastics/Materials', 'Connectors', 'Semiconductors', None]
+
+# Overview fields that hold numbers, jittered around the sample values
+NUMERIC_FIELDS = [
+    'MarketCapitalization', 'RevenueTTM', 'PERatio', 'ReturnOnEquityTTM', 'DebtToEquity',
+    'CurrentRatio', 'DividendYield', 'OperatingMarginTTM', 'ProfitMargin',
+    'PriceToSalesRatioTTM', 'EVToEBITDA'
+]
+
+
+def generate_vendors(count: int, seed: int = 42) -> Dict:
+    """Generate vendor data shaped like get_sample_vendor_data() output"""
+    rng = random.Random(seed)
+    templates = [get_sample_vendor_data(symbol) for symbol in SEED_SYMBOLS]
+    vendors = {}
+
+    for i in range(count):
+        # Keep the real symbols first so small sizes match production
+        symbol = SEED_SYMBOLS[i] if i < len(SEED_SYMBOLS) else f"V{i:05d}"
+        template = templates[i % len(templates)]
+        overview = dict(template['overview'])
+        overview['Symbol'] = symbol
+        if i >= len(SEED_SYMBOLS):
+            overview['Name'] = f"Synthetic Vendor {i}"
+            for field in NUMERIC_FIELDS:
+                value = float(overview.get(field, '0') or 0)
+                overview[field] = str(round(value * rng.uniform(0.5, 1.5), 4))
+            if rng.random() < 0.02:
+                overview['PERatio'] = 'None'
+
+        vendors[symbol] = {
+            'overview': overview,
+            'income_statement': template['income_statement'],
+            'symbol': symbol,
+            'last_updated': '2024-01-01T00:00:00'
+        }
+
+        # A small share of vendors failed upstream, as in production
+        if i >= len(SEED_SYMBOLS) and rng.random() < 0.01:
+            vendors[symbol] = {'error': 'API Error: Invalid API call', 'symbol': symbol}
+
+    return vendors
+
+
+def bench_categories(vendors: Dict) -> Dict[str, set]:
+    """Analyzer categories covering the synthetic vendors, so peer groups have realistic sizes"""
+    categories = {cat: set(symbols) for cat, symbols in VendorAnalyzer().vendor_categories.items()}
+    synthetic = [symbol for symbol in vendors if symbol not in SEED_SYMBOLS]
+    for i, symbol in enumerate(synthetic):
+        category = SYNTHETIC_CATEGORIES[i % len(SYNTHETIC_CATEGORIES)]
+        if category:
+            categories.setdefault(category, set()).add(symbol)
+    return categories
+
+
+def measure(fn: Callable, repeats: int) -> Dict:
+    """Time a stage (median of repeats) and measure its peak traced memory"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Separate run: tracemalloc slows allocation-heavy code considerably
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(sizes: List[int], repeats: int) -> Dict:
+    analyzer = VendorAnalyzer()
+    results = {}
+    csv_path = os.path.join(tempfile.mkdtemp(prefix='wb-bench-'), 'bench.csv')
+
+    for size in sizes:
+        print(f"Benchmarking {size} vendors...", file=sys.stderr)
+        vendors = generate_vendors(size)
+        analyzer.vendor_categories = bench_categories(vendors)
+        analysis = analyzer.analyze_vendor_data(vendors)
+        table = analysis['comparison_table']
+        # Fewer repeats for the big sizes keeps the whole run under a minute
+        stage_repeats = max(1, repeats if size <= 5000 else repeats // 3)
+
+        results[str(size)] = {
+            'analyze_vendor_data': measure(lambda: analyzer.analyze_vendor_data(vendors), stage_repeats),
+            'generate_insights': measure(lambda: analyzer.generate_insights(table), stage_repeats),
+            'compute_peer_benchmarks': measure(lambda: analyzer.compute_peer_benchmarks(table), stage_repeats),
+            'export_to_csv': measure(lambda: analyzer.export_to_csv(table, csv_path), stage_repeats)
+        }
+
+    os.remove(csv_path)
+    return {
+        'benchmark': 'analysis',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'repeats': repeats,
+        'results': results
+    }
+
+
+def compare(report: Dict, baseline: Dict, max_regression: float, min_delta_ms: float) -> List[str]:
+    """Return a description of every stage that regressed past the threshold"""
+    failures = []
+    for size, stages in report['results'].items():
+        base_stages = baseline.get('results', {}).get(size)
+        if not base_stages:
+            continue
+        for stage, current in stages.items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            time_limit = base['median_ms'] * (1 + max_regression)
+            if current['median_ms'] > time_limit and current['median_ms'] - base['median_ms'] > min_delta_ms:
+                failures.append(f"{stage} @ {size}: {current['median_ms']:.2f}ms vs baseline {base['median_ms']:.2f}ms")
+            memory_limit = base['peak_kb'] * (1 + max_regression)
+            if current['peak_kb'] > memory_limit and current['peak_kb'] - base['peak_kb'] > 64:
+                failures.append(f"{stage} @ {size}: peak {current['peak_kb']:.0f}KB vs baseline {base['peak_kb']:.0f}KB")
+    return failures
+
+
+def print_report(report: Dict):
+    header = f"{'vendors':>8}  {'stage':<26}{'median ms':>12}{'per vendor us':>15}{'peak KB':>12}"
+    print(header)
+    print('-' * len(header))
+    for size, stages in report['results'].items():
+        for stage in STAGES:
+            r = stages[stage]
+            per_vendor = r['median_ms'] * 1000 / int(size)
+            print(f"{size:>8}  {stage:<26}{r['median_ms']:>12.3f}{per_vendor:>15.2f}{r['peak_kb']:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark VendorAnalyzer stages across universe sizes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='vendor counts to test')
+    parser.add_argument('--repeats', type=int, default=5, help='timed runs per stage')
+    parser.add_argument('--json', dest='json_path', help='write machine-readable results to this file')
+    parser.add_argument('--baseline', help='results file from an earlier run to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='allowed slowdown/memory growth vs baseline (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='ignore time regressions smaller than this (timer noise)')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.repeats)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(report, baseline, args.max_regression, args.min_delta_ms)
+        if failures:
+            print(f"\n❌ {len(failures)} stage(s) regressed beyond {args.max_regression:.0%}:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Offline API benchmark against a local mock Alpha Vantage server
+
+Usage (from backend/):
+    python -m benchmarks.bench_api --iterations 50 --latency-ms 20 --json results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List
+
+from benchmarks.mock_alpha_vantage import MockAlphaVantageConfig, MockAlphaVantageServer
+from benchmarks.mock_redis import MockRedisServer
+
+ENDPOINTS = {
+    'vendors': '/api/vendors',
+    'vendor': '/api/vendors/TEL',
+    'export_csv': '/api/vendors/export/csv'
+}
+SCENARIOS = ['cold', 'warm', 'rate_limited']
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def configure_environment(mock_url: str, cache_db: str, request_delay: float, key_count: int,
+                          redis_url: str = None):
+    """Point the backend at the mock server before the app is imported"""
+    os.environ['ALPHA_VANTAGE_BASE_URL'] = mock_url
+    os.environ['CACHE_DB_PATH'] = cache_db
+    os.environ['SNAPSHOT_PATH'] = os.path.join(os.path.dirname(cache_db) or '.', 'vendor_snapshot.bin')
+    os.environ['CACHE_BACKEND'] = 'redis' if redis_url else 'sqlite'
+    if redis_url:
+        os.environ['CACHE_REDIS_URL'] = redis_url
+    os.environ['ALPHA_VANTAGE_REQUEST_DELAY'] = str(request_delay)
+    os.environ.pop('ALPHA_VANTAGE_API_KEY', None)
+    for i in range(1, key_count + 1):
+        os.environ[f'ALPHA_VANTAGE_API_KEY_{i}'] = f"BENCHKEY{i:04d}XXXXXXXX"
+    os.environ.pop(f'ALPHA_VANTAGE_API_KEY_{key_count + 1}', None)
+
+
+def clear_cache():
+    """Empty the backend's cache and drop the shared response snapshot"""
+    from app.api.routes import alpha_vantage, snapshot
+    alpha_vantage.cache.clear()
+    if snapshot:
+        snapshot.invalidate()
+
+
+def run_case(client_factory: Callable, path: str, iterations: int, concurrency: int,
+             before_each: Callable, server: MockAlphaVantageServer) -> Dict:
+    """Run one endpoint/scenario pair and collect latency and upstream stats"""
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def worker(count: int):
+        client = client_factory()
+        for _ in range(count):
+            before_each()
+            start = time.perf_counter()
+            response = client.get(path)
+            response.get_data()
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+
+    server.reset_counters()
+    per_worker = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+    wall_start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in per_worker if n]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.mean(latencies), 3) if latencies else 0.0,
+        'throughput_rps': round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        'upstream_calls': server.total_calls,
+        'upstream_calls_per_request': round(server.total_calls / max(len(latencies), 1), 3),
+        'upstream_rate_limited': server.rate_limited_calls,
+        'status_codes': {str(k): v for k, v in statuses.items()}
+    }
+
+
+def run_benchmarks(args) -> Dict:
+    config = MockAlphaVantageConfig(
+        latency_ms=args.latency_ms,
+        rate_limit_field=args.rate_limit_field,
+        quarterly_reports=args.quarterly_reports
+    )
+    workdir = tempfile.mkdtemp(prefix='wb-bench-')
+    cache_db = os.path.join(workdir, 'cache.db')
+
+    with contextlib.ExitStack() as stack:
+        server = stack.enter_context(MockAlphaVantageServer(config))
+        redis_url = None
+        if args.cache_backend == 'redis':
+            redis_url = stack.enter_context(MockRedisServer()).url
+        configure_environment(server.url, cache_db, args.request_delay, args.keys, redis_url)
+
+        from app import create_app
+        from app.api.routes import alpha_vantage
+
+        app = create_app()
+        client_factory = app.test_client
+        results = {}
+
+        for scenario in args.scenarios:
+            config.rate_limit_after = 0 if scenario == 'rate_limited' else None
+            alpha_vantage.key_manager.reset_blacklist()
+            clear_cache()
+
+            if scenario == 'warm':
+                before_each = lambda: None
+            else:
+                before_each = clear_cache
+
+            for name in args.endpoints:
+                path = ENDPOINTS[name]
+                if scenario == 'warm':
+                    app.test_client().get(path).get_data()
+                alpha_vantage.key_manager.reset_blacklist()
+                print(f"Running {scenario}/{name} ({args.iterations} requests)...", file=sys.stderr)
+                results[f"{scenario}/{name}"] = run_case(
+                    client_factory, path, args.iterations, args.concurrency, before_each, server
+                )
+
+    return {
+        'benchmark': 'api',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'config': {
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'latency_ms': args.latency_ms,
+            'request_delay': args.request_delay,
+            'quarterly_reports': args.quarterly_reports,
+            'keys': args.keys,
+            'cache_backend': args.cache_backend
+        },
+        'results': results
+    }
+
+
+def print_report(report: Dict):
+    header = f"{'case':<28}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'upstream/req':>14}{'limited':>9}"
+    print(header)
+    print('-' * len(header))
+    for case, r in report['results'].items():
+        print(f"{case:<28}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['throughput_rps']:>10.1f}"
+              f"{r['upstream_calls_per_request']:>14.2f}{r['upstream_rate_limited']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vendor API against a mock Alpha Vantage server')
+    parser.add_argument('--iterations', type=int, default=20, help='requests per endpoint/scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads per case')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='mock upstream latency per call')
+    parser.add_argument('--request-delay', type=float, default=0.0,
+                        help='ALPHA_VANTAGE_REQUEST_DELAY for the backend (production uses 2s)')
+    parser.add_argument('--quarterly-reports', type=int, default=20, help='statement payload size')
+    parser.add_argument('--rate-limit-field', choices=['Note', 'Information'], default='Information')
+    parser.add_argument('--keys', type=int, default=3, help='number of fake API keys to rotate')
+    parser.add_argument('--cache-backend', choices=['sqlite', 'redis'], default='sqlite',
+                        help='redis runs against a local Redis stand-in')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument('--verbose', action='store_true', help='show backend log output')
+    parser.add_argument('--json', dest='json_path', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    if args.verbose:
+        report = run_benchmarks(args)
+    else:
+        # The backend logs every fetch with print(); keep the report readable
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            report = run_benchmarks(args)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+CPU cost of JSON encoding and decoding per warm /api/vendors request
+
+Runs the same warm-cache requests once per codec (stdlib json, and orjson
+when installed), each in its own process since the codec is picked at
+import, and checks that the served body is byte-identical to the stdlib
+encoding of the same document.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json --symbols 5 50 500 --iterations 50 --json json_codec.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.bench_api import configure_environment
+from benchmarks.mock_alpha_vantage import MockAlphaVantageConfig, MockAlphaVantageServer
+
+SEED_SYMBOLS = ['TEL', 'ST', 'DD', 'CE', 'LYB']
+
+
+def universe(size: int) -> List[str]:
+    """The real vendor list first, then synthetic symbols"""
+    return SEED_SYMBOLS[:size] + [f"V{i:05d}" for i in range(max(0, size - len(SEED_SYMBOLS)))]
+
+
+def available_codecs() -> List[str]:
+    codecs = ['json']
+    try:
+        import orjson  # noqa: F401
+        codecs.append('orjson')
+    except ImportError:
+        pass
+    return codecs
+
+
+def run_child(size: int, iterations: int, quarterly_reports: int) -> Dict:
+    """Measure one codec in this process; JSON_CODEC must be set before the app is imported"""
+    config = MockAlphaVantageConfig(quarterly_reports=quarterly_reports)
+    workdir = tempfile.mkdtemp(prefix='wb-bench-json-')
+    with MockAlphaVantageServer(config) as server:
+        configure_environment(server.url, os.path.join(workdir, 'cache.db'), 0.0, 3)
+        os.environ['VENDOR_SYMBOLS'] = ','.join(universe(size))
+        # Measure the full decode / analyze / encode path, not snapshot reads
+        os.environ['SNAPSHOT_ENABLED'] = 'False'
+
+        from app import create_app
+        from app.utils import json_codec
+
+        client = create_app().test_client()
+        body = client.get('/api/vendors').get_data()  # Warm the cache
+
+        cpu_ms, wall_ms = [], []
+        for _ in range(iterations):
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            body = client.get('/api/vendors').get_data()
+            cpu_ms.append((time.process_time() - cpu_start) * 1000)
+            wall_ms.append((time.perf_counter() - wall_start) * 1000)
+
+        # The codec's own share: decoding every cached payload and encoding the response
+        from app.api.routes import VENDOR_SYMBOLS, alpha_vantage
+        keys = [f"{function}_{symbol}" for symbol in VENDOR_SYMBOLS for function in ('vendor', 'OVERVIEW', 'INCOME_STATEMENT')]
+        payloads = list(alpha_vantage.cache.get_many(keys, None).values())
+        document = json_codec.loads(body)
+        decode_start = time.process_time()
+        for _ in range(iterations):
+            for payload in payloads:
+                json_codec.loads(payload)
+        decode_ms = (time.process_time() - decode_start) * 1000 / iterations
+        encode_start = time.process_time()
+        for _ in range(iterations):
+            json_codec.dumps_response(document)
+        encode_ms = (time.process_time() - encode_start) * 1000 / iterations
+
+    # Timestamps differ between runs, so compare against the stdlib encoding of this very body
+    stdlib_body = json.dumps(document, separators=(',', ':'), sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return {
+        'codec': json_codec.BACKEND,
+        'symbols': size,
+        'response_bytes': len(body),
+        'matches_stdlib': body.rstrip(b'\n') == stdlib_body,
+        'cpu_ms_per_request': round(statistics.median(cpu_ms), 3),
+        'wall_ms_p50': round(statistics.median(wall_ms), 3),
+        'cache_decode_ms': round(decode_ms, 3),
+        'response_encode_ms': round(encode_ms, 3)
+    }
+
+
+def run_benchmarks(args) -> Dict:
+    results = {}
+    for size in args.symbols:
+        for codec in available_codecs():
+            print(f"Running {codec} with {size} symbols ({args.iterations} requests)...", file=sys.stderr)
+            env = dict(os.environ, JSON_CODEC=codec if codec == 'json' else 'auto')
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_json', '--child', '--symbols', str(size),
+                 '--iterations', str(args.iterations), '--quarterly-reports', str(args.quarterly_reports)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            # The backend logs with print(); the result is the last line
+            results[f"{size}/{codec}"] = json.loads(output.strip().splitlines()[-1])
+
+    return {
+        'benchmark': 'json_codec',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'config': {
+            'symbols': args.symbols,
+            'iterations': args.iterations,
+            'quarterly_reports': args.quarterly_reports
+        },
+        'results': results
+    }
+
+
+def print_report(report: Dict):
+    header = (f"{'case':<16}{'bytes':>11}{'cpu ms/req':>12}{'decode ms':>11}{'encode ms':>11}"
+              f"{'cpu saved':>11}{'identical':>11}")
+    print(header)
+    print('-' * len(header))
+    for case, r in report['results'].items():
+        baseline = report['results'].get(f"{r['symbols']}/json")
+        saved = ''
+        if baseline is not None and baseline is not r:
+            saved = f"{100 * (1 - r['cpu_ms_per_request'] / baseline['cpu_ms_per_request']):.0f}%"
+        same = 'yes' if r['matches_stdlib'] else 'NO'
+        print(f"{case:<16}{r['response_bytes']:>11}{r['cpu_ms_per_request']:>12.2f}{r['cache_decode_ms']:>11.2f}"
+              f"{r['response_encode_ms']:>11.2f}{saved:>11}{same:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JSON codecs on warm /api/vendors requests')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[5, 50, 500], help='vendor universe sizes')
+    parser.add_argument('--iterations', type=int, default=30, help='requests per codec and size')
+    parser.add_argument('--quarterly-reports', type=int, default=20, help='statement payload size')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--json', dest='json_path', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    if args.child:
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run_child(args.symbols[0], args.iterations, args.quarterly_reports)
+        print(json.dumps(result))
+        return
+
+    report = run_benchmarks(args)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Per-fetch cost of statement responses: whole-body parse vs streamed selection
+
+For statement bodies of growing size (more quarterly reports), compares
+response.json()-style parsing of the whole body against parse_statement()
+with the configured selection: parse CPU, peak memory while parsing, the
+bytes written to the cache, and the cost of decoding that entry on every
+later cache hit.
+
+Usage (from backend/):
+    python -m benchmarks.bench_statements --quarterly 20 80 200 --json statements.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator
+
+from benchmarks.mock_alpha_vantage import MockAlphaVantageConfig, build_payload
+from app.utils.statement_stream import StatementSelection, parse_statement
+from app.services.alpha_vantage import STREAM_CHUNK_BYTES
+from app.utils import json_codec
+
+
+def body_chunks(body: bytes) -> Iterator[bytes]:
+    """The body as response.iter_content would hand it over"""
+    for start in range(0, len(body), STREAM_CHUNK_BYTES):
+        yield body[start:start + STREAM_CHUNK_BYTES]
+
+
+def median_ms(fn: Callable, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return statistics.median(samples)
+
+
+def peak_kb(fn: Callable) -> float:
+    """Peak traced allocation while running fn, including the result it keeps"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def measure(body: bytes, selection: StatementSelection, iterations: int) -> Dict:
+    # Whole body: requests keeps response.content and decodes it into a str, then the full tree
+    full = lambda: json.loads(body.decode('utf-8'))
+    streamed = lambda: parse_statement(body_chunks(body), selection)
+    full_tree, streamed_tree = full(), streamed()
+    full_entry, streamed_entry = json_codec.dumps_payload(full_tree), json_codec.dumps_payload(streamed_tree)
+
+    return {
+        'body_bytes': len(body),
+        'full': {
+            'parse_ms': round(median_ms(full, iterations), 3),
+            'cache_write_ms': round(median_ms(lambda: json_codec.dumps_payload(full_tree), iterations), 3),
+            'peak_kb': round(len(body) / 1024 + peak_kb(full), 1),
+            'cache_bytes': len(full_entry),
+            'cache_read_ms': round(median_ms(lambda: json_codec.loads(full_entry), iterations), 3)
+        },
+        'streamed': {
+            'parse_ms': round(median_ms(streamed, iterations), 3),
+            'cache_write_ms': round(median_ms(lambda: json_codec.dumps_payload(streamed_tree), iterations), 3),
+            # Only one chunk of the body is ever held, and it is counted by tracemalloc
+            'peak_kb': round(peak_kb(streamed), 1),
+            'cache_bytes': len(streamed_entry),
+            'cache_read_ms': round(median_ms(lambda: json_codec.loads(streamed_entry), iterations), 3)
+        }
+    }
+
+
+def run_benchmarks(args) -> Dict:
+    selection = StatementSelection.from_env(args.periods, args.fields)
+    results = {}
+    for quarterly in args.quarterly:
+        print(f"Measuring a statement with {quarterly} quarterly reports...", file=sys.stderr)
+        config = MockAlphaVantageConfig(quarterly_reports=quarterly, annual_reports=args.annual)
+        body = json.dumps(build_payload('INCOME_STATEMENT', 'TEL', config)).encode('utf-8')
+        results[str(quarterly)] = measure(body, selection, args.iterations)
+
+    return {
+        'benchmark': 'statement_parsing',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'config': {
+            'quarterly': args.quarterly,
+            'annual': args.annual,
+            'periods': args.periods,
+            'fields': args.fields,
+            'iterations': args.iterations
+        },
+        'results': results
+    }
+
+
+def print_report(report: Dict):
+    header = (f"{'quarterly':>10}{'mode':>10}{'body KB':>10}{'parse ms':>10}{'write ms':>10}"
+              f"{'peak KB':>10}{'cached KB':>11}{'read ms':>10}")
+    print(header)
+    print('-' * len(header))
+    for quarterly, r in report['results'].items():
+        for mode in ('full', 'streamed'):
+            m = r[mode]
+            print(f"{quarterly:>10}{mode:>10}{r['body_bytes'] / 1024:>10.1f}{m['parse_ms']:>10.3f}"
+                  f"{m['cache_write_ms']:>10.3f}{m['peak_kb']:>10.1f}{m['cache_bytes'] / 1024:>11.1f}"
+                  f"{m['cache_read_ms']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare whole-body and streamed statement parsing')
+    parser.add_argument('--quarterly', type=int, nargs='+', default=[20, 80, 200],
+                        help='quarterly reports per statement body')
+    parser.add_argument('--annual', type=int, default=5, help='annual reports per statement body')
+    parser.add_argument('--periods', default='annualReports:5', help='STATEMENT_PERIODS to select')
+    parser.add_argument('--fields', default='', help='STATEMENT_FIELDS to select')
+    parser.add_argument('--iterations', type=int, default=200, help='repetitions per measurement')
+    parser.add_argument('--json', dest='json_path', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    report = run_benchmarks(args)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Alpha Vantage query API, seeded from sample data
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from app.utils.sample_data import get_sample_vendor_data
+
+RATE_LIMIT_NOTE = ('Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day. '
+                   'Please subscribe to any of the premium plans to instantly remove all daily rate limits.')
+
+
+class MockAlphaVantageConfig:
+    """Tunable behaviour of the mock server"""
+
+    def __init__(self, latency_ms: float = 0.0, rate_limit_after: Optional[int] = None,
+                 rate_limit_field: str = 'Information', quarterly_reports: int = 20,
+                 annual_reports: int = 5, fail_next: int = 0):
+        self.latency_ms = latency_ms
+        # Calls allowed per API key before every response becomes a rate-limit message
+        self.rate_limit_after = rate_limit_after
+        # 'Note' (legacy per-minute message) or 'Information' (daily limit message)
+        self.rate_limit_field = rate_limit_field
+        # Controls statement payload size, as in the real API
+        self.quarterly_reports = quarterly_reports
+        self.annual_reports = annual_reports
+        # Calls answered with HTTP 500 (a transient upstream outage) before normal service resumes
+        self.fail_next = fail_next
+
+
+def _statement_report(base: Dict, year: int, quarter: Optional[int] = None) -> Dict:
+    """Build one statement period from the sample annual report"""
+    ending = f"{year}-12-31" if quarter is None else f"{year}-{quarter * 3:02d}-30"
+    scale = 1.0 if quarter is None else 0.25
+    report = {'fiscalDateEnding': ending, 'reportedCurrency': 'USD'}
+    for field, value in base.items():
+        try:
+            report[field] = str(int(float(value) * scale))
+        except (ValueError, TypeError):
+            report[field] = value
+    for field in ('costOfRevenue', 'researchAndDevelopment', 'interestExpense', 'ebitda',
+                  'totalAssets', 'totalLiabilities', 'operatingCashflow', 'capitalExpenditures'):
+        report.setdefault(field, str(int(float(base.get('totalRevenue', '0') or 0) * scale * 0.1)))
+    return report
+
+
+def build_payload(function: str, symbol: str, config: MockAlphaVantageConfig) -> Dict:
+    """Build a response body shaped like the real API for one function/symbol"""
+    sample = get_sample_vendor_data(symbol)
+    if function == 'OVERVIEW':
+        overview = dict(sample['overview'])
+        overview['Symbol'] = symbol
+        overview.setdefault('AssetType', 'Common Stock')
+        overview.setdefault('Exchange', 'NYSE')
+        overview.setdefault('Currency', 'USD')
+        return overview
+
+    if function in ('INCOME_STATEMENT', 'BALANCE_SHEET', 'CASH_FLOW'):
+        annual = sample['income_statement']['annualReports']
+        base = annual[0] if annual else {'totalRevenue': '1000000000'}
+        return {
+            'symbol': symbol,
+            'annualReports': [_statement_report(base, 2024 - i) for i in range(config.annual_reports)],
+            'quarterlyReports': [
+                _statement_report(base, 2024 - i // 4, 4 - i % 4)
+                for i in range(config.quarterly_reports)
+            ]
+        }
+
+    return {'Error Message': f"Invalid API call. Unknown function {function}."}
+
+
+class MockAlphaVantageServer:
+    """Threaded HTTP server answering /query like Alpha Vantage"""
+
+    def __init__(self, config: MockAlphaVantageConfig = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockAlphaVantageConfig()
+        self.calls = Counter()
+        self.calls_per_key = Counter()
+        self.rate_limited_calls = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/query"
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.calls_per_key.clear()
+            self.rate_limited_calls = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='mock-alpha-vantage', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def handle_query(self, params: Dict) -> Optional[Dict]:
+        """Response body for one call, or None to fail it with HTTP 500"""
+        function = params.get('function', '')
+        symbol = params.get('symbol', '').upper()
+        api_key = params.get('apikey', '')
+
+        with self._lock:
+            self.calls[function] += 1
+            self.calls_per_key[api_key] += 1
+            key_calls = self.calls_per_key[api_key]
+            limited = self.config.rate_limit_after is not None and key_calls > self.config.rate_limit_after
+            if limited:
+                self.rate_limited_calls += 1
+            failed = self.config.fail_next > 0
+            if failed:
+                self.config.fail_next -= 1
+
+        if self.config.latency_ms:
+            time.sleep(self.config.latency_ms / 1000)
+
+        if failed:
+            return None
+        if limited:
+            return {self.config.rate_limit_field: RATE_LIMIT_NOTE}
+        return build_payload(function, symbol, self.config)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != '/query':
+                    self.send_error(404)
+                    return
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                payload = server.handle_query(params)
+                if payload is None:
+                    self.send_error(500)
+                    return
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (e.g. its deadline ran out); expected in benchmarks
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    """Run the mock server standalone"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local Alpha Vantage stand-in')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--rate-limit-after', type=int, default=None)
+    parser.add_argument('--rate-limit-field', choices=['Note', 'Information'], default='Information')
+    parser.add_argument('--quarterly-reports', type=int, default=20)
+    args = parser.parse_args()
+
+    config = MockAlphaVantageConfig(
+        latency_ms=args.latency_ms,
+        rate_limit_after=args.rate_limit_after,
+        rate_limit_field=args.rate_limit_field,
+        quarterly_reports=args.quarterly_reports
+    )
+    server = MockAlphaVantageServer(config, port=args.port).start()
+    print(f"Mock Alpha Vantage listening on {server.url}")
+    print(f"Point the backend at it with ALPHA_VANTAGE_BASE_URL={server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
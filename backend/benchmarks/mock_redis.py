@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Redis server, covering the commands the cache backend uses
+"""
+import fnmatch
+import socket
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Commands whose first argument is a key they modify (for WATCH)
+_WRITE_COMMANDS = {'INCRBY', 'RPUSH', 'LTRIM', 'HSET', 'SET'}
+
+
+class MockRedisServer:
+    """Threaded RESP2 server with an in-memory keyspace, TTLs and MULTI/EXEC/WATCH"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, password: Optional[str] = None):
+        self.password = password
+        self._data = {}  # key -> (value, expires_at or None)
+        self._revisions = {}  # key -> write count, checked by EXEC for WATCHed keys
+        self._lock = threading.Lock()
+        self.commands = 0
+        self._server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        auth = f":{self.password}@" if self.password else ''
+        return f"redis://{auth}{host}:{port}/0"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-redis', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def reset_counters(self):
+        with self._lock:
+            self.commands = 0
+
+    def _live(self, key: bytes):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def execute(self, args: List[bytes], session: Dict):
+        """Run one command; returns a reply value (Exception for error replies)"""
+        command = args[0].upper().decode('ascii', 'replace')
+        with self._lock:
+            self.commands += 1
+            if self.password and not session.get('authenticated') and command != 'AUTH':
+                return Exception('NOAUTH Authentication required.')
+
+            queue = session.get('queue')
+            if command == 'MULTI':
+                if queue is not None:
+                    return Exception('ERR MULTI calls can not be nested')
+                session['queue'] = []
+                return 'OK'
+            if command == 'EXEC':
+                if queue is None:
+                    return Exception('ERR EXEC without MULTI')
+                del session['queue']
+                watched = session.pop('watched', {})
+                if any(self._revisions.get(key, 0) != revision for key, revision in watched.items()):
+                    return None
+                return [self._run(queued[0].upper().decode('ascii', 'replace'), queued, session)
+                        for queued in queue]
+            if command == 'DISCARD':
+                if queue is None:
+                    return Exception('ERR DISCARD without MULTI')
+                del session['queue']
+                session.pop('watched', None)
+                return 'OK'
+            if command == 'WATCH':
+                if queue is not None:
+                    return Exception('ERR WATCH inside MULTI is not allowed')
+                watched = session.setdefault('watched', {})
+                for key in args[1:]:
+                    watched.setdefault(key, self._revisions.get(key, 0))
+                return 'OK'
+            if command == 'UNWATCH':
+                session.pop('watched', None)
+                return 'OK'
+            if queue is not None:
+                queue.append(args)
+                return 'QUEUED'
+            return self._run(command, args, session)
+
+    def _touch(self, keys):
+        for key in keys:
+            self._revisions[key] = self._revisions.get(key, 0) + 1
+
+    def _run(self, command: str, args: List[bytes], session: Dict):
+        """Run one command with the lock held"""
+        if command in _WRITE_COMMANDS:
+            self._touch(args[1:2])
+        elif command == 'DEL':
+            self._touch(args[1:])
+        elif command == 'FLUSHDB':
+            self._touch(list(self._data))
+
+        if command == 'PING':
+            return 'PONG'
+        if command == 'AUTH':
+            if args[-1].decode('utf-8') != self.password:
+                return Exception('WRONGPASS invalid username-password pair')
+            session['authenticated'] = True
+            return 'OK'
+        if command == 'SELECT':
+            return 'OK'
+        if command == 'GET':
+            value = self._live(args[1])
+            if value is not None and not isinstance(value, bytes):
+                return Exception('WRONGTYPE Operation against a key holding the wrong kind of value')
+            return value
+        if command == 'MGET':
+            return [value if isinstance(value, bytes) else None for value in map(self._live, args[1:])]
+        if command == 'INCRBY':
+            value = int(self._live(args[1]) or 0) + int(args[2])
+            self._data[args[1]] = (str(value).encode('ascii'), None)
+            return value
+        if command == 'RPUSH':
+            items = self._live(args[1]) or []
+            items.extend(args[2:])
+            self._data[args[1]] = (items, None)
+            return len(items)
+        if command == 'LLEN':
+            return len(self._live(args[1]) or [])
+        if command == 'LRANGE':
+            items = self._live(args[1]) or []
+            start, stop = int(args[2]), int(args[3])
+            stop = len(items) + stop if stop < 0 else stop
+            return items[start:stop + 1]
+        if command == 'LTRIM':
+            items = self._live(args[1]) or []
+            start, stop = int(args[2]), int(args[3])
+            stop = len(items) + stop if stop < 0 else stop
+            self._data[args[1]] = (items[start:stop + 1], None)
+            return 'OK'
+        if command == 'HSET':
+            fields = self._live(args[1]) or {}
+            added = sum(1 for field in args[2::2] if field not in fields)
+            fields.update(zip(args[2::2], args[3::2]))
+            self._data[args[1]] = (fields, None)
+            return added
+        if command == 'HMGET':
+            fields = self._live(args[1]) or {}
+            return [fields.get(field) for field in args[2:]]
+        if command == 'SET':
+            expires_at = None
+            options = [arg.upper() for arg in args[3:]]
+            if b'EX' in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b'EX') + 1])
+            elif b'PX' in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b'PX') + 1]) / 1000
+            self._data[args[1]] = (args[2], expires_at)
+            return 'OK'
+        if command == 'DEL':
+            deleted = 0
+            for key in args[1:]:
+                if self._live(key) is not None:
+                    del self._data[key]
+                    deleted += 1
+            return deleted
+        if command == 'EXISTS':
+            return sum(1 for key in args[1:] if self._live(key) is not None)
+        if command == 'TTL':
+            if self._live(args[1]) is None:
+                return -2
+            expires_at = self._data[args[1]][1]
+            return -1 if expires_at is None else int(expires_at - time.monotonic())
+        if command == 'SCAN':
+            return self._scan(args)
+        if command == 'DBSIZE':
+            return len(self._data)
+        if command == 'FLUSHDB':
+            self._data.clear()
+            return 'OK'
+        return Exception(f"ERR unknown command '{command}'")
+
+    def _scan(self, args: List[bytes]) -> Tuple:
+        cursor = int(args[1])
+        pattern, count = b'*', 10
+        options = [arg.upper() for arg in args]
+        if b'MATCH' in options:
+            pattern = args[options.index(b'MATCH') + 1]
+        if b'COUNT' in options:
+            count = int(args[options.index(b'COUNT') + 1])
+        keys = sorted(self._data)
+        batch = keys[cursor:cursor + count]
+        next_cursor = cursor + count if cursor + count < len(keys) else 0
+        matched = [
+            key for key in batch
+            if self._live(key) is not None and fnmatch.fnmatchcase(key.decode('utf-8'), pattern.decode('utf-8'))
+        ]
+        return [str(next_cursor).encode('ascii'), matched]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                # Replies go out one write per command; don't let Nagle hold them back
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                session = {}
+                while True:
+                    try:
+                        args = self._read_command()
+                    except (ConnectionError, ValueError, IndexError):
+                        return
+                    if args is None:
+                        return
+                    if not args:
+                        continue
+                    try:
+                        self.wfile.write(_encode_reply(server.execute(args, session)))
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+
+            def _read_command(self) -> Optional[List[bytes]]:
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b'*'):
+                    # Inline command (e.g. typed into telnet)
+                    return line.strip().split()
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+        return Handler
+
+
+def _encode_reply(reply) -> bytes:
+    if isinstance(reply, Exception):
+        return b'-' + str(reply).encode('utf-8') + b'\r\n'
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, str):
+        return b'+' + reply.encode('utf-8') + b'\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    if isinstance(reply, (list, tuple)):
+        return b'*%d\r\n' % len(reply) + b''.join(_encode_reply(item) for item in reply)
+    raise TypeError(f"Cannot encode reply {reply!r}")
+
+
+def main():
+    """Run the stand-in standalone"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local Redis stand-in for the shared cache backend')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--password', default=None)
+    args = parser.parse_args()
+
+    server = MockRedisServer(port=args.port, password=args.password).start()
+    print(f"Mock Redis listening on {server.url}")
+    print(f"Point the backend at it with CACHE_BACKEND=redis CACHE_REDIS_URL={server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,112 +2,36 @@
 """
 Cache Management Utility for WindBorne Systems API
 """
-import sqlite3
 import json
 from datetime import datetime, timedelta
-import os
+from typing import Optional
+
+from app.services.cache_backends import CacheBackend, SQLiteCacheBackend, create_cache_backend
 
 class CacheManager:
-    def __init__(self, db_path='cache.db'):
+    def __init__(self, db_path='cache.db', backend: Optional[CacheBackend] = None):
         self.db_path = db_path
+        self.backend = backend or SQLiteCacheBackend(db_path)
         
     def get_cache_stats(self):
         """Get comprehensive cache statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total entries
-        cursor.execute('SELECT COUNT(*) FROM api_cache')
-        total_entries = cursor.fetchone()[0]
-        
-        # Entries by type
-        cursor.execute('''
-            SELECT 
-                CASE 
-                    WHEN key LIKE 'OVERVIEW_%' THEN 'Overview'
-                    WHEN key LIKE 'INCOME_STATEMENT_%' THEN 'Income Statement'
-                    WHEN key LIKE 'BALANCE_SHEET_%' THEN 'Balance Sheet'
-                    WHEN key LIKE 'CASH_FLOW_%' THEN 'Cash Flow'
-                    ELSE 'Other'
-                END as data_type,
-                COUNT(*) as count
-            FROM api_cache 
-            GROUP BY data_type
-        ''')
-        entries_by_type = dict(cursor.fetchall())
-        
-        # Recent entries
-        cursor.execute('''
-            SELECT key, timestamp FROM api_cache 
-            ORDER BY timestamp DESC LIMIT 10
-        ''')
-        recent_entries = cursor.fetchall()
-        
-        # Cache age distribution
-        cursor.execute('''
-            SELECT 
-                CASE 
-                    WHEN timestamp > datetime('now', '-1 hour') THEN 'Fresh (< 1h)'
-                    WHEN timestamp > datetime('now', '-6 hours') THEN 'Recent (< 6h)'
-                    WHEN timestamp > datetime('now', '-24 hours') THEN 'Stale (< 24h)'
-                    ELSE 'Old (> 24h)'
-                END as age_group,
-                COUNT(*) as count
-            FROM api_cache 
-            GROUP BY age_group
-        ''')
-        age_distribution = dict(cursor.fetchall())
-        
-        conn.close()
-        
-        return {
-            'total_entries': total_entries,
-            'entries_by_type': entries_by_type,
-            'recent_entries': recent_entries,
-            'age_distribution': age_distribution,
-            'cache_size_mb': os.path.getsize(self.db_path) / (1024 * 1024) if os.path.exists(self.db_path) else 0
-        }
+        return self.backend.get_stats()
     
     def clear_old_cache(self, hours=24):
         """Clear cache entries older than specified hours"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            DELETE FROM api_cache 
-            WHERE timestamp < datetime('now', '-{} hours')
-        '''.format(hours))
-        
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
-        
-        return deleted_count
+        return self.backend.clear_older_than(hours)
     
     def clear_all_cache(self):
         """Clear all cache entries"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM api_cache')
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
-        
-        return deleted_count
+        return self.backend.clear()
+    
+    def compact_cache(self):
+        """Purge expired entries and release free space"""
+        return self.backend.compact()
     
     def get_cache_entry(self, key):
         """Get a specific cache entry"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT data, timestamp FROM api_cache 
-            WHERE key = ?
-        ''', (key,))
-        
-        result = cursor.fetchone()
-        conn.close()
+        result = self.backend.get_entry(key)
         
         if result:
             return {
@@ -129,7 +53,8 @@ class CacheManager:
 
 def main():
     """Interactive cache management"""
-    manager = CacheManager()
+    # Same backend as the API (CACHE_BACKEND / CACHE_DB_PATH / CACHE_REDIS_URL)
+    manager = CacheManager(backend=create_cache_backend())
     
     print("🗄️  WindBorne Systems Cache Manager")
     print("=" * 40)
@@ -140,9 +65,10 @@ def main():
         print("2. Clear old cache (>24h)")
         print("3. Clear all cache")
         print("4. Check specific entry")
-        print("5. Exit")
+        print("5. Compact cache")
+        print("6. Exit")
         
-        choice = input("\nSelect option (1-5): ").strip()
+        choice = input("\nSelect option (1-6): ").strip()
         
         if choice == '1':
             stats = manager.get_cache_stats()
@@ -183,6 +109,10 @@ def main():
                 print("❌ Entry not found")
         
         elif choice == '5':
+            result = manager.compact_cache()
+            print(f"✅ Removed {result['expired_deleted']} expired entries, freed {result['pages_freed']} pages")
+        
+        elif choice == '6':
             print("👋 Goodbye!")
             break
         
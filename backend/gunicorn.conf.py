@@ -1,8 +1,19 @@
 import os
 
 bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
-workers = 1
-worker_class = "sync"
+# Workers share decoded vendor responses through the memory-mapped snapshot
+# (SNAPSHOT_PATH), so extra workers add little memory and start warm.
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+# Threads keep the worker heartbeat alive while /api/vendors/stream is open;
+# a sync worker would be killed after `timeout` seconds of a long stream.
+# Each open /api/events subscriber holds one thread, so size this for the
+# expected number of browser tabs plus regular request concurrency.
+worker_class = "gthread"
+# Admission control (app/utils/admission.py) caps cold upstream-bound requests
+# (ADMISSION_UPSTREAM_CONCURRENCY + ADMISSION_UPSTREAM_QUEUE) and streams
+# (ADMISSION_STREAM_CONCURRENCY) below this, so some threads are always free
+# for cached reads and health checks.
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
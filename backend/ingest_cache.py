@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Bulk cache loader for WindBorne Systems API
+
+Seeds the API cache from Alpha Vantage dump files or from another instance's
+export, without spending API quota.
+
+  python ingest_cache.py load dumps/ more/OVERVIEW_TEL.json export.ndjson
+  python ingest_cache.py export export.ndjson
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.cache_backends import TIMESTAMP_FORMAT, CacheBackend, create_cache_backend
+from app.utils import json_codec
+from app.utils.statement_stream import REPORT_KEYS, STATEMENT_FUNCTIONS, selection_from_env
+
+FUNCTIONS = ['OVERVIEW', 'INCOME_STATEMENT', 'BALANCE_SHEET', 'CASH_FLOW']
+DUMP_EXTENSIONS = ('.json', '.ndjson', '.jsonl')
+
+# STATEMENT_PERIODS / STATEMENT_FIELDS, read once per worker process
+STATEMENT_SELECTION = selection_from_env()
+
+# A field only found in the annual reports of each statement type
+STATEMENT_MARKERS = [
+    ('totalRevenue', 'INCOME_STATEMENT'),
+    ('totalAssets', 'BALANCE_SHEET'),
+    ('operatingCashflow', 'CASH_FLOW')
+]
+
+
+def function_for_payload(data: Dict) -> Optional[str]:
+    """Alpha Vantage function that produced a payload, judged by its fields"""
+    if 'AssetType' in data and 'Symbol' in data:
+        return 'OVERVIEW'
+    reports = data.get('annualReports') or data.get('quarterlyReports') or []
+    if reports and isinstance(reports[0], dict):
+        for field, function in STATEMENT_MARKERS:
+            if field in reports[0]:
+                return function
+    return None
+
+
+def payload_problem(data) -> Optional[str]:
+    """Why a payload would not have been cached by make_api_request, if anything"""
+    if not isinstance(data, dict):
+        return 'not a JSON object'
+    if 'Error Message' in data:
+        return f"API error: {data['Error Message']}"
+    for field in ('Note', 'Information'):
+        if field in data and ('rate limit' in str(data[field]).lower() or 'premium' in str(data[field]).lower()):
+            return f"rate limit notice: {data[field]}"
+    if not data or (len(data) < 5 and not any(key in data for key in REPORT_KEYS)):
+        return 'empty or invalid data'
+    return None
+
+
+def select_statement(function: Optional[str], data):
+    """Keep only the configured periods and fields of a statement payload, as fetches do"""
+    if STATEMENT_SELECTION is None or function not in STATEMENT_FUNCTIONS or not isinstance(data, dict):
+        return data
+    return STATEMENT_SELECTION.apply(data)
+
+
+def key_hints(path: str) -> Tuple[Optional[str], Optional[str]]:
+    """(function, symbol) from a dump path like OVERVIEW_TEL.json or OVERVIEW/TEL.json"""
+    stem = os.path.splitext(os.path.basename(path))[0].upper()
+    parent = os.path.basename(os.path.dirname(path)).upper()
+    for function in FUNCTIONS:
+        if stem.startswith(f"{function}_"):
+            return function, stem[len(function) + 1:]
+    if stem in FUNCTIONS:
+        return stem, None
+    if parent in FUNCTIONS:
+        return parent, stem
+    return None, None
+
+
+def normalize_timestamp(value) -> Optional[str]:
+    """TIMESTAMP_FORMAT (UTC) for an exported timestamp, or None if unreadable"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(TIMESTAMP_FORMAT)
+
+
+def parse_record(record, hint_function: Optional[str], hint_symbol: Optional[str]) -> Tuple[str, str, Optional[str]]:
+    """(key, payload, timestamp) for one export line or raw Alpha Vantage payload
+
+    Raises ValueError for anything make_api_request would not have cached.
+    """
+    if isinstance(record, dict) and 'key' in record and 'data' in record:
+        # Export format: {"key": ..., "timestamp": ..., "data": {...}}
+        key, data = str(record['key']), record['data']
+        function = next((f for f in FUNCTIONS if key.startswith(f"{f}_")), None)
+        if function:
+            data = select_statement(function, data)
+            problem = payload_problem(data)
+            if problem:
+                raise ValueError(f"{key}: {problem}")
+        return key, json_codec.dumps_payload(data), normalize_timestamp(record.get('timestamp'))
+
+    problem = payload_problem(record)
+    if problem:
+        raise ValueError(problem)
+    function = hint_function or function_for_payload(record)
+    symbol = hint_symbol or record.get('Symbol') or record.get('symbol')
+    if not function or not symbol:
+        raise ValueError('cannot tell which function and symbol this payload belongs to')
+    record = select_statement(function, record)
+    problem = payload_problem(record)
+    if problem:
+        raise ValueError(f"{problem} after statement selection")
+    # Same selection and encoding as AlphaVantageService, so vendor manifest hashes match
+    return f"{function}_{str(symbol).upper()}", json_codec.dumps_payload(record), None
+
+
+def parse_chunk(chunk: Tuple[str, int, int, Optional[str]]) -> Tuple[List[Tuple[str, str, Optional[str]]], List[str], int]:
+    """Parse one file or NDJSON byte range; returns (entries, rejects, bytes read)
+
+    Runs in a worker process.
+    """
+    path, start, end, forced_function = chunk
+    hint_function, hint_symbol = key_hints(path)
+    hint_function = forced_function or hint_function
+    with open(path, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+
+    entries, rejects, records = [], [], []
+    if path.endswith('.json'):
+        try:
+            document = json_codec.loads(raw)
+        except ValueError as e:
+            return [], [f"{path}: {str(e)}"], len(raw)
+        records = document if isinstance(document, list) else [document]
+    else:
+        for line in raw.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json_codec.loads(line))
+            except ValueError as e:
+                rejects.append(f"{path} (range from byte {start}): {str(e)}")
+    if not path.endswith('.json') or len(records) != 1:
+        # Payloads for several symbols; the file name can't name them all
+        hint_symbol = None
+
+    for record in records:
+        try:
+            entries.append(parse_record(record, hint_function, hint_symbol))
+        except ValueError as e:
+            rejects.append(f"{path}: {str(e)}")
+    return entries, rejects, len(raw)
+
+
+def find_dump_files(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(DUMP_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+
+def plan_chunks(files: List[str], chunk_bytes: int, forced_function: Optional[str]) -> Iterator[Tuple[str, int, int, Optional[str]]]:
+    """Whole .json files, and NDJSON files split on line boundaries into ~chunk_bytes ranges"""
+    for path in files:
+        size = os.path.getsize(path)
+        if path.endswith('.json') or size <= chunk_bytes:
+            yield path, 0, size, forced_function
+            continue
+        with open(path, 'rb') as f:
+            start = 0
+            while start < size:
+                f.seek(min(start + chunk_bytes, size))
+                f.readline()
+                end = min(f.tell(), size)
+                yield path, start, end, forced_function
+                start = end
+
+
+def bounded_map(executor: ProcessPoolExecutor, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """executor.map() that keeps at most `window` calls submitted at a time
+
+    Results come back in input order as map() does, but parsed chunks wait for
+    the writer in a queue of `window` rather than all piling up in memory.
+    """
+    in_flight = deque()
+    for item in items:
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+        in_flight.append(executor.submit(fn, item))
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def load(backend: CacheBackend, paths: List[str], workers: int, batch_size: int, chunk_mb: float,
+         keep_timestamps: bool, forced_function: Optional[str], dry_run: bool) -> Dict:
+    """Parse dumps in parallel and write them to the cache in large batches"""
+    from app.services.alpha_vantage import AlphaVantageService
+
+    files = find_dump_files(paths)
+    chunks = plan_chunks(files, int(chunk_mb * 1024 * 1024), forced_function)
+    stats = {'files': len(files), 'entries': 0, 'rejected': 0, 'bytes': 0, 'seconds': 0.0}
+    symbols = {}  # Ordered set of vendor symbols touched
+    pending, timestamps = {}, {}
+
+    def flush():
+        if pending and not dry_run:
+            backend.set_many(pending, timestamps if keep_timestamps else None)
+        pending.clear()
+        timestamps.clear()
+
+    started = time.monotonic()
+    # A single worker parses in-process rather than paying to pickle every payload back
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Two chunks per worker keeps every worker busy while the batches are written
+    parsed = bounded_map(executor, parse_chunk, chunks, 2 * workers) if executor else map(parse_chunk, chunks)
+    try:
+        # Results keep input order, so a key repeated across dumps ends with its last copy
+        for entries, rejects, size in parsed:
+            stats['bytes'] += size
+            stats['rejected'] += len(rejects)
+            for reject in rejects[:5]:
+                print(f"  ⚠️  Skipped {reject}")
+            for key, payload, timestamp in entries:
+                pending[key] = payload
+                if timestamp:
+                    timestamps[key] = timestamp
+                symbol = AlphaVantageService.vendor_symbol_for_key(key)
+                if symbol:
+                    symbols[symbol] = None
+                if len(pending) >= batch_size:
+                    stats['entries'] += len(pending)
+                    flush()
+        stats['entries'] += len(pending)
+        flush()
+    finally:
+        if executor:
+            executor.shutdown()
+    stats['seconds'] = time.monotonic() - started
+
+    if symbols and not dry_run:
+        # Let /api/vendors/changes clients and every worker's snapshot see the new data
+        backend.append_changes([(symbol, 'updated') for symbol in symbols])
+        if os.environ.get('SNAPSHOT_ENABLED', 'True').lower() == 'true':
+            from app.services.snapshot import VendorSnapshot
+            VendorSnapshot(os.environ.get('SNAPSHOT_PATH', 'vendor_snapshot.bin')).invalidate()
+    stats['symbols'] = len(symbols)
+    return stats
+
+
+def export(backend: CacheBackend, output: str, include_meta: bool = False) -> int:
+    """Write every cache entry as NDJSON lines that `load` reads back"""
+    count = 0
+    with open(output, 'w', encoding='utf-8') as f:
+        for key, payload, timestamp in backend.iter_entries():
+            if key.startswith('meta_') and not include_meta:
+                continue
+            # Payloads are already JSON; splice them in rather than decode and re-encode
+            f.write(f'{{"key": {json.dumps(key)}, "timestamp": {json.dumps(timestamp)}, "data": {payload}}}\n')
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-load the API cache from dump files or an export')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = subcommands.add_parser('load', help='Load JSON/NDJSON dumps or an export into the cache')
+    load_parser.add_argument('paths', nargs='+', help='Files or directories (.json, .ndjson, .jsonl)')
+    load_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                             help='Parser processes (default: one per CPU)')
+    load_parser.add_argument('--batch-size', type=int, default=10000,
+                             help='Entries written per transaction / pipeline (default 10000)')
+    load_parser.add_argument('--chunk-mb', type=float, default=32.0,
+                             help='NDJSON files are split into ranges of about this size (default 32)')
+    load_parser.add_argument('--function', choices=FUNCTIONS,
+                             help='Treat every raw payload as this function instead of inferring it')
+    load_parser.add_argument('--keep-timestamps', action='store_true',
+                             help="Keep an export's original write times instead of stamping entries now")
+    load_parser.add_argument('--dry-run', action='store_true', help='Parse and validate without writing')
+
+    export_parser = subcommands.add_parser('export', help='Write every cache entry to an NDJSON file')
+    export_parser.add_argument('output')
+    export_parser.add_argument('--include-meta', action='store_true',
+                               help='Also export bookkeeping entries such as the tracked vendor list')
+    args = parser.parse_args()
+
+    # Same backend as the API (CACHE_BACKEND / CACHE_DB_PATH / CACHE_REDIS_URL)
+    backend = create_cache_backend()
+
+    if args.command == 'export':
+        started = time.monotonic()
+        count = export(backend, args.output, args.include_meta)
+        print(f"📦 Exported {count} entries to {args.output} in {time.monotonic() - started:.1f}s")
+        return
+
+    stats = load(backend, args.paths, args.workers, args.batch_size, args.chunk_mb,
+                 args.keep_timestamps, args.function, args.dry_run)
+    megabytes = stats['bytes'] / (1024 * 1024)
+    rate = megabytes / stats['seconds'] if stats['seconds'] else 0.0
+    action = 'Validated' if args.dry_run else 'Loaded'
+    print(f"\n📥 {action} {stats['entries']} entries for {stats['symbols']} symbols from {stats['files']} files")
+    print(f"  {megabytes:.1f} MB in {stats['seconds']:.1f}s ({rate:.0f} MB/s)")
+    if stats['rejected']:
+        print(f"  ⚠️  {stats['rejected']} records skipped")
+        sys.exit(1 if not stats['entries'] else 0)
+
+
+if __name__ == '__main__':
+    main()
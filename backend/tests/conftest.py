@@ -0,0 +1,45 @@
+"""
+Shared fixtures: the backend pointed at a local mock Alpha Vantage server
+
+Run from backend/ with `python -m pytest`.
+"""
+import os
+
+import pytest
+
+from benchmarks.bench_api import clear_cache, configure_environment
+from benchmarks.mock_alpha_vantage import MockAlphaVantageConfig, MockAlphaVantageServer
+from benchmarks.mock_redis import MockRedisServer
+
+
+@pytest.fixture(scope='session')
+def mock_upstream():
+    with MockAlphaVantageServer() as server:
+        yield server
+
+
+@pytest.fixture(scope='session')
+def app(mock_upstream, tmp_path_factory):
+    # The API module builds its services from the environment when first imported
+    configure_environment(mock_upstream.url, str(tmp_path_factory.mktemp('cache') / 'cache.db'), 0, 2)
+    os.environ['VENDOR_SYMBOLS'] = 'TEL,ST'
+    # Let a failed lookup be retried by the very next request
+    os.environ['NEGATIVE_CACHE_TTL'] = '0'
+    from app import create_app
+    return create_app()
+
+
+@pytest.fixture
+def client(app, mock_upstream):
+    """Test client over an empty cache and a well-behaved upstream"""
+    mock_upstream.config = MockAlphaVantageConfig()
+    mock_upstream.reset_counters()
+    clear_cache()
+    return app.test_client()
+
+
+
+@pytest.fixture
+def redis_server():
+    with MockRedisServer() as server:
+        yield server
@@ -0,0 +1,184 @@
+import threading
+import time
+
+import pytest
+from flask import Flask, Response, jsonify
+
+from app.utils.admission import RouteClass, init_admission, limited
+
+
+def run_in_thread(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def test_slots_queue_in_arrival_order_and_shed_the_rest():
+    route_class = RouteClass('upstream', max_concurrent=2, max_queue=2, queue_timeout=5)
+    assert route_class.acquire() and route_class.acquire()
+
+    admitted = []
+
+    def wait(name):
+        assert route_class.acquire()
+        admitted.append(name)
+
+    first = run_in_thread(wait, 'first')
+    wait_for(lambda: route_class.get_stats()['waiting'] == 1)
+    second = run_in_thread(wait, 'second')
+    wait_for(lambda: route_class.get_stats()['waiting'] == 2)
+    # The queue is full
+    assert not route_class.acquire()
+
+    route_class.release(0.5)
+    first.join(5)
+    route_class.release(0.5)
+    second.join(5)
+    assert admitted == ['first', 'second']
+
+    stats = route_class.get_stats()
+    assert stats['active'] == 2
+    assert stats['admitted'] == 4
+    assert stats['queued'] == 2
+    assert stats['shed_queue_full'] == 1
+
+
+def test_queued_request_is_shed_when_its_wait_runs_out():
+    route_class = RouteClass('upstream', max_concurrent=1, max_queue=4, queue_timeout=0.05)
+    assert route_class.acquire()
+    started = time.monotonic()
+    assert not route_class.acquire()
+    assert time.monotonic() - started >= 0.05
+    assert route_class.get_stats()['shed_timeout'] == 1
+    assert route_class.get_stats()['waiting'] == 0
+
+
+def test_retry_after_follows_hold_times_and_queue_length():
+    route_class = RouteClass('upstream', max_concurrent=2, max_queue=0, queue_timeout=3)
+    # No history yet: the queue timeout stands in for a hold time
+    assert route_class.retry_after() == 2
+    route_class.acquire()
+    route_class.release(10.0)
+    assert route_class.retry_after() == 5
+    route_class.acquire()
+    route_class.release(0.1)
+    # Moving average, clamped to at least a second
+    assert route_class.retry_after() == 5
+    for _ in range(30):
+        route_class.acquire()
+        route_class.release(0.1)
+    assert route_class.retry_after() == 1
+
+
+@pytest.fixture
+def limited_app():
+    """A small app with one slot per class and no queue, and views that block until released"""
+    app = Flask(__name__)
+    app.config.update(
+        ADMISSION_UPSTREAM_CONCURRENCY=1,
+        ADMISSION_UPSTREAM_QUEUE=0,
+        ADMISSION_QUEUE_TIMEOUT_SECONDS=0.1,
+        ADMISSION_STREAM_CONCURRENCY=1
+    )
+    app.gate = threading.Event()
+    app.entered = threading.Semaphore(0)
+    app.cheap = False
+
+    @app.route('/slow')
+    @limited('upstream', cheap=lambda: app.cheap)
+    def slow():
+        app.entered.release()
+        app.gate.wait(5)
+        return jsonify({'success': True})
+
+    @app.route('/events')
+    @limited('stream')
+    def events():
+        def generate():
+            # The test client reads up to the first chunk before returning
+            yield ': stream open\n\n'
+            app.entered.release()
+            app.gate.wait(5)
+            yield 'data: done\n\n'
+        return Response(generate(), mimetype='text/event-stream')
+
+    @app.route('/health')
+    def health():
+        return jsonify({'status': 'healthy'})
+
+    init_admission(app)
+    yield app
+    app.gate.set()
+
+
+def hold_slot(app, path):
+    """Start a request that occupies a slot until app.gate is set"""
+    responses = []
+    thread = run_in_thread(lambda: responses.append(app.test_client().get(path).get_data()))
+    assert app.entered.acquire(timeout=5)
+    return thread
+
+
+def test_full_class_answers_503_with_retry_after(limited_app):
+    client = limited_app.test_client()
+    holder = hold_slot(limited_app, '/slow')
+
+    response = client.get('/slow')
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['success'] is False
+    assert 'retry in' in response.get_json()['error']
+
+    # Other classes and unlimited routes are unaffected
+    assert client.get('/health').status_code == 200
+    stream = client.get('/events', buffered=False)
+    assert stream.status_code == 200
+
+    limited_app.gate.set()
+    holder.join(5)
+    stream.close()
+    assert client.get('/slow').status_code == 200
+    upstream = limited_app.extensions['admission']['upstream'].get_stats()
+    assert upstream['active'] == 0
+    assert upstream['shed_timeout'] + upstream['shed_queue_full'] == 1
+
+
+def test_stream_holds_its_slot_until_the_response_closes(limited_app):
+    client = limited_app.test_client()
+    stream_class = limited_app.extensions['admission']['stream']
+
+    stream = client.get('/events', buffered=False)
+    chunks = iter(stream.response)
+    # The first chunk was already read; the second waits for the gate
+    assert next(chunks) == b': stream open\n\n'
+    second = run_in_thread(next, chunks)
+    assert limited_app.entered.acquire(timeout=5)
+    assert stream_class.get_stats()['active'] == 1
+    refused = client.get('/events')
+    assert refused.status_code == 503
+    assert 'Retry-After' in refused.headers
+
+    limited_app.gate.set()
+    second.join(5)
+    # Sent everything, but the server has not closed the response yet
+    assert stream_class.get_stats()['active'] == 1
+    stream.close()
+    assert stream_class.get_stats()['active'] == 0
+
+
+def test_cheap_requests_skip_the_limit(limited_app):
+    client = limited_app.test_client()
+    holder = hold_slot(limited_app, '/slow')
+    limited_app.cheap = True
+    limited_app.gate.set()
+
+    assert client.get('/slow').status_code == 200
+    holder.join(5)
+    assert limited_app.extensions['admission']['upstream'].get_stats()['bypassed'] == 1
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from app.services.cache_backends import RedisCacheBackend, SQLiteCacheBackend
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'redis':
+        backend = RedisCacheBackend(request.getfixturevalue('redis_server').url, prefix='test:')
+    else:
+        backend = SQLiteCacheBackend(str(tmp_path / 'cache.db'), compaction_interval=0)
+    # A short log, so compaction trims its head and the trimmed count is stored
+    backend.CHANGE_LOG_MAX_ENTRIES = 3
+    return backend
+
+
+def test_clear_keeps_change_log_versions(backend):
+    backend.set_many({'vendor_TEL': '{}', 'OVERVIEW_TEL': '{}'})
+    backend.append_changes([('TEL', 'updated'), ('ST', 'updated'), ('DD', 'updated'),
+                            ('TEL', 'updated'), ('CE', 'updated')])
+    backend.compact()
+    version = backend.current_version()
+    symbol_versions = backend.get_symbol_versions(['TEL', 'CE'])
+    assert version == 5
+
+    assert backend.get_stats()['total_entries'] == 2
+    assert backend.clear() == 2
+    assert backend.get_stats()['total_entries'] == 0
+    assert backend.current_version() == version
+    assert backend.get_symbol_versions(['TEL', 'CE']) == symbol_versions
+    assert backend.append_changes([('ST', 'updated')]) == version + 1
+
+
+def test_clear_older_than_keeps_change_log_versions(backend):
+    backend.set_many({'vendor_TEL': '{}'}, {'vendor_TEL': '2000-01-01 00:00:00'})
+    backend.append_changes([('TEL', 'updated')] * 5)
+    backend.compact()
+
+    backend.clear_older_than(1)
+    assert backend.current_version() == 5
+    assert list(backend.iter_entries()) == []
+
+
+def test_concurrent_appends_keep_versions_consistent(redis_server):
+    # Separate clients, as in separate workers; compaction runs alongside the writers
+    backends = [RedisCacheBackend(redis_server.url, prefix='test:', compaction_interval=0) for _ in range(4)]
+    for backend in backends:
+        backend.CHANGE_LOG_MAX_ENTRIES = 50
+    symbols = ['TEL', 'ST', 'DD', 'CE', 'LYB']
+    returned = []
+
+    def write(backend, worker):
+        for i in range(40):
+            changes = [(symbols[(worker + i + j) % len(symbols)], 'updated') for j in range(3)]
+            returned.append(backend.append_changes(changes))
+            if i % 10 == 0:
+                backend.compact()
+
+    threads = [threading.Thread(target=write, args=(backend, worker)) for worker, backend in enumerate(backends)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    backend = backends[0]
+    assert backend.current_version() == 4 * 40 * 3
+    assert sorted(returned) == list(range(3, 4 * 40 * 3 + 1, 3))
+    backend.compact()
+    log = backend.get_changes(0, limit=1000)
+    assert log['oldest_version'] == 4 * 40 * 3 - 50 + 1
+    versions = [version for version, _, _ in log['changes']]
+    assert versions == list(range(log['oldest_version'], log['current_version'] + 1))
+    # The latest version per symbol is the last place it appears in the log
+    latest = {symbol: version for version, symbol, _ in log['changes']}
+    assert backend.get_symbol_versions(symbols) == latest
+
+
+def test_redis_change_log_is_compacted_in_the_background(redis_server):
+    backend = RedisCacheBackend(redis_server.url, prefix='test:', compaction_interval=0.05)
+    backend.CHANGE_LOG_MAX_ENTRIES = 3
+    backend.append_changes([('TEL', 'updated')] * 10)
+
+    deadline = time.monotonic() + 5
+    while backend.get_changes(0)['oldest_version'] != 8 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert backend.get_changes(0)['oldest_version'] == 8
+    assert backend.current_version() == 10
@@ -0,0 +1,151 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker, NegativeCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('upstream', failure_threshold=3, recovery_timeout=30)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    # A success in between starts the count over
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_state()['rejected_calls'] == 1
+    assert breaker.retry_after() == 30
+
+    clock.now += 10
+    assert breaker.retry_after() == 20
+    assert not breaker.allow_request()
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker('upstream', failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.retry_after() == 0
+    # Everyone else waits for the trial's outcome
+    assert not breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert all(breaker.allow_request() for _ in range(3))
+
+
+def test_failed_trial_reopens_for_a_full_timeout(clock):
+    breaker = CircuitBreaker('upstream', failure_threshold=5, recovery_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after() == 30
+    assert not breaker.allow_request()
+
+
+def test_released_trial_slot_goes_to_the_next_caller(clock):
+    breaker = CircuitBreaker('upstream', failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # e.g. the trial ran out of deadline before reaching upstream
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_single_trial_under_concurrent_callers(clock):
+    breaker = CircuitBreaker('upstream', failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    start = threading.Barrier(16)
+    allowed = []
+
+    def call():
+        start.wait()
+        allowed.append(breaker.allow_request())
+
+    threads = [threading.Thread(target=call) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert allowed.count(True) == 1
+
+
+def test_listeners_hear_every_transition(clock):
+    breaker = CircuitBreaker('upstream', failure_threshold=1, recovery_timeout=30)
+    states = []
+    breaker.add_listener(lambda: states.append(breaker.state))
+    breaker.add_listener(lambda: 1 / 0)  # A failing listener must not break the breaker
+
+    breaker.record_failure()
+    clock.now += 30
+    breaker.allow_request()
+    breaker.record_success()
+    assert states == [CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN, CircuitBreaker.CLOSED]
+
+
+def test_negative_cache_entries_expire(clock):
+    cache = NegativeCache(ttl_seconds=60)
+    cache.add('OVERVIEW', 'TEL', 'Invalid API call')
+    assert cache.get('OVERVIEW', 'TEL') == 'Invalid API call'
+    assert cache.get('OVERVIEW', 'ST') is None
+
+    clock.now += 59.9
+    assert cache.get('OVERVIEW', 'TEL') == 'Invalid API call'
+    clock.now += 0.1
+    assert cache.get('OVERVIEW', 'TEL') is None
+    assert cache.get_stats()['entries'] == 0
+    assert cache.get_stats()['hits'] == 2
+
+
+def test_negative_cache_makes_room_only_from_expired_entries(clock):
+    cache = NegativeCache(ttl_seconds=60, max_entries=2)
+    cache.add('OVERVIEW', 'TEL', 'failed')
+    clock.now += 30
+    cache.add('OVERVIEW', 'ST', 'failed')
+
+    # Full, and nothing has expired yet: the new failure is not remembered
+    cache.add('OVERVIEW', 'DD', 'failed')
+    assert cache.get('OVERVIEW', 'DD') is None
+
+    clock.now += 30
+    cache.add('OVERVIEW', 'DD', 'failed')
+    assert cache.get('OVERVIEW', 'DD') == 'failed'
+    assert cache.get('OVERVIEW', 'TEL') is None
+    assert cache.get('OVERVIEW', 'ST') == 'failed'
+    assert list(cache.get_stats()['failures']) == ['OVERVIEW_DD', 'OVERVIEW_ST']
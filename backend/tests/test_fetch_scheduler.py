@@ -0,0 +1,58 @@
+import threading
+
+from app.services.fetch_scheduler import PRIORITY_BACKFILL, FetchScheduler
+from app.services.key_manager import APIKeyManager
+
+
+def run_in_thread(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_quota_is_read_without_the_scheduler_lock():
+    # Stands in for a key manager that calls back into get_stats() while holding its own lock
+    key_lock = threading.RLock()
+    reading = threading.Event()
+
+    def remaining_quota():
+        reading.set()
+        with key_lock:
+            return 100
+
+    scheduler = FetchScheduler(remaining_quota)
+
+    def notify_under_key_lock():
+        with key_lock:
+            reading.wait(5)
+            scheduler.get_stats()
+
+    listener = run_in_thread(notify_under_key_lock)
+    backfill = run_in_thread(scheduler.run, 'OVERVIEW_TEL', lambda: {}, PRIORITY_BACKFILL)
+    listener.join(5)
+    backfill.join(5)
+    assert not listener.is_alive() and not backfill.is_alive()
+
+
+def test_blacklist_reset_with_waiting_backfill_does_not_deadlock(monkeypatch):
+    monkeypatch.delenv('ALPHA_VANTAGE_API_KEY', raising=False)
+    for i in range(1, 3):
+        monkeypatch.setenv(f'ALPHA_VANTAGE_API_KEY_{i}', f"TESTKEY{i:04d}XXXXXXXX")
+    monkeypatch.delenv('ALPHA_VANTAGE_API_KEY_3', raising=False)
+    key_manager = APIKeyManager()
+    scheduler = FetchScheduler(key_manager.get_remaining_quota)
+    key_manager.add_listener(scheduler.get_stats)
+    for key in key_manager.keys:
+        key_manager.mark_key_rate_limited(key)
+
+    gate = threading.Event()
+    # Keep the backfill queued (and its waiter looping on quota reads) behind a running fetch
+    busy = run_in_thread(scheduler.run, 'busy', lambda: gate.wait(5) or {})
+    backfills = [run_in_thread(scheduler.run, f'OVERVIEW_{i}', lambda: {}, PRIORITY_BACKFILL) for i in range(4)]
+    resets = [run_in_thread(key_manager.get_available_key) for _ in range(20)]
+    for thread in resets:
+        thread.join(5)
+    gate.set()
+    for thread in [busy, *backfills]:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in [busy, *backfills, *resets])
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from app.utils.flag_rules import DEFAULT_RULES, RULE_METRICS, RuleSet, load_rule_sets
+from app.utils.vendor_analysis import VendorAnalyzer
+
+
+def summary(symbol: str, category: str = 'Sensors', **metrics) -> dict:
+    values = dict.fromkeys(RULE_METRICS, 0.0)
+    values.update(metrics)
+    return {'symbol': symbol, 'category': category, **values}
+
+
+def rule(flag: str, metric: str, op: str, threshold, **extra) -> dict:
+    return {'flag': flag, 'metric': metric, 'op': op, 'threshold': threshold, **extra}
+
+
+@pytest.mark.parametrize('op, expected', [
+    ('<', [True, False, False]),
+    ('<=', [True, True, False]),
+    ('>', [False, False, True]),
+    ('>=', [False, True, True]),
+    ('==', [False, True, False]),
+    ('!=', [True, False, True])
+])
+def test_thresholds_compare_as_written(op, expected):
+    rules = RuleSet({'rules': [rule('FLAG', 'pe_ratio', op, 30)]})
+    flags = rules.evaluate([summary('A', pe_ratio=29.99), summary('B', pe_ratio=30), summary('C', pe_ratio=30.01)])
+    assert [vendor_flags == ['FLAG'] for vendor_flags in flags] == expected
+
+
+def test_category_threshold_takes_precedence_over_the_default():
+    rules = RuleSet({'rules': [
+        rule('HIGH_DEBT', 'debt_to_equity', '>', 1.0, categories={'Plastics/Materials': 2.0})
+    ]})
+    flags = rules.evaluate([
+        summary('TEL', 'Sensors', debt_to_equity=1.5),
+        summary('DD', 'Plastics/Materials', debt_to_equity=1.5),
+        summary('CE', 'Plastics/Materials', debt_to_equity=2.5),
+        summary('XYZ', 'Unknown', debt_to_equity=1.5)
+    ])
+    assert flags == [['HIGH_DEBT'], [], ['HIGH_DEBT'], ['HIGH_DEBT']]
+
+
+def test_flags_follow_rule_order():
+    rules = RuleSet({'rules': [
+        rule('LOW_ROE', 'roe', '<', 0.1),
+        rule('HIGH_PE', 'pe_ratio', '>', 30),
+        rule('VERY_HIGH_PE', 'pe_ratio', '>', 40)
+    ]})
+    assert rules.evaluate([summary('TEL', pe_ratio=42, roe=0.05)]) == [['LOW_ROE', 'HIGH_PE', 'VERY_HIGH_PE']]
+    assert rules.evaluate([]) == []
+
+
+@pytest.mark.parametrize('definition, message', [
+    ([], 'object with a "rules" list'),
+    ({'name': 'no rules'}, 'object with a "rules" list'),
+    ({'rules': ['HIGH_PE']}, 'rule 1: expected an object'),
+    ({'rules': [rule('', 'pe_ratio', '>', 30)]}, "'flag' must be a non-empty string"),
+    ({'rules': [rule('HIGH_PE', 'price', '>', 30)]}, "'metric' must be one of"),
+    ({'rules': [rule('HIGH_PE', 'pe_ratio', '=>', 30)]}, "'op' must be one of"),
+    ({'rules': [{'flag': 'HIGH_PE', 'metric': 'pe_ratio', 'op': '>'}]}, 'thresholds must be numbers'),
+    ({'rules': [rule('HIGH_PE', 'pe_ratio', '>', '30')]}, 'thresholds must be numbers'),
+    ({'rules': [rule('HIGH_PE', 'pe_ratio', '>', True)]}, 'thresholds must be numbers'),
+    ({'rules': [rule('HIGH_PE', 'pe_ratio', '>', 30, categories=['Sensors'])]}, "'categories' maps"),
+    ({'rules': [rule('HIGH_PE', 'pe_ratio', '>', 30, categories={'Sensors': None})]}, 'thresholds must be numbers'),
+    ({'rules': [rule('HIGH_PE', 'pe_ratio', '>', 30), rule('LOW_ROE', 'roe', '<', None)]}, 'rule 2 (LOW_ROE)')
+])
+def test_invalid_rules_are_rejected(definition, message):
+    with pytest.raises(ValueError, match=message.replace('(', r'\(').replace(')', r'\)')):
+        RuleSet(definition)
+
+
+def test_missing_fields_count_as_zero():
+    analyzer = VendorAnalyzer()
+    flags = analyzer.evaluate_flags({
+        # No overview figures at all: every "too low" rule fires, no "too high" rule does
+        'TEL': {'overview': {'Name': 'TE Connectivity'}},
+        'ST': {'overview': {'PERatio': 'None', 'RevenueTTM': '-'}},
+        'DD': {'error': 'upstream failed'}
+    }, DEFAULT_RULES)
+    low_rules = ['LOW_REVENUE', 'LOW_LIQUIDITY', 'LOW_ROE', 'LOW_OPERATING_MARGIN', 'LOW_PROFIT_MARGIN']
+    assert flags == {'TEL': low_rules, 'ST': low_rules, 'DD': ['API_ERROR']}
+
+
+def test_rule_sets_load_from_a_directory(tmp_path):
+    (tmp_path / 'strict.json').write_text(json.dumps({'rules': [rule('HIGH_PE', 'pe_ratio', '>', 20)]}))
+    (tmp_path / 'named.json').write_text(json.dumps({'name': 'lenient', 'rules': []}))
+    (tmp_path / 'broken.json').write_text(json.dumps({'rules': [rule('HIGH_PE', 'pe', '>', 20)]}))
+    (tmp_path / 'notes.txt').write_text('not a rule set')
+
+    rule_sets = load_rule_sets(str(tmp_path))
+    assert sorted(rule_sets) == ['default', 'lenient', 'strict']
+    assert rule_sets['default'] is DEFAULT_RULES
+    assert load_rule_sets(str(tmp_path / 'missing')) == {'default': DEFAULT_RULES}
+
+
+def test_flags_endpoint_rechecks_cached_vendors(client, mock_upstream):
+    analysis = client.get('/api/vendors').get_json()['data']['analysis']
+    calls = sum(mock_upstream.calls.values())
+
+    response = client.post('/api/vendors/flags', json={'rules': {
+        'name': 'pe-only',
+        'rules': [rule('HIGH_PE', 'pe_ratio', '>', 40, categories={'Sensors': 15})]
+    }})
+    data = response.get_json()['data']
+    assert response.status_code == 200
+    assert data['rules'] == 'pe-only'
+    # TEL (P/E 42.39) and ST (15.2) are both Sensors, so the category threshold applies
+    assert data['flags'] == {'TEL': ['HIGH_PE'], 'ST': ['HIGH_PE']}
+    assert data['counts'] == {'HIGH_PE': 2}
+    assert data['missing'] == []
+    assert sum(mock_upstream.calls.values()) == calls
+
+    # Named sets give the same flags as the full analysis
+    data = client.post('/api/vendors/flags', json={'rules': 'default'}).get_json()['data']
+    assert data['flags'] == analysis['flags']
+
+
+def test_flags_endpoint_never_goes_upstream(client, mock_upstream):
+    data = client.post('/api/vendors/flags', json={}).get_json()['data']
+    assert data['rules'] == 'default'
+    assert data['flags'] == {}
+    assert data['missing'] == ['TEL', 'ST']
+    assert sum(mock_upstream.calls.values()) == 0
+
+
+@pytest.mark.parametrize('body, message', [
+    ({'rules': 'nonexistent'}, "Unknown rule set 'nonexistent'"),
+    ({'rules': {'rules': [rule('HIGH_PE', 'pe_ratio', '>>', 30)]}}, "'op' must be one of")
+])
+def test_flags_endpoint_rejects_bad_rules(client, body, message):
+    response = client.post('/api/vendors/flags', json=body)
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
@@ -0,0 +1,98 @@
+import json
+from concurrent.futures import Future
+
+import pytest
+
+import ingest_cache
+from app.services.cache_backends import SQLiteCacheBackend
+from app.utils.statement_stream import StatementSelection
+from benchmarks.mock_alpha_vantage import MockAlphaVantageConfig, build_payload
+
+
+def test_loaded_statement_matches_a_fetched_one(client, monkeypatch):
+    from app.api.routes import alpha_vantage
+    monkeypatch.setattr(ingest_cache, 'STATEMENT_SELECTION', alpha_vantage.statement_selection)
+
+    assert client.get('/api/vendors/TEL').status_code == 200
+    fetched = alpha_vantage.cache.get('INCOME_STATEMENT_TEL')
+    dump = build_payload('INCOME_STATEMENT', 'TEL', MockAlphaVantageConfig())
+
+    key, payload, timestamp = ingest_cache.parse_record(dump, None, None)
+    assert key == 'INCOME_STATEMENT_TEL'
+    assert payload == fetched
+    assert timestamp is None
+
+
+def test_selection_applies_to_raw_and_exported_statements(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_cache, 'STATEMENT_SELECTION',
+                        StatementSelection({'annualReports': 1}, ['totalRevenue']))
+    statement = build_payload('INCOME_STATEMENT', 'ST', MockAlphaVantageConfig(quarterly_reports=4, annual_reports=3))
+    overview = build_payload('OVERVIEW', 'ST', MockAlphaVantageConfig())
+    dump = tmp_path / 'dump.ndjson'
+    dump.write_text('\n'.join(json.dumps(record) for record in [
+        statement,
+        {'key': 'INCOME_STATEMENT_DD', 'timestamp': '2024-01-02T03:04:05Z', 'data': statement},
+        overview
+    ]) + '\n')
+
+    entries, rejects, _ = ingest_cache.parse_chunk((str(dump), 0, dump.stat().st_size, None))
+    assert rejects == []
+    payloads = {key: json.loads(payload) for key, payload, _ in entries}
+    assert sorted(payloads) == ['INCOME_STATEMENT_DD', 'INCOME_STATEMENT_ST', 'OVERVIEW_ST']
+    for key in ('INCOME_STATEMENT_ST', 'INCOME_STATEMENT_DD'):
+        assert 'quarterlyReports' not in payloads[key]
+        assert payloads[key]['annualReports'] == [
+            {field: statement['annualReports'][0][field] for field in ('fiscalDateEnding', 'reportedCurrency', 'totalRevenue')
+             if field in statement['annualReports'][0]}
+        ]
+    # Overviews are not statements and are stored whole
+    assert payloads['OVERVIEW_ST'] == overview
+
+
+def test_statement_left_empty_by_the_selection_is_rejected(monkeypatch):
+    monkeypatch.setattr(ingest_cache, 'STATEMENT_SELECTION', StatementSelection({}))
+    statement = build_payload('CASH_FLOW', 'TEL', MockAlphaVantageConfig())
+    with pytest.raises(ValueError, match='after statement selection'):
+        ingest_cache.parse_record(statement, None, None)
+
+
+def test_bounded_map_keeps_a_window_of_calls_in_flight():
+    submitted = []
+
+    class Executor:
+        def submit(self, fn, item):
+            submitted.append(item)
+            future = Future()
+            future.set_result(fn(item))
+            return future
+
+    results = ingest_cache.bounded_map(Executor(), lambda item: item * 10, iter(range(20)), window=4)
+    for consumed, result in enumerate(results, 1):
+        assert result == (consumed - 1) * 10
+        # Everything handed out plus the window, never the whole input
+        assert len(submitted) <= consumed - 1 + 4
+    assert submitted == list(range(20))
+
+
+def test_parallel_load_writes_every_chunk_in_order(tmp_path, monkeypatch):
+    monkeypatch.setenv('SNAPSHOT_ENABLED', 'False')
+    dump = tmp_path / 'overviews.ndjson'
+    lines = []
+    for round_ in range(3):
+        for symbol in ('TEL', 'ST', 'DD', 'CE', 'LYB'):
+            overview = build_payload('OVERVIEW', symbol, MockAlphaVantageConfig())
+            overview['Name'] = f"{symbol} round {round_}"
+            lines.append(json.dumps(overview))
+    dump.write_text('\n'.join(lines) + '\n')
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.db'), compaction_interval=0)
+
+    # Tiny chunks, so there are many more of them than the window
+    stats = ingest_cache.load(backend, [str(dump)], workers=2, batch_size=4, chunk_mb=0.001,
+                              keep_timestamps=False, forced_function=None, dry_run=True)
+    assert stats['entries'] == 15 and stats['rejected'] == 0
+
+    ingest_cache.load(backend, [str(dump)], workers=2, batch_size=4, chunk_mb=0.001,
+                      keep_timestamps=False, forced_function=None, dry_run=False)
+    # Later lines win, as with a single worker
+    assert json.loads(backend.get('OVERVIEW_LYB'))['Name'] == 'LYB round 2'
+    assert json.loads(backend.get('OVERVIEW_TEL'))['Name'] == 'TEL round 2'
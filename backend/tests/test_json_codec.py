@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from app.utils import json_codec
+
+DOCUMENTS = [
+    {'zeta': 1, 'alpha': {'b': [1, 2.5, None], 'a': True}, 'Ünïcode': 'São Paulo – 東京'},
+    {'symbol': 'TEL', 'quarterlyReports': [{'fiscalDateEnding': '2024-03-31', 'totalRevenue': '3967000000'}]},
+    # Key indexes, as in the key manager's key_usage
+    {'key_usage': {3: 12, 0: 40, 1: 7}, 'remaining': -0.125},
+    [],
+    'emoji 🚀 and "quotes" \\ and\ncontrol\tcharacters'
+]
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_response_matches_stdlib_encoder(document):
+    expected = json.dumps(document, separators=(',', ':'), sort_keys=True, ensure_ascii=False).encode('utf-8')
+    assert json_codec.dumps_response(document) == expected
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_payload_matches_stdlib_encoder_and_keeps_key_order(document):
+    expected = json.dumps(document, separators=(',', ':'), ensure_ascii=False)
+    assert json_codec.dumps_payload(document) == expected
+    assert json_codec.loads(json_codec.dumps_payload(document)) == json.loads(expected)
+
+
+@pytest.mark.skipif(json_codec.orjson is None, reason='orjson is not installed')
+def test_non_string_keys_stay_on_orjson(monkeypatch):
+    def fallback(*args, **kwargs):
+        raise AssertionError('fell back to the stdlib encoder')
+    monkeypatch.setattr(json_codec.json, 'dumps', fallback)
+
+    assert json_codec.dumps_response({'key_usage': {1: 3, 0: 2}}) == b'{"key_usage":{"0":2,"1":3}}'
+    assert json_codec.dumps_payload({1: 'a'}) == '{"1":"a"}'
+
+
+def test_manifest_over_old_format_components_is_reused(client):
+    from app.api.routes import alpha_vantage
+    from app.utils.sample_data import get_sample_vendor_data
+
+    # Components as written before payloads were compact
+    sample = get_sample_vendor_data('TEL')
+    alpha_vantage.cache.set_many({
+        'OVERVIEW_TEL': json.dumps(sample['overview']),
+        'INCOME_STATEMENT_TEL': json.dumps(sample['income_statement'])
+    })
+    cached, rebuilt = alpha_vantage.read_vendor_cache(['TEL'])
+    assert list(rebuilt) == ['TEL']
+
+    alpha_vantage.cache_vendor_data(rebuilt)
+    cached, rebuilt = alpha_vantage.read_vendor_cache(['TEL'])
+    assert list(cached) == ['TEL'] and not rebuilt
@@ -0,0 +1,120 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.cache_backends import TIMESTAMP_FORMAT
+
+
+@pytest.fixture
+def snapshot(app):
+    from app.api.routes import snapshot
+    return snapshot
+
+
+def expire_vendor(symbol):
+    """Age a vendor's cache entries past the TTL, as if it had not been fetched for a while"""
+    from app.api.routes import alpha_vantage
+    keys = [f"vendor_{symbol}", f"OVERVIEW_{symbol}", f"INCOME_STATEMENT_{symbol}"]
+    payloads = {key: alpha_vantage.cache.get(key) for key in keys}
+    stale = (datetime.utcnow() - timedelta(hours=2)).strftime(TIMESTAMP_FORMAT)
+    alpha_vantage.cache.set_many(payloads, {key: stale for key in keys})
+
+
+def vendor_problems(body):
+    return {
+        symbol: vendor.get('error') or vendor.get('source')
+        for symbol, vendor in body['data']['vendors'].items()
+        if 'error' in vendor or vendor.get('degraded') or vendor.get('source') == 'sample_data'
+    }
+
+
+def test_snapshot_skipped_until_upstream_recovers(client, mock_upstream, snapshot):
+    client.get('/api/vendors')
+    expire_vendor('ST')
+    snapshot.invalidate()
+    writes = snapshot.get_stats()['writes']
+
+    # Every other vendor is cached, so nothing invalidates the build but the failure itself
+    mock_upstream.config.fail_next = 1
+    failed = client.get('/api/vendors').get_json()
+    assert failed['success']
+    assert 'ST' in vendor_problems(failed)
+    assert snapshot.get_stats()['writes'] == writes
+    assert not os.path.exists(snapshot.path)
+
+    recovered = client.get('/api/vendors').get_json()
+    assert not vendor_problems(recovered)
+
+    # Fetching rewrote vendor entries, so the first rebuild from a full cache publishes it
+    rebuilt = client.get('/api/vendors').get_json()
+    assert snapshot.get_stats()['writes'] == writes + 1
+
+    hits = snapshot.get_stats()['hits']
+    served = client.get('/api/vendors').get_json()
+    assert snapshot.get_stats()['hits'] == hits + 1
+    assert served == rebuilt
+    assert not vendor_problems(served)
+
+
+def test_snapshot_entry_serves_vendor(client):
+    listed = client.get('/api/vendors').get_json()
+    vendor = client.get('/api/vendors/TEL')
+    assert vendor.status_code == 200
+    assert vendor.get_json()['data']['overview'] == listed['data']['vendors']['TEL']['overview']
+
+
+def test_snapshot_entries_are_views_that_outlive_a_swap(tmp_path):
+    from app.services.snapshot import VendorSnapshot, iter_chunks, write_snapshot
+    path = str(tmp_path / 'snapshot.bin')
+    write_snapshot(path, {'vendors': b'{"generation": 1}'}, 1)
+    reader = VendorSnapshot(path, check_interval=0)
+
+    entry = reader.get('vendors')
+    assert isinstance(entry, memoryview)
+    assert b''.join(iter_chunks(entry, size=4)) == b'{"generation": 1}'
+
+    write_snapshot(path, {'vendors': b'{"generation": 2}'}, 2)
+    assert bytes(reader.get('vendors')) == b'{"generation": 2}'
+    assert bytes(entry) == b'{"generation": 1}'
+
+
+def test_invalidation_in_another_worker_stops_a_stale_write(tmp_path):
+    from app.services.snapshot import VendorSnapshot
+    path = str(tmp_path / 'snapshot.bin')
+    change_log = {'version': 7}
+
+    def cache_write_elsewhere():
+        # What another worker does when it refreshes a vendor: log the change, drop the snapshot
+        change_log['version'] += 1
+        other.invalidate()
+
+    building = VendorSnapshot(path, check_interval=0, data_version=lambda: change_log['version'])
+    other = VendorSnapshot(path, check_interval=0, data_version=lambda: change_log['version'])
+
+    # No file yet, so the invalidation has nothing to remove
+    token = building.begin_build()
+    cache_write_elsewhere()
+    assert not building.write({'vendors': b'{"stale": true}'}, token)
+    assert building.get('vendors') is None and other.get('vendors') is None
+
+    token = building.begin_build()
+    assert building.write({'vendors': b'{"stale": false}'}, token)
+    assert bytes(other.get('vendors')) == b'{"stale": false}'
+
+
+def test_change_during_write_is_not_published(tmp_path, monkeypatch):
+    from app.services import snapshot as snapshot_module
+    path = str(tmp_path / 'snapshot.bin')
+    change_log = {'version': 1}
+    building = snapshot_module.VendorSnapshot(path, check_interval=0, data_version=lambda: change_log['version'])
+    write_snapshot = snapshot_module.write_snapshot
+
+    def slow_write(*args):
+        change_log['version'] += 1  # Another worker writes while the file is being written
+        return write_snapshot(*args)
+    monkeypatch.setattr(snapshot_module, 'write_snapshot', slow_write)
+
+    assert not building.write({'vendors': b'{}'}, building.begin_build())
+    assert building.get('vendors') is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from app.utils.statement_stream import StatementSelection, parse_statement
+
+SELECTION = StatementSelection({'annualReports': 2, 'quarterlyReports': None}, ['totalRevenue', 'note'])
+
+BODY = json.dumps({
+    'symbol': 'TEL',
+    'annualReports': [
+        {'fiscalDateEnding': '2024-12-31', 'reportedCurrency': 'USD', 'totalRevenue': '16581000000',
+         'netIncome': '-1234.5e3', 'note': 'quoted "restated" \\ figures\nsecond line'},
+        {'fiscalDateEnding': '2023-12-31', 'reportedCurrency': 'EUR', 'totalRevenue': 1.5e-7,
+         'note': 'Zürich – 東京 🚀 \u0000 \t', 'nested': {'a': [1, 2, {'b': None}]}},
+        {'fiscalDateEnding': '2022-12-31', 'reportedCurrency': 'USD', 'totalRevenue': '1'}
+    ],
+    'quarterlyReports': [
+        {'fiscalDateEnding': '2024-09-30', 'totalRevenue': 123456789012345, 'grossProfit': -0.000123}
+    ],
+    'Note': 'keys with \\"escapes\\" and é'
+}, ensure_ascii=False).encode('utf-8')
+EXPECTED = SELECTION.apply(json.loads(BODY))
+
+
+def chunked(body: bytes, size: int):
+    return (body[start:start + size] for start in range(0, len(body), size))
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 7, 16, 64, 4096])
+def test_same_result_for_any_chunk_size(size):
+    assert parse_statement(chunked(BODY, size), SELECTION) == EXPECTED
+
+
+def test_every_split_point_of_a_token():
+    # Cuts inside numbers, escapes, literals, keys and multi-byte characters
+    body = '{"symbol":"ST","n":-12345.678e-2,"t":true,"z":null,"s":"a\\"b\\u00e9\\\\","u":"日本"}'.encode('utf-8')
+    expected = json.loads(body)
+    for cut in range(1, len(body)):
+        assert parse_statement([body[:cut], body[cut:]], SELECTION) == expected, cut
+
+
+def test_selection_keeps_leading_periods_and_id_fields():
+    annual = EXPECTED['annualReports']
+    assert [report['fiscalDateEnding'] for report in annual] == ['2024-12-31', '2023-12-31']
+    assert set(annual[0]) == {'fiscalDateEnding', 'reportedCurrency', 'totalRevenue', 'note'}
+    assert annual[0]['note'] == 'quoted "restated" \\ figures\nsecond line'
+    assert EXPECTED['quarterlyReports'][0]['totalRevenue'] == 123456789012345
+
+    only_annual = StatementSelection({'annualReports': None})
+    parsed = parse_statement(chunked(BODY, 10), only_annual)
+    assert 'quarterlyReports' not in parsed
+    assert len(parsed['annualReports']) == 3
+    assert parsed['annualReports'][1]['nested'] == {'a': [1, 2, {'b': None}]}
+
+
+def test_truncated_bodies_are_rejected():
+    for cut in range(len(BODY)):
+        with pytest.raises(ValueError):
+            parse_statement(chunked(BODY[:cut], 7), SELECTION)
+
+
+@pytest.mark.parametrize('body', [b'{"symbol":"TEL"} {}', b'{"symbol":"TEL"}]', b'[1, 2] 3'])
+def test_trailing_data_is_rejected(body):
+    with pytest.raises(ValueError):
+        parse_statement(chunked(body, 3), SELECTION)
+
+
+@pytest.mark.parametrize('body', [
+    b'{"Information": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."}',
+    b'{"Error Message": "Invalid API call."}',
+    b'{}',
+    b'["not", "an", "object"]',
+    b'  "text"  '
+])
+def test_notices_and_other_bodies_decode_as_they_are(body):
+    assert parse_statement(chunked(body, 4), SELECTION) == json.loads(body)
+
+
+def test_report_key_without_an_array_is_kept_as_is():
+    body = b'{"annualReports": "none", "quarterlyReports": null}'
+    assert parse_statement(chunked(body, 5), SELECTION) == {'annualReports': 'none', 'quarterlyReports': None}
@@ -0,0 +1,45 @@
+import json
+import time
+
+from benchmarks.mock_alpha_vantage import MockAlphaVantageConfig
+
+
+def _events(body: str) -> list:
+    """(event, payload) for each Server-Sent Events message in `body`"""
+    events = []
+    for message in body.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_stream_stops_fetching_once_its_budget_is_spent(client, mock_upstream):
+    mock_upstream.config = MockAlphaVantageConfig(latency_ms=800)
+
+    started = time.monotonic()
+    events = _events(client.get('/api/vendors/stream?budget=1.5').get_data(as_text=True))
+    elapsed = time.monotonic() - started
+
+    # Two cold vendors take four 0.8s calls without a deadline
+    assert elapsed < 2.5
+    vendors = {payload['symbol']: payload['data'] for event, payload in events if event == 'vendor'}
+    assert set(vendors) == {'TEL', 'ST'}
+    assert any(vendor.get('degraded') for vendor in vendors.values())
+    assert events[-1][0] == 'complete'
+
+
+def test_stream_gives_back_its_upstream_slot_before_the_client_is_done(app, client):
+    upstream = app.extensions['admission']['upstream']
+    response = client.get('/api/vendors/stream', buffered=False)
+    assert upstream.get_stats()['active'] == 1
+
+    received = ''
+    chunks = iter(response.response)
+    while received.count('event: vendor') < 2:
+        chunk = next(chunks)
+        received += chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
+    # Every vendor is fetched, but the client has not read the rest of the stream
+    assert upstream.get_stats()['active'] == 0
+    response.close()
+    assert upstream.get_stats()['active'] == 0
@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.fixture
+def broken_change_log(app, monkeypatch):
+    from app.api.routes import alpha_vantage
+
+    def unreadable(*_):
+        raise ConnectionError('change log unavailable')
+    monkeypatch.setattr(alpha_vantage.cache, 'current_version', unreadable)
+    monkeypatch.setattr(alpha_vantage.cache, 'get_symbol_versions', unreadable)
+
+
+def test_vendors_served_when_versions_unreadable(client, broken_change_log):
+    from app.api.routes import snapshot
+    writes = snapshot.get_stats()['writes']
+
+    for _ in range(2):
+        body = client.get('/api/vendors').get_json()
+        assert body['success']
+        assert body['data']['version'] == 0
+        assert {vendor['version'] for vendor in body['data']['vendors'].values()} == {0}
+    # Version 0 is only a safe fallback for this response, not one to share
+    assert snapshot.get_stats()['writes'] == writes
+
+
+def test_vendor_served_when_versions_unreadable(client, broken_change_log):
+    response = client.get('/api/vendors/TEL')
+    assert response.status_code == 200
+    assert response.get_json()['data']['version'] == 0
@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
 import { Database, Trash2, RefreshCw, BarChart3 } from 'lucide-react';
+import { subscribe } from '../serverEvents';
 
 const CacheManager = () => {
   const [isOpen, setIsOpen] = useState(false);
@@ -68,9 +69,12 @@ const CacheManager = () => {
   };
 
   React.useEffect(() => {
-    if (isOpen) {
-      fetchCacheStats();
+    if (!isOpen) {
+      return undefined;
     }
+    fetchCacheStats();
+    // Keep the open modal current from pushed key-state changes
+    return subscribe('keys', (stats) => setCacheStats((previous) => ({ ...previous, ...stats })));
   }, [isOpen]);
 
   return (
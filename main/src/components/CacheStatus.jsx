@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Database, Clock, CheckCircle, AlertCircle } from 'lucide-react';
+import { subscribe, reconnect, serverEventsSupported } from '../serverEvents';
+import { POLL_INTERVAL_MS, watchStream } from '../streamFallback';
 
 const CacheStatus = () => {
   const [cacheStats, setCacheStats] = useState(null);
@@ -25,9 +27,25 @@ const CacheStatus = () => {
 
   useEffect(() => {
     fetchCacheStats();
-    // Refresh every 30 seconds
-    const interval = setInterval(fetchCacheStats, 30000);
-    return () => clearInterval(interval);
+
+    if (!serverEventsSupported()) {
+      // No push channel: fall back to polling every 30 seconds
+      const interval = setInterval(fetchCacheStats, POLL_INTERVAL_MS);
+      return () => clearInterval(interval);
+    }
+
+    // Key state is pushed by the backend whenever it changes; while the stream
+    // is down, poll and retry it with backoff
+    const stopFallback = watchStream({ subscribe, reconnect, poll: fetchCacheStats });
+    const unsubscribeHello = subscribe('hello', (payload) => setCacheStats(payload.keys));
+    const unsubscribeKeys = subscribe('keys', setCacheStats);
+    const unsubscribeResync = subscribe('resync', fetchCacheStats);
+    return () => {
+      stopFallback();
+      unsubscribeHello();
+      unsubscribeKeys();
+      unsubscribeResync();
+    };
   }, []);
 
   if (loading) {
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import Navbar from './Navbar';
 import VendorTable from './VendorTable';
@@ -8,6 +8,7 @@ import ErrorMessage from './ErrorMessage';
 import CacheStatus from './CacheStatus';
 import CacheManager from './CacheManager';
 import { AlertTriangle, CheckCircle, RefreshCw, Download } from 'lucide-react';
+import { subscribe } from '../serverEvents';
 
 const API_BASE_URL = process.env.NODE_ENV === 'production' 
   ? 'https://windborne-systems-app.onrender.com/api' 
@@ -19,6 +20,42 @@ const VendorDashboard = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [lastUpdated, setLastUpdated] = useState(null);
+  const [streaming, setStreaming] = useState(false);
+  const streamRef = useRef(null);
+  const loadingRef = useRef(false);
+  loadingRef.current = loading;
+
+  // Re-fetch just the vendor whose data version changed on the server
+  const refreshVendor = async (symbol) => {
+    try {
+      const response = await axios.get(`${API_BASE_URL}/vendors/${symbol}`);
+      if (!response.data.success) {
+        return;
+      }
+      const { row, summary, flags } = response.data.analysis;
+      setVendors((previous) => ({ ...(previous || {}), [symbol]: response.data.data }));
+      setAnalysis((previous) => {
+        if (!previous) {
+          return previous;
+        }
+        const others = previous.comparison_table.filter((existing) => existing.Symbol !== symbol);
+        const comparisonTable = !row
+          ? others
+          : others.length < previous.comparison_table.length
+            ? previous.comparison_table.map((existing) => (existing.Symbol === symbol ? row : existing))
+            : [...others, row];
+        return {
+          ...previous,
+          comparison_table: comparisonTable,
+          summary: { ...previous.summary, [symbol]: summary },
+          flags: { ...previous.flags, [symbol]: flags }
+        };
+      });
+      setLastUpdated(new Date().toLocaleString());
+    } catch (err) {
+      console.error(`Failed to refresh ${symbol}:`, err);
+    }
+  };
 
   const fetchVendorData = async () => {
     setLoading(true);
@@ -41,6 +78,62 @@ const VendorDashboard = () => {
     }
   };
 
+  // Progressive load: rows appear as each vendor is fetched instead of after all of them
+  const streamVendorData = () => {
+    if (typeof EventSource === 'undefined') {
+      fetchVendorData();
+      return;
+    }
+
+    streamRef.current?.close();
+    setLoading(true);
+    setStreaming(true);
+    setError(null);
+
+    const source = new EventSource(`${API_BASE_URL}/vendors/stream`);
+    streamRef.current = source;
+    let received = 0;
+    const streamedVendors = {};
+    const streamedAnalysis = { summary: {}, comparison_table: [], flags: {}, insights: [] };
+
+    source.addEventListener('vendor', (event) => {
+      const message = JSON.parse(event.data);
+      received += 1;
+      streamedVendors[message.symbol] = message.data;
+      streamedAnalysis.flags[message.symbol] = message.flags;
+      if (message.row) {
+        streamedAnalysis.summary[message.symbol] = message.summary;
+        streamedAnalysis.comparison_table.push(message.row);
+      }
+      setVendors({ ...streamedVendors });
+      setAnalysis({ ...streamedAnalysis, comparison_table: [...streamedAnalysis.comparison_table] });
+    });
+
+    source.addEventListener('complete', (event) => {
+      const message = JSON.parse(event.data);
+      setAnalysis({ ...streamedAnalysis, comparison_table: [...streamedAnalysis.comparison_table], insights: message.insights });
+      setLastUpdated(new Date().toLocaleString());
+      setLoading(false);
+      setStreaming(false);
+      source.close();
+    });
+
+    source.addEventListener('error', (event) => {
+      source.close();
+      setStreaming(false);
+      if (event.data) {
+        setError(JSON.parse(event.data).error || 'Failed to stream vendor data');
+        setLoading(false);
+      } else if (received === 0) {
+        // Stream unavailable (proxy, old backend): fall back to the single request
+        fetchVendorData();
+      } else {
+        setError('Connection lost while loading vendor data');
+        setLoading(false);
+      }
+    });
+  };
+
   const exportToCSV = async () => {
     try {
       const response = await axios.get(`${API_BASE_URL}/vendors/export/csv`, {
@@ -61,7 +154,26 @@ const VendorDashboard = () => {
   };
 
   useEffect(() => {
-    fetchVendorData();
+    streamVendorData();
+    return () => streamRef.current?.close();
+  }, []);
+
+  useEffect(() => {
+    const unsubscribeVendor = subscribe('vendor', ({ symbol }) => {
+      // Our own load writes the cache too; it already has the fresh data
+      if (!loadingRef.current) {
+        refreshVendor(symbol);
+      }
+    });
+    const unsubscribeResync = subscribe('resync', () => {
+      if (!loadingRef.current) {
+        streamVendorData();
+      }
+    });
+    return () => {
+      unsubscribeVendor();
+      unsubscribeResync();
+    };
   }, []);
 
   if (loading && !vendors) {
@@ -69,7 +181,7 @@ const VendorDashboard = () => {
   }
 
   if (error && !vendors) {
-    return <ErrorMessage message={error} onRetry={fetchVendorData} />;
+    return <ErrorMessage message={error} onRetry={streamVendorData} />;
   }
 
   return (
@@ -110,7 +222,7 @@ const VendorDashboard = () => {
         )}
 
         {/* Loading Overlay */}
-        {loading && vendors && (
+        {loading && vendors && !streaming && (
           <div className="fixed inset-0 bg-slate-900/20 flex items-center justify-center z-50">
             <div className="bg-white rounded-2xl p-8 flex items-center space-x-4 shadow-xl">
               <RefreshCw className="w-6 h-6 animate-spin text-blue-500" />
@@ -126,7 +238,7 @@ const VendorDashboard = () => {
             <div className="flex items-center justify-between mb-6">
               <div className="flex items-center space-x-3">
                 <button
-                  onClick={fetchVendorData}
+                  onClick={streamVendorData}
                   disabled={loading}
                   className="inline-flex items-center px-4 py-2 border border-slate-200 rounded-lg shadow-sm text-sm font-medium text-slate-600 bg-white hover:bg-slate-50 hover:shadow-md focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-slate-300 disabled:opacity-50 transition-all duration-200"
                 >
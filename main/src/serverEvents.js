@@ -0,0 +1,77 @@
+// One shared EventSource per tab for backend change notifications (/api/events).
+// Components subscribe to named events instead of polling the API.
+//
+// Two connection events are dispatched alongside the server's own: 'open'
+// once the stream is up, and 'error' ({ closed }) when it drops. With closed
+// false the browser is already reconnecting; with closed true (e.g. the
+// server turned the stream away with a 503) it has given up, and callers
+// should fall back to polling and call reconnect() later.
+
+const EVENTS_URL = process.env.NODE_ENV === 'production'
+  ? 'https://windborne-systems-app.onrender.com/api/events'
+  : 'http://localhost:5000/api/events';
+
+const EVENT_NAMES = ['hello', 'keys', 'vendor', 'resync'];
+
+let source = null;
+const listeners = new Map();
+
+const notify = (name, payload) => {
+  (listeners.get(name) || new Set()).forEach((handler) => handler(payload));
+};
+
+const dispatch = (name, event) => {
+  notify(name, event.data ? JSON.parse(event.data) : {});
+};
+
+const hasListeners = () => [...listeners.values()].some((handlers) => handlers.size > 0);
+
+const open = () => {
+  if (source || typeof EventSource === 'undefined') {
+    return;
+  }
+  const current = new EventSource(EVENTS_URL);
+  source = current;
+  EVENT_NAMES.forEach((name) => {
+    current.addEventListener(name, (event) => dispatch(name, event));
+  });
+  current.onopen = () => notify('open', {});
+  current.onerror = () => {
+    const closed = current.readyState === EventSource.CLOSED;
+    if (closed && source === current) {
+      // Dropped for good; the next reconnect() starts a fresh connection
+      source = null;
+    }
+    notify('error', { closed });
+  };
+};
+
+const closeIfIdle = () => {
+  if (!hasListeners() && source) {
+    source.close();
+    source = null;
+  }
+};
+
+export const serverEventsSupported = () => typeof EventSource !== 'undefined';
+
+// Open a new connection after the last one closed; a no-op while one is open or connecting
+export const reconnect = () => {
+  if (hasListeners()) {
+    open();
+  }
+};
+
+// Returns an unsubscribe function for use as a useEffect cleanup
+export const subscribe = (name, handler) => {
+  if (!listeners.has(name)) {
+    listeners.set(name, new Set());
+  }
+  listeners.get(name).add(handler);
+  open();
+
+  return () => {
+    listeners.get(name).delete(handler);
+    closeIfIdle();
+  };
+};
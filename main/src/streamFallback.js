@@ -0,0 +1,59 @@
+// What to do while the /api/events stream is down (the server sheds
+// subscribers past its limit with a 503): poll instead, and try the stream
+// again with jittered exponential backoff until it opens.
+//
+// Takes subscribe/reconnect from serverEvents and the timer functions as
+// arguments, so it runs (and is tested) outside the browser.
+
+export const POLL_INTERVAL_MS = 30000;
+// Backoff between attempts to reopen the event stream after the server refused or dropped it
+export const RECONNECT_BASE_MS = 5000;
+export const RECONNECT_MAX_MS = 300000;
+
+// Delay before the next attempt after `failures` attempts in a row were turned away.
+// Jittered, so tabs turned away together don't all come back together.
+export const reconnectDelay = (failures, random = Math.random) => {
+  const delay = Math.min(RECONNECT_BASE_MS * 2 ** Math.max(0, failures - 1), RECONNECT_MAX_MS);
+  return delay * (0.5 + random());
+};
+
+// Returns a function that stops polling, cancels any pending retry and unsubscribes
+export const watchStream = ({ subscribe, reconnect, poll, timers = globalThis, random = Math.random }) => {
+  let pollTimer = null;
+  let retryTimer = null;
+  let failures = 0;
+
+  const startPolling = () => {
+    if (!pollTimer) {
+      pollTimer = timers.setInterval(poll, POLL_INTERVAL_MS);
+    }
+  };
+  const stopPolling = () => {
+    timers.clearInterval(pollTimer);
+    pollTimer = null;
+  };
+
+  const unsubscribeOpen = subscribe('open', () => {
+    stopPolling();
+    failures = 0;
+  });
+  const unsubscribeError = subscribe('error', ({ closed }) => {
+    startPolling();
+    // With closed false the browser is already reconnecting on its own
+    if (closed && !retryTimer) {
+      failures += 1;
+      retryTimer = timers.setTimeout(() => {
+        retryTimer = null;
+        reconnect();
+      }, reconnectDelay(failures, random));
+    }
+  });
+
+  return () => {
+    unsubscribeOpen();
+    unsubscribeError();
+    stopPolling();
+    timers.clearTimeout(retryTimer);
+    retryTimer = null;
+  };
+};
@@ -0,0 +1,142 @@
+// Run with `npm test` (Node's built-in test runner; no dependencies needed)
+import test from 'node:test';
+import assert from 'node:assert/strict';
+
+import {
+  POLL_INTERVAL_MS, RECONNECT_BASE_MS, RECONNECT_MAX_MS, reconnectDelay, watchStream,
+} from './streamFallback.js';
+
+// Manual clock standing in for setTimeout/setInterval
+const fakeTimers = () => {
+  let now = 0;
+  let nextId = 1;
+  const pending = new Map();
+  const schedule = (callback, delay, interval) => {
+    const id = nextId++;
+    pending.set(id, { callback, at: now + delay, interval });
+    return id;
+  };
+  return {
+    setTimeout: (callback, delay) => schedule(callback, delay, null),
+    setInterval: (callback, delay) => schedule(callback, delay, delay),
+    clearTimeout: (id) => pending.delete(id),
+    clearInterval: (id) => pending.delete(id),
+    pending: () => pending.size,
+    advance(ms) {
+      const until = now + ms;
+      for (;;) {
+        const due = [...pending.entries()].filter(([, timer]) => timer.at <= until).sort((a, b) => a[1].at - b[1].at)[0];
+        if (!due) break;
+        const [id, timer] = due;
+        now = timer.at;
+        if (timer.interval) {
+          timer.at += timer.interval;
+        } else {
+          pending.delete(id);
+        }
+        timer.callback();
+      }
+      now = until;
+    },
+  };
+};
+
+// Stands in for serverEvents: lets the test fire 'open' and 'error'
+const fakeEvents = () => {
+  const handlers = new Map();
+  return {
+    reconnects: 0,
+    subscribe(name, handler) {
+      handlers.set(name, handler);
+      return () => handlers.delete(name);
+    },
+    emit(name, payload = {}) {
+      handlers.get(name)?.(payload);
+    },
+    listening: () => handlers.size,
+  };
+};
+
+const setup = (random = () => 0.5) => {
+  const timers = fakeTimers();
+  const events = fakeEvents();
+  let polls = 0;
+  const stop = watchStream({
+    subscribe: (name, handler) => events.subscribe(name, handler),
+    reconnect: () => { events.reconnects += 1; },
+    poll: () => { polls += 1; },
+    timers,
+    random,
+  });
+  return { timers, events, stop, polls: () => polls };
+};
+
+test('backoff doubles from the base up to the cap, with jitter', () => {
+  const delays = [1, 2, 3, 4, 10].map((failures) => reconnectDelay(failures, () => 0.5));
+  assert.deepEqual(delays, [RECONNECT_BASE_MS, 2 * RECONNECT_BASE_MS, 4 * RECONNECT_BASE_MS,
+    8 * RECONNECT_BASE_MS, RECONNECT_MAX_MS]);
+  assert.equal(reconnectDelay(1, () => 0), RECONNECT_BASE_MS / 2);
+  assert.equal(reconnectDelay(20, () => 0.999), RECONNECT_MAX_MS * 1.499);
+});
+
+test('polls while the stream is down and stops once it opens', () => {
+  const { timers, events, polls } = setup();
+  timers.advance(POLL_INTERVAL_MS * 2);
+  assert.equal(polls(), 0);
+
+  events.emit('error', { closed: false });
+  events.emit('error', { closed: false });
+  timers.advance(POLL_INTERVAL_MS * 3);
+  assert.equal(polls(), 3);
+  // The browser is reconnecting by itself; no manual retry
+  assert.equal(events.reconnects, 0);
+
+  events.emit('open');
+  timers.advance(POLL_INTERVAL_MS * 3);
+  assert.equal(polls(), 3);
+});
+
+test('retries a refused stream with growing delays, reset by a successful open', () => {
+  const { timers, events } = setup();
+
+  events.emit('error', { closed: true });
+  // A second error before the retry fires doesn't schedule another one
+  events.emit('error', { closed: true });
+  timers.advance(RECONNECT_BASE_MS - 1);
+  assert.equal(events.reconnects, 0);
+  timers.advance(1);
+  assert.equal(events.reconnects, 1);
+
+  events.emit('error', { closed: true });
+  timers.advance(2 * RECONNECT_BASE_MS - 1);
+  assert.equal(events.reconnects, 1);
+  timers.advance(1);
+  assert.equal(events.reconnects, 2);
+
+  events.emit('open');
+  events.emit('error', { closed: true });
+  timers.advance(RECONNECT_BASE_MS);
+  assert.equal(events.reconnects, 3);
+});
+
+test('retries never wait longer than the cap', () => {
+  const { timers, events } = setup(() => 0);
+  for (let attempt = 1; attempt <= 12; attempt += 1) {
+    events.emit('error', { closed: true });
+    timers.advance(RECONNECT_MAX_MS / 2);
+    assert.equal(events.reconnects, attempt);
+  }
+});
+
+test('stopping cancels polling and a pending retry', () => {
+  const { timers, events, stop, polls } = setup();
+  events.emit('error', { closed: true });
+  assert.equal(timers.pending(), 2);
+
+  stop();
+  assert.equal(timers.pending(), 0);
+  assert.equal(events.listening(), 0);
+  timers.advance(RECONNECT_MAX_MS);
+  assert.equal(events.reconnects, 0);
+  assert.equal(polls(), 0);
+});